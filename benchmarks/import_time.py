@@ -0,0 +1,91 @@
+"""
+Measures how long it takes to import each script with `python3 -X importtime`,
+and fails if a script that only outputs CSV/JSON imports the graph stack
+(curricularanalytics and its numpy, pandas, and networkx dependencies).
+
+python3 -m benchmarks.import_time
+python3 -m benchmarks.import_time output upload  # Only these scripts
+"""
+
+import subprocess
+import sys
+from typing import Dict, List, NamedTuple
+
+HEAVY_MODULES = ["curricularanalytics", "numpy", "pandas", "networkx"]
+
+# Entry points, and whether they are allowed to import `HEAVY_MODULES`
+ENTRY_POINTS: Dict[str, bool] = {
+    "parse": False,
+    "output": False,
+    "upload": False,
+    "update": False,
+    "visualize": False,
+    "dump_graphs": False,
+    "dump_plans": False,
+    "dump_prereqs": False,
+    "flag_issues": False,
+    "units_per_course": False,
+    "courses_req_by_majors": False,
+    "departments": False,
+    "curricula_index": False,
+    "college_ges": False,
+    "majors_per_course": False,
+    "diff_plan": False,
+    "diff_prereqs": False,
+    "build_reports": False,
+    "serve": False,
+    "plan_metrics": True,
+    "course_metrics": True,
+    "orphans": False,
+}
+
+
+class ImportTime(NamedTuple):
+    module: str
+    total_us: int
+    heavy: List[str]
+
+
+def measure(module: str) -> ImportTime:
+    """
+    Imports `module` in a fresh interpreter and parses the `-X importtime`
+    report, which is printed to stderr as lines like
+    `import time:  self [us] | cumulative | imported package`.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to import {module}:\n{result.stderr}")
+    total_us = 0
+    imported: List[str] = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        if name.strip() == module:
+            total_us = int(cumulative)
+        imported.append(name.strip())
+    heavy = [name for name in HEAVY_MODULES if name in imported]
+    return ImportTime(module, total_us, heavy)
+
+
+def main(modules: List[str]) -> None:
+    regressions: List[str] = []
+    print(f"{'Module':<24}{'Import time':>14}  Heavy modules")
+    for module in modules:
+        result = measure(module)
+        print(
+            f"{module:<24}{result.total_us / 1000:>11.1f} ms  {', '.join(result.heavy)}"
+        )
+        if result.heavy and not ENTRY_POINTS.get(module, True):
+            regressions.append(module)
+    if regressions:
+        print(f"These should not import {', '.join(HEAVY_MODULES)}: {regressions}")
+        exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or list(ENTRY_POINTS.keys()))
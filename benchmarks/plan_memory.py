@@ -0,0 +1,89 @@
+"""
+Measures how much memory it takes to keep every year's academic plans loaded,
+like units_per_course.py and dump_graphs.py do.
+
+python3 -m benchmarks.plan_memory
+python3 -m benchmarks.plan_memory processed  # Also process every plan
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Mapping
+
+from parse import MajorPlans, major_plans
+from parse_defs import RawCourse
+
+
+def load_all_years(min_year: int = 2015) -> Dict[int, Mapping[str, MajorPlans]]:
+    years: Dict[int, Mapping[str, MajorPlans]] = {}
+    for year in range(min_year, 2050):
+        all_plans = major_plans(year)
+        if all_plans == {}:
+            break
+        # Plans are parsed lazily, so access every major to load them all
+        for _ in all_plans.values():
+            pass
+        years[year] = all_plans
+    return years
+
+
+def process_all(years: Dict[int, Mapping[str, MajorPlans]]) -> int:
+    courses = 0
+    for all_plans in years.values():
+        for plans in all_plans.values():
+            for college in plans.colleges:
+                courses += len(plans.plan(college))
+    return courses
+
+
+def as_tuples(years: Dict[int, Mapping[str, MajorPlans]]) -> List[List[RawCourse]]:
+    """
+    Materializes every raw plan as a list of `RawCourse`s, which is how they
+    were stored before `PlanTable`, for comparison.
+    """
+    return [
+        list(raw_plan)
+        for all_plans in years.values()
+        for plans in all_plans.values()
+        for raw_plan in plans.raw_plans.values()
+    ]
+
+
+def megabytes(size: int) -> str:
+    return f"{size / 1_000_000:.1f} MB"
+
+
+def main(processed: bool = False) -> None:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    years = load_all_years()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    rows = sum(
+        len(raw_plan)
+        for all_plans in years.values()
+        for plans in all_plans.values()
+        for raw_plan in plans.raw_plans.values()
+    )
+    print(f"Loaded {len(years)} years ({rows} rows) in {elapsed:.2f}s")
+    print(f"Plan tables: {megabytes(current)} (peak {megabytes(peak)})")
+
+    if processed:
+        before, _ = tracemalloc.get_traced_memory()
+        courses = process_all(years)
+        after, _ = tracemalloc.get_traced_memory()
+        print(f"Processed plans: {megabytes(after - before)} ({courses} courses)")
+
+    before, _ = tracemalloc.get_traced_memory()
+    tuples = as_tuples(years)
+    after, _ = tracemalloc.get_traced_memory()
+    print(f"Same rows as RawCourse lists: {megabytes(after - before)}")
+    del tuples
+    tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    main(len(sys.argv) > 1 and sys.argv[1] == "processed")
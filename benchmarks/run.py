@@ -0,0 +1,346 @@
+"""
+Times each stage of the pipeline and measures its peak memory over synthetic
+data (see synthetic_data.py) at several scales. Each measurement runs in a new
+process from the data's folder, so cold loads are actually cold. Stages that
+use parsed plans or prereqs have them loaded beforehand, so only the stage
+itself is measured.
+
+Synthetic data is generated in synthetic/bench-<scale>-<seed>/ the first time
+it's needed.
+
+python3 -m benchmarks.run  # Scales 0.1 and 0.3
+python3 -m benchmarks.run --scales 0.1,1 --json results.json
+python3 -m benchmarks.run --compare results.json  # Fails if a stage got slower
+python3 -m benchmarks.run --cases output-csv,flag-issues
+"""
+
+from contextlib import redirect_stdout
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, NamedTuple
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _years() -> List[int]:
+    from parse import plan_years
+
+    return plan_years()
+
+
+def _load_plans() -> None:
+    from parse import major_plans
+
+    for year in _years():
+        for _ in major_plans(year).values():
+            pass
+
+
+def _process_plans() -> None:
+    from parse import major_plans
+
+    for year in _years():
+        for plans in major_plans(year).values():
+            for college in plans.colleges:
+                plans.plan(college)
+
+
+def _load_prereqs() -> None:
+    from parse import prereqs, terms
+
+    for term in terms():
+        prereqs(term)
+
+
+def _load_all() -> None:
+    _process_plans()
+    _load_prereqs()
+
+
+def _split_prereqs() -> None:
+    from split_csv import Options, PrereqGrouper, main
+
+    main(Options("./files/prereqs.csv", "./bench_split/prereqs/", PrereqGrouper()))
+
+
+def _split_plans() -> None:
+    from split_csv import Options, PlanGrouper, main
+
+    main(Options("./files/academic_plans.csv", "./bench_split/plans/", PlanGrouper()))
+
+
+def _output(method: str) -> Callable[[], None]:
+    def run() -> None:
+        from output import MajorOutput
+        from parse import major_plans
+
+        for plans in major_plans(_years()[-1]).values():
+            output = MajorOutput(plans)
+            getattr(output, method)()
+            for college in plans.colleges:
+                getattr(output, method)(college)
+
+    return run
+
+
+def _import_curricularanalytics() -> None:
+    _load_all()
+    import curricularanalytics  # type: ignore
+
+
+def _plan_metrics() -> None:
+    import plan_metrics
+
+    plan_metrics.main()
+
+
+def _course_metrics() -> None:
+    import course_metrics
+
+    course_metrics.main()
+
+
+def _diff_plan() -> None:
+    from diff_plan import diff
+    from parse import major_plans
+
+    *_, old_year, new_year = _years()
+    old_plans = major_plans(old_year)
+    for major_code, new in major_plans(new_year).items():
+        if major_code not in old_plans:
+            continue
+        old = old_plans[major_code]
+        for college in new.colleges & old.colleges:
+            diff(old.raw_plans[college], new.raw_plans[college])
+
+
+def _diff_prereqs() -> None:
+    from diff_prereqs import print_diff
+
+    print_diff()
+
+
+def _blocking_table() -> None:
+    from dump_prereqs import blocking_table
+    from parse import prereqs, terms
+
+    blocking_table(prereqs(terms()[-1]))
+
+
+def _flag_issues() -> None:
+    import flag_issues
+
+    flag_issues.main(_years()[-1])
+
+
+def _nothing() -> None:
+    pass
+
+
+class Case(NamedTuple):
+    setup: Callable[[], None]
+    run: Callable[[], None]
+    max_scale: float = float("inf")
+    """
+    Skips the case for larger scales because it would take too long.
+    """
+
+
+CASES: Dict[str, Case] = {
+    "split-prereqs": Case(_nothing, _split_prereqs),
+    "split-plans": Case(_nothing, _split_plans),
+    "prereqs-cold": Case(_nothing, _load_prereqs),
+    "prereqs-warm": Case(_load_prereqs, _load_prereqs),
+    "major-plans-cold": Case(_nothing, _load_plans),
+    "major-plans-warm": Case(_load_plans, _load_plans),
+    "plan": Case(_load_plans, _process_plans),
+    "output-csv": Case(_load_all, _output("output")),
+    "output-json": Case(_load_all, _output("output_json")),
+    "output-degree-plan": Case(
+        _import_curricularanalytics, _output("output_degree_plan")
+    ),
+    "plan-metrics": Case(_import_curricularanalytics, _plan_metrics),
+    "course-metrics": Case(_import_curricularanalytics, _course_metrics),
+    "diff-plan": Case(_load_plans, _diff_plan),
+    "diff-prereqs": Case(_load_prereqs, _diff_prereqs),
+    "blocking-table": Case(_load_prereqs, _blocking_table, max_scale=0.3),
+    "flag-issues": Case(_load_all, _flag_issues),
+}
+
+
+class Measurement(NamedTuple):
+    seconds: float
+    peak_mb: float
+
+
+def measure(name: str, memory: bool) -> float:
+    """
+    Runs a case in this process, returning how many seconds it took, or the
+    peak memory it allocated in megabytes if `memory` is true. Memory is
+    measured in a separate run because tracing allocations slows it down.
+    """
+    case = CASES[name]
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        case.setup()
+        gc.collect()
+        if memory:
+            tracemalloc.start()
+            before, _ = tracemalloc.get_traced_memory()
+            case.run()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return (peak - before) / 1_000_000
+        start = time.perf_counter()
+        case.run()
+        return time.perf_counter() - start
+
+
+def run_case(name: str, data_dir: str, repeat: int) -> Measurement:
+    """
+    Measures a case in new processes from `data_dir`, keeping the fastest of
+    `repeat` runs.
+    """
+
+    def run(memory: bool) -> float:
+        result = subprocess.run(
+            [sys.executable, "-m", "benchmarks.run", "--worker", name]
+            + (["--memory"] if memory else []),
+            cwd=data_dir,
+            env={**os.environ, "PYTHONPATH": REPO},
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"{name} failed:\n{result.stderr}")
+        return float(result.stdout.strip().splitlines()[-1])
+
+    seconds = min(run(False) for _ in range(repeat))
+    return Measurement(seconds, run(True))
+
+
+def prepare_data(scale: float, seed: int) -> str:
+    """
+    Generates synthetic data for a scale, unless it already exists, and the
+    units_per_course.json that flag_issues.py needs.
+    """
+    from synthetic_data import Config, generate
+
+    config = Config(seed=seed, scale=scale)
+    data_dir = os.path.join(REPO, "synthetic", f"bench-{scale:g}-{seed}")
+    config_path = os.path.join(data_dir, "config.json")
+    try:
+        with open(config_path) as file:
+            if json.load(file) == config._asdict():
+                return data_dir
+    except FileNotFoundError:
+        pass
+    print(f"Generating scale {scale:g} data in {data_dir}", file=sys.stderr)
+    generate(data_dir, config)
+    with open(os.path.join(data_dir, "units_per_course.json"), "w") as file:
+        subprocess.run(
+            [sys.executable, os.path.join(REPO, "units_per_course.py"), "json"],
+            cwd=data_dir,
+            stdout=file,
+            check=True,
+        )
+    with open(config_path, "w") as file:
+        json.dump(config._asdict(), file)
+    return data_dir
+
+
+Results = Dict[str, Dict[str, Measurement]]
+
+
+def compare(results: Results, baseline: Results, threshold: float) -> bool:
+    """
+    Prints how each case's time and memory changed from the baseline, returning
+    whether any case got more than `threshold` times slower.
+    """
+    regressed = False
+    print(f"{'Scale':<8}{'Case':<22}{'Time':>16}{'Peak memory':>22}")
+    for scale, cases in results.items():
+        for name, (seconds, peak_mb) in cases.items():
+            old = baseline.get(scale, {}).get(name)
+            if old is None:
+                continue
+            ratio = seconds / old.seconds if old.seconds else 1
+            flag = " !" if ratio > threshold else ""
+            regressed = regressed or ratio > threshold
+            print(
+                f"{scale:<8}{name:<22}{ratio:>14.2f}x{flag:<2}"
+                + f"{peak_mb - old.peak_mb:>+17.1f} MB"
+            )
+    return regressed
+
+
+def load_results(path: str) -> Results:
+    with open(path) as file:
+        return {
+            scale: {name: Measurement(**result) for name, result in cases.items()}
+            for scale, cases in json.load(file)["results"].items()
+        }
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmarks the pipeline.")
+    parser.add_argument("--scales", default="0.1,0.3")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cases", default=",".join(CASES.keys()))
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--json", help="Saves the results to this path.")
+    parser.add_argument("--compare", help="Compares against saved results.")
+    parser.add_argument("--threshold", type=float, default=1.2)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--memory", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(measure(args.worker, args.memory))
+        return
+
+    results: Results = {}
+    print(f"{'Scale':<8}{'Case':<22}{'Time':>10}{'Peak memory':>16}")
+    for scale in map(float, args.scales.split(",")):
+        data_dir = prepare_data(scale, args.seed)
+        cases = results[f"{scale:g}"] = {}
+        for name in args.cases.split(","):
+            if scale > CASES[name].max_scale:
+                continue
+            cases[name] = run_case(name, data_dir, args.repeat)
+            print(
+                f"{scale:<8g}{name:<22}{cases[name].seconds:>9.3f}s"
+                + f"{cases[name].peak_mb:>13.1f} MB"
+            )
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(
+                {
+                    "python": sys.version,
+                    "seed": args.seed,
+                    "results": {
+                        scale: {
+                            name: result._asdict() for name, result in cases.items()
+                        }
+                        for scale, cases in results.items()
+                    },
+                },
+                file,
+                indent="\t",
+            )
+            file.write("\n")
+    if args.compare:
+        print()
+        if compare(results, load_results(args.compare), args.threshold):
+            exit(1)
+
+
+if __name__ == "__main__":
+    main()
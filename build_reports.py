@@ -0,0 +1,572 @@
+"""
+Generates the files that `make all` builds with Python in a single process, so
+the prerequisites and academic plans are only parsed once and shared by every
+report. Reports that don't depend on each other run in parallel in forked
+worker processes, which inherit the parsed data, and reports whose inputs
+(data files, the scripts that make them, and the years and term they're made
+for) haven't changed since the last build are skipped. How long each stage took
+is printed at the end.
+
+`make reports` runs this and then `make all`, which only has to bundle the web
+reports since the Python outputs are already up to date.
+
+python3 build_reports.py [--year 2024] [--year-start 2015] [--prereq-term WI25]
+python3 build_reports.py --jobs 1  # Build in this process, one at a time
+python3 build_reports.py --force flagged-issues units-per-course
+"""
+
+import argparse
+from contextlib import redirect_stdout
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import time
+import traceback
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+import parse
+from parse import forget_database, major_plans, plan_years, prereqs, terms
+from university import university
+
+STAMP_PATH = "./files/.build_reports.json"
+
+# Data files that `parse` reads the plans and prereqs from
+PLAN_DATA = ["./files/plans/.done", parse.DATABASE_PATH, university.majors_file]
+PREREQ_DATA = ["./files/prereqs/.done", parse.DATABASE_PATH]
+
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Modules that every report imports through `parse`
+SHARED_SOURCES = ["parse", "parse_defs", "university"]
+
+
+class Options(NamedTuple):
+    year_start: int
+    year: int
+    prereq_term: str
+
+
+class Stage(NamedTuple):
+    name: str
+    output: str
+    run: Callable[[Options], None]
+    sources: List[str]
+    """
+    Modules that the report is made by, other than `SHARED_SOURCES`.
+    """
+    inputs: List[str]
+    """
+    Paths or glob patterns of data files that the report reads.
+    """
+    options: Callable[[Options], List[object]]
+    """
+    Selects the options that the report depends on.
+    """
+    dependencies: List[str] = []
+    stdout: bool = False
+    """
+    Whether `run` prints the report rather than writing to `output` itself.
+    """
+    plans: bool = False
+    prereqs: bool = False
+
+
+def _metrics(options: Options) -> None:
+    import plan_metrics
+
+    plan_metrics.main()
+
+
+def _course_metrics(options: Options) -> None:
+    import course_metrics
+
+    course_metrics.main()
+
+
+def _course_overlap(options: Options) -> None:
+    import course_overlap
+
+    course_overlap.main()
+
+
+def _curricula_index(options: Options) -> None:
+    from curricula_index import print_index
+
+    print_index(options.year_start, options.year)
+
+
+def _plan_diffs(options: Options) -> None:
+    from diff_plan import diff_all
+
+    diff_all(options.year_start, options.year)
+
+
+def _prereq_diffs(options: Options) -> None:
+    from diff_prereqs import print_diff
+
+    print_diff()
+
+
+def _prereq_timeline(options: Options) -> None:
+    from diff_prereqs import print_timeline
+
+    print_timeline()
+
+
+def _college_ges(options: Options) -> None:
+    from college_ges import print_table
+
+    print_table([options.year], "html")
+
+
+def _prereqs_json(options: Options) -> None:
+    from dump_prereqs import dump_prereqs
+
+    dump_prereqs(prereqs(options.prereq_term))
+
+
+def _plan_editor_index(options: Options) -> None:
+    from dump_plans import render_plan_urls
+
+    render_plan_urls(options.year)
+
+
+def _plan_files(options: Options) -> None:
+    from dump_graphs import render_plan_files
+
+    render_plan_files()
+
+
+def _plan_graph_index(options: Options) -> None:
+    from dump_graphs import render_plan_urls
+
+    render_plan_urls()
+
+
+def _units_per_course(options: Options) -> None:
+    import units_per_course
+
+    units_per_course.main(True)
+
+
+def _flagged_issues(options: Options) -> None:
+    import flag_issues
+
+    flag_issues.main(options.year)
+
+
+def _orphans(options: Options) -> None:
+    import orphans
+
+    orphans.write_csv(
+        orphans.check_years(list(range(options.year_start, options.year + 1))),
+        sys.stdout,
+    )
+
+
+def _no_options(options: Options) -> List[object]:
+    return []
+
+
+def _year_options(options: Options) -> List[object]:
+    return [options.year]
+
+
+def _year_range_options(options: Options) -> List[object]:
+    return [options.year_start, options.year]
+
+
+def _prereq_term_options(options: Options) -> List[object]:
+    return [options.prereq_term]
+
+
+# In the order they're listed in the Makefile; a stage's dependencies must come
+# before it
+STAGES: Dict[str, Stage] = {
+    stage.name: stage
+    for stage in [
+        Stage(
+            "metrics",
+            "./files/metrics_fa12_py.csv",
+            _metrics,
+            ["plan_metrics", "output", "util"],
+            [*PLAN_DATA, *PREREQ_DATA],
+            _no_options,
+            plans=True,
+            prereqs=True,
+        ),
+        Stage(
+            "course-metrics",
+            "./files/courses_fa12_py.csv",
+            _course_metrics,
+            ["course_metrics", "output", "util"],
+            [*PLAN_DATA, *PREREQ_DATA],
+            _no_options,
+            plans=True,
+            prereqs=True,
+        ),
+        Stage(
+            "course-overlap",
+            "./files/course_overlap_py.csv",
+            _course_overlap,
+            ["course_overlap", "util"],
+            PLAN_DATA,
+            _no_options,
+            plans=True,
+        ),
+        Stage(
+            "curricula-index",
+            "./files/curricula_index.csv",
+            _curricula_index,
+            ["curricula_index", "departments", "upload"],
+            ["./files/uploaded*.yml", university.majors_file],
+            _year_range_options,
+            stdout=True,
+        ),
+        Stage(
+            "plan-diffs",
+            "./reports/output/academic-plan-diffs.json",
+            _plan_diffs,
+            ["diff_plan", "curricula_index", "departments", "upload"],
+            [*PLAN_DATA, "./files/uploaded*.yml"],
+            _year_range_options,
+            dependencies=["metrics"],
+            stdout=True,
+            plans=True,
+        ),
+        Stage(
+            "prereq-diffs",
+            "./reports/output/prereq-diffs-fragment.html",
+            _prereq_diffs,
+            ["diff_prereqs", "common_prereqs"],
+            PREREQ_DATA,
+            _no_options,
+            stdout=True,
+            prereqs=True,
+        ),
+        Stage(
+            "prereq-timeline",
+            "./reports/output/prereq-timeline-fragment.html",
+            _prereq_timeline,
+            ["diff_prereqs", "common_prereqs"],
+            PREREQ_DATA,
+            _no_options,
+            stdout=True,
+            prereqs=True,
+        ),
+        Stage(
+            "college-ge-units",
+            "./reports/output/college-ge-units-fragment.html",
+            _college_ges,
+            ["college_ges", "util"],
+            PLAN_DATA,
+            _year_options,
+            stdout=True,
+            plans=True,
+        ),
+        Stage(
+            "prereqs-json",
+            "./reports/output/prereqs.json",
+            _prereqs_json,
+            ["dump_prereqs"],
+            PREREQ_DATA,
+            _prereq_term_options,
+            prereqs=True,
+        ),
+        Stage(
+            "plan-editor-index",
+            "./reports/output/plan-editor-index-fragment.html",
+            _plan_editor_index,
+            ["dump_plans", "departments"],
+            PLAN_DATA,
+            _year_options,
+            stdout=True,
+            plans=True,
+        ),
+        Stage(
+            "plan-files",
+            "./plan_csvs/metadata.json",
+            _plan_files,
+            ["dump_graphs", "output", "departments"],
+            [*PLAN_DATA, *PREREQ_DATA],
+            _no_options,
+            plans=True,
+            prereqs=True,
+        ),
+        Stage(
+            "plan-graph-index",
+            "./reports/output/plan-graph-index-fragment.html",
+            _plan_graph_index,
+            ["dump_graphs", "departments"],
+            PLAN_DATA,
+            _no_options,
+            stdout=True,
+            plans=True,
+        ),
+        Stage(
+            "units-per-course",
+            "./units_per_course.json",
+            _units_per_course,
+            ["units_per_course"],
+            PLAN_DATA,
+            _no_options,
+            stdout=True,
+            plans=True,
+        ),
+        Stage(
+            "flagged-issues",
+            "./files/flagged_issues.html",
+            _flagged_issues,
+            ["flag_issues", "plan_checker", "util"],
+            [*PLAN_DATA, *PREREQ_DATA],
+            _year_options,
+            dependencies=["units-per-course"],
+            stdout=True,
+            plans=True,
+            prereqs=True,
+        ),
+        Stage(
+            "orphans",
+            "./files/orphans.csv",
+            _orphans,
+            ["orphans", "output", "util"],
+            [*PLAN_DATA, *PREREQ_DATA],
+            _year_range_options,
+            stdout=True,
+            plans=True,
+            prereqs=True,
+        ),
+    ]
+}
+
+
+def signature(stage: Stage, options: Options) -> str:
+    """
+    Hashes the modification times and sizes of a stage's inputs, including the
+    outputs of the stages it depends on, along with the options it uses. Files
+    that don't exist are hashed as missing, so creating one (like files/plans.db)
+    also counts as a change.
+    """
+    # Scripts can be run from another folder, like one made by synthetic_data.py
+    paths = [
+        os.path.join(SOURCE_DIR, f"{module}.py")
+        for module in sorted({*SHARED_SOURCES, *stage.sources})
+    ]
+    for pattern in stage.inputs:
+        paths += sorted(glob.glob(pattern)) if "*" in pattern else [pattern]
+    paths += [STAGES[dependency].output for dependency in stage.dependencies]
+    state: List[object] = [stage.options(options)]
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            state.append([path, stat.st_mtime_ns, stat.st_size])
+        except FileNotFoundError:
+            state.append([path, None])
+    return hashlib.sha256(json.dumps(state).encode("utf-8")).hexdigest()
+
+
+def load_stamps() -> Dict[str, str]:
+    try:
+        with open(STAMP_PATH) as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_stamps(stamps: Dict[str, str]) -> None:
+    with open(STAMP_PATH, "w") as file:
+        json.dump(stamps, file, indent="\t", sort_keys=True)
+        file.write("\n")
+
+
+def stale_stages(
+    options: Options, stamps: Dict[str, str], forced: Set[str]
+) -> Set[str]:
+    """
+    Lists the stages whose output is missing or whose inputs have changed since
+    they were last built, and the stages that depend on them.
+    """
+    stale: Set[str] = set()
+    for name, stage in STAGES.items():
+        if (
+            name in forced
+            or not os.path.exists(stage.output)
+            or stamps.get(name) != signature(stage, options)
+            or any(dependency in stale for dependency in stage.dependencies)
+        ):
+            stale.add(name)
+    return stale
+
+
+def preload(stages: List[Stage]) -> List[Tuple[str, float]]:
+    """
+    Parses every year's plans and every term's prereqs that the stages need, so
+    that worker processes inherit them instead of each parsing them again.
+    """
+    timings: List[Tuple[str, float]] = []
+    if any(stage.plans for stage in stages):
+        start = time.perf_counter()
+        for year in plan_years():
+            for plans in major_plans(year).values():
+                for college in plans.colleges:
+                    plans.plan(college)
+        timings.append(("(parse plans)", time.perf_counter() - start))
+    if any(stage.prereqs for stage in stages):
+        start = time.perf_counter()
+        for term in terms():
+            prereqs(term)
+        timings.append(("(parse prereqs)", time.perf_counter() - start))
+    return timings
+
+
+def run_stage(name: str, options: Options) -> float:
+    """
+    Builds a stage, returning how many seconds it took. Reports that are printed
+    are written to a temporary file first so a failed build doesn't leave a
+    partial output behind.
+    """
+    stage = STAGES[name]
+    start = time.perf_counter()
+    os.makedirs(os.path.dirname(stage.output), exist_ok=True)
+    if stage.stdout:
+        temp_path = stage.output + ".tmp"
+        try:
+            with open(temp_path, "w") as file:
+                with redirect_stdout(file):
+                    stage.run(options)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        os.replace(temp_path, stage.output)
+    else:
+        stage.run(options)
+    return time.perf_counter() - start
+
+
+class Result(NamedTuple):
+    name: str
+    seconds: Optional[float]
+    error: Optional[BaseException]
+
+
+def build(
+    names: List[str], options: Options, stamps: Dict[str, str], jobs: int
+) -> Dict[str, str]:
+    """
+    Builds the given stages in dependency order, running up to `jobs` of them at
+    a time, and returns each stage's status. The stamps of stages that finished
+    are updated as they finish.
+    """
+    status: Dict[str, str] = {}
+    results: "queue.Queue[Result]" = queue.Queue()
+    pending = list(names)
+    running: Set[str] = set()
+    # Signatures of running stages, which only become stamps if they succeed
+    signatures: Dict[str, str] = {}
+
+    def finish(result: Result) -> None:
+        running.remove(result.name)
+        if result.error is None:
+            status[result.name] = f"{result.seconds:.2f}s"
+            stamps[result.name] = signatures.pop(result.name)
+        else:
+            status[result.name] = "failed"
+            del signatures[result.name]
+            stamps.pop(result.name, None)
+            print(f"{result.name} failed:", file=sys.stderr)
+            traceback.print_exception(result.error, file=sys.stderr)
+        save_stamps(stamps)
+
+    pool = (
+        multiprocessing.get_context("fork").Pool(jobs, initializer=forget_database)
+        if jobs > 1
+        else None
+    )
+    try:
+        while pending or running:
+            for name in list(pending):
+                stage = STAGES[name]
+                if any(dep in pending or dep in running for dep in stage.dependencies):
+                    continue
+                pending.remove(name)
+                if any(
+                    status.get(dep) in ("failed", "blocked")
+                    for dep in stage.dependencies
+                ):
+                    status[name] = "blocked"
+                    continue
+                # Hash the inputs before building in case they change meanwhile
+                signatures[name] = signature(stage, options)
+                running.add(name)
+                if pool is None:
+                    try:
+                        finish(Result(name, run_stage(name, options), None))
+                    except Exception as error:
+                        finish(Result(name, None, error))
+                else:
+                    pool.apply_async(
+                        run_stage,
+                        (name, options),
+                        callback=lambda seconds, name=name: results.put(
+                            Result(name, seconds, None)
+                        ),
+                        error_callback=lambda error, name=name: results.put(
+                            Result(name, None, error)
+                        ),
+                    )
+            if running:
+                finish(results.get())
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return status
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generates the reports' data.")
+    parser.add_argument("--year-start", type=int, default=2015)
+    parser.add_argument("--year", type=int, default=2024)
+    parser.add_argument("--prereq-term", default="WI25")
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="How many stages to build at once. 1 builds in this process.",
+    )
+    parser.add_argument(
+        "--force",
+        nargs="*",
+        choices=list(STAGES.keys()),
+        help="Stages to rebuild even if their inputs haven't changed. Lists every stage if given no stages.",
+    )
+    args = parser.parse_args()
+    options = Options(args.year_start, args.year, args.prereq_term)
+    if args.force is None:
+        forced: Set[str] = set()
+    else:
+        forced = set(args.force or STAGES.keys())
+
+    start = time.perf_counter()
+    stamps = load_stamps()
+    stale = stale_stages(options, stamps, forced)
+    names = [name for name in STAGES.keys() if name in stale]
+    timings = preload([STAGES[name] for name in names])
+    status = build(names, options, stamps, args.jobs)
+
+    print(f"{'Stage':<24}Time", file=sys.stderr)
+    for name, seconds in timings:
+        print(f"{name:<24}{seconds:.2f}s", file=sys.stderr)
+    for name in STAGES.keys():
+        print(f"{name:<24}{status.get(name, 'unchanged')}", file=sys.stderr)
+    print(f"{'(total)':<24}{time.perf_counter() - start:.2f}s", file=sys.stderr)
+    if "failed" in status.values() or "blocked" in status.values():
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
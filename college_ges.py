@@ -1,26 +1,28 @@
 """
-python3 college_ges.py > college_ges.csv
+python3 college_ges.py 2022 > college_ges.csv
 python3 college_ges.py 2022 html > reports/output/college-ge-units-fragment.html
+python3 college_ges.py 2015-2024 json > college_ges.json
 
 python3 college_ges.py <year> debug <major> <college>
-python3 college_ges.py <year> (html)
+python3 college_ges.py <year>[-<year>] (csv|html|json)
+
+Given a range of years, the CSV has a row per year and major, the HTML has a
+table per year, and the JSON maps each year to its majors. The color scale is
+shared by every year.
 """
 
+import json
 import sys
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Sequence, cast
 from parse import major_codes, major_plans
 from university import university
-from util import partition
+from util import parse_years, partition
 
-if len(sys.argv) <= 1:
-    raise ValueError("Need year: python3 college_ges.py <year> (html|debug) ...")
-year = int(sys.argv[1])
+if TYPE_CHECKING:
+    import pandas as pd  # type: ignore
 
-if len(sys.argv) > 2 and sys.argv[2] == "debug":
-    if len(sys.argv) != 5:
-        raise ValueError(
-            "Need major code and college: python3 college_ges.py <year> debug <major> <college>"
-        )
-    _, _, _, major_code, college = sys.argv
+
+def print_debug(year: int, major_code: str, college: str) -> None:
     courses = partition(
         (
             (
@@ -34,7 +36,7 @@ if len(sys.argv) > 2 and sys.argv[2] == "debug":
                 else f"{course.course_title} ({course.units})"
             ),
         )
-        for course in major_plans(int(year))[major_code].plan(college)
+        for course in major_plans(year)[major_code].plan(college)
     )
     print("[Major]")
     print(", ".join(courses.get("MAJOR") or []) or "(none)")
@@ -44,22 +46,131 @@ if len(sys.argv) > 2 and sys.argv[2] == "debug":
     print()
     print("[Padding]")
     print(", ".join(courses.get("ELECTIVE") or []) or "(none)")
-    exit()
 
-html = len(sys.argv) > 2 and sys.argv[2] == "html"
 
-all_extra_ge_units = {
-    (major_code, college): sum(
-        course.units
-        for course in plans.plan(college)
-        if course.course_title.upper() != "ELECTIVE" and not course.for_major
+def plan_table(years: Sequence[int]) -> "pd.DataFrame":
+    """
+    Lists every course in every plan from the given years, one row per course,
+    with the columns year, major, college, for_major, title, and units.
+    """
+    # Imported here because pandas takes a while to import
+    import pandas as pd  # type: ignore
+
+    columns: Dict[str, List[object]] = {
+        "year": [],
+        "major": [],
+        "college": [],
+        "for_major": [],
+        "title": [],
+        "units": [],
+    }
+    for year in years:
+        for major_code, plans in major_plans(year).items():
+            for college in plans.colleges:
+                for course in plans.plan(college):
+                    columns["year"].append(year)
+                    columns["major"].append(major_code)
+                    columns["college"].append(college)
+                    columns["for_major"].append(course.for_major)
+                    columns["title"].append(course.course_title)
+                    columns["units"].append(course.units)
+    return pd.DataFrame(
+        {
+            **columns,
+            "for_major": pd.Series(columns["for_major"], dtype=bool),
+            "title": pd.Series(columns["title"], dtype=str),
+            "units": pd.Series(columns["units"], dtype=float),
+        }
+    )
+
+
+def ge_matrix(years: Sequence[int]) -> "pd.DataFrame":
+    """
+    Tabulates the number of units of non-elective college courses in each
+    major's plan for each college. Rows are indexed by year and major, in the
+    order of `major_plans`, and columns are college codes, in the order of
+    `university.college_codes`. Majors without a plan for a college are NaN.
+    """
+    import pandas as pd  # type: ignore
+
+    # pandas has no type stubs, so its frames are `Any` until they're returned
+    courses: Any = plan_table(years)
+    ge_courses: Any = courses[
+        (courses["title"].str.upper() != "ELECTIVE") & ~courses["for_major"]
+    ]
+    units: Any = ge_courses.groupby(["year", "major", "college"], sort=False)[
+        "units"
+    ].sum()
+    # Plans without any GE courses have 0 GE units, not NaN
+    plans: Any = pd.MultiIndex.from_tuples(
+        [
+            (year, major_code, college)
+            for year in years
+            for major_code, plans in major_plans(year).items()
+            for college in plans.colleges
+        ],
+        names=["year", "major", "college"],
+    )
+    majors: Any = pd.MultiIndex.from_tuples(
+        [(year, major_code) for year in years for major_code in major_plans(year)],
+        names=["year", "major"],
+    )
+    return cast(
+        "pd.DataFrame",
+        units.reindex(plans, fill_value=0.0)
+        .unstack("college")
+        .reindex(index=majors, columns=university.college_codes),
     )
-    for major_code, plans in major_plans(year).items()
-    for college in plans.colleges
-}
-min_ge = min(units for units in all_extra_ge_units.values() if units > 0)
-max_ge = max(all_extra_ge_units.values())
-print(f"min={min_ge} max={max_ge}", file=sys.stderr)
+
+
+def average_ge_units(matrix: "pd.DataFrame") -> "pd.DataFrame":
+    """
+    Averages each college's GE units over the majors in each year, excluding
+    undeclared majors. Majors without a plan for the college count as 0.
+    """
+    frame: Any = matrix
+    majors: Any = frame[~frame.index.get_level_values("major").str.startswith("UN")]
+    by_year: Any = majors.groupby(level="year", sort=False)
+    return cast("pd.DataFrame", by_year.sum().div(by_year.size(), axis=0))
+
+
+class MajorGeUnits(NamedTuple):
+    year: int
+    major_code: str
+    units: List[float]
+    """
+    GE units for each college in `university.college_codes`, or NaN if the
+    major has no plan for the college.
+    """
+
+
+def ge_rows(matrix: "pd.DataFrame") -> List[MajorGeUnits]:
+    """
+    Converts the rows of a matrix from `ge_matrix` to plain Python values.
+    """
+    frame: Any = matrix
+    return [
+        MajorGeUnits(int(year), str(major_code), [float(units) for units in row])
+        for (year, major_code), row in zip(frame.index, frame.to_numpy().tolist())
+    ]
+
+
+def average_rows(matrix: "pd.DataFrame") -> Dict[int, List[float]]:
+    """
+    The averages from `average_ge_units` for each year, by college.
+    """
+    frame: Any = average_ge_units(matrix)
+    return {
+        int(year): [float(units) for units in row]
+        for year, row in zip(frame.index, frame.to_numpy().tolist())
+    }
+
+
+def _by_year(rows: List[MajorGeUnits]) -> Dict[int, List[MajorGeUnits]]:
+    years: Dict[int, List[MajorGeUnits]] = {}
+    for row in rows:
+        years.setdefault(row.year, []).append(row)
+    return years
 
 
 class ColorScale:
@@ -88,68 +199,133 @@ class ColorScale:
         return f"rgb({channels}, var(--fill-opacity))"
 
 
-if html:
+def _color(ge_units: float, min_ge: float, max_ge: float) -> str:
+    return ColorScale.color_scale((ge_units - min_ge) / (max_ge - min_ge))
+
+
+def print_html(matrix: "pd.DataFrame", min_ge: float, max_ge: float) -> None:
+    years = _by_year(ge_rows(matrix))
+    averages = average_rows(matrix)
     college_headers = "".join(
         f'<th className="college-header">{university.college_names[college]}</th>'
         for college in university.college_codes
     )
+    for year, rows in years.items():
+        if len(years) > 1:
+            print(f"<h2>{year}</h2>")
+        print(
+            f'<table><tr className="header"><th className="major">Major</th>{college_headers}</tr>'
+        )
+        for _, major_code, units in rows:
+            if major_code.startswith("UN"):
+                continue
+            print(
+                f'<tr className="row" id="{major_code}"><th scope="col" className="major">'
+            )
+            print(
+                f'<span className="major-code">{major_code}</span><span className="major-name">: {major_codes()[major_code].name}</span></th>'
+            )
+            for ge_units in units:
+                if ge_units != ge_units:
+                    print("<td></td>")
+                    continue
+                color = (
+                    _color(ge_units, min_ge, max_ge)
+                    if ge_units >= min_ge
+                    else "transparent"
+                )
+                print(f'<td style="--color: {color};">{ge_units: .0f}</td>')
+            print(f"</tr>")
+
+        print('<tr className="average"><th scope="col" className="major">Average</th>')
+        for average in averages[year]:
+            color = _color(average, min_ge, max_ge)
+            print(f'<td style="--color: {color};">{average: .0f}</td>')
+        print(f"</tr>")
+        print("</table>")
+
+
+def print_csv(matrix: "pd.DataFrame") -> None:
+    rows = ge_rows(matrix)
+    multiple_years = len(_by_year(rows)) > 1
     print(
-        f'<table><tr className="header"><th className="major">Major</th>{college_headers}</tr>'
-    )
-else:
-    print(
-        "Major,"
+        ("Year," if multiple_years else "")
+        + "Major,"
         + ",".join(
             university.college_names[college] for college in university.college_codes
         )
     )
-
-sums = {college: 0.0 for college in university.college_codes}
-major_count = 0
-
-for major_code in major_plans(year).keys():
-    if major_code.startswith("UN"):
-        continue
-    major_count += 1
-    if html:
-        print(
-            f'<tr className="row" id="{major_code}"><th scope="col" className="major">'
-        )
+    for year, major_code, units in rows:
+        if major_code.startswith("UN"):
+            continue
         print(
-            f'<span className="major-code">{major_code}</span><span className="major-name">: {major_codes()[major_code].name}</span></th>'
+            (f"{year}," if multiple_years else "")
+            + major_code
+            + "".join(
+                "," if ge_units != ge_units else f",{ge_units}" for ge_units in units
+            )
         )
+
+
+def print_json(matrix: "pd.DataFrame") -> None:
+    averages = average_rows(matrix)
+    json.dump(
+        {
+            "colleges": university.college_codes,
+            "years": {
+                str(year): {
+                    "majors": {
+                        major_code: [
+                            None if ge_units != ge_units else ge_units
+                            for ge_units in units
+                        ]
+                        for _, major_code, units in rows
+                        if not major_code.startswith("UN")
+                    },
+                    "average": averages[year],
+                }
+                for year, rows in _by_year(ge_rows(matrix)).items()
+            },
+        },
+        sys.stdout,
+        separators=(",", ":"),
+    )
+    print()
+
+
+def print_table(years: Sequence[int], output_format: str = "csv") -> None:
+    matrix = ge_matrix(years)
+    all_units = [
+        ge_units
+        for row in ge_rows(matrix)
+        for ge_units in row.units
+        if ge_units == ge_units
+    ]
+    min_ge = min(ge_units for ge_units in all_units if ge_units > 0)
+    max_ge = max(all_units)
+    print(f"min={min_ge} max={max_ge}", file=sys.stderr)
+
+    if output_format == "html":
+        print_html(matrix, min_ge, max_ge)
+    elif output_format == "json":
+        print_json(matrix)
     else:
-        print(major_code, end="")
-    for college in university.college_codes:
-        if (major_code, college) not in all_extra_ge_units:
-            if html:
-                print("<td></td>")
-            else:
-                print(",", end="")
-            continue
-        extra_ge_units = all_extra_ge_units[major_code, college]
-        sums[college] += extra_ge_units
-        if html:
-            color = (
-                ColorScale.color_scale((extra_ge_units - min_ge) / (max_ge - min_ge))
-                if extra_ge_units >= min_ge
-                else "transparent"
+        print_csv(matrix)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) <= 1:
+        raise ValueError(
+            "Need year: python3 college_ges.py <year>[-<year>] (csv|html|json|debug) ..."
+        )
+    years = parse_years(sys.argv[1])
+
+    if len(sys.argv) > 2 and sys.argv[2] == "debug":
+        if len(sys.argv) != 5:
+            raise ValueError(
+                "Need major code and college: python3 college_ges.py <year> debug <major> <college>"
             )
-            print(f'<td style="--color: {color};">{extra_ge_units: .0f}</td>')
-        else:
-            print(f",{extra_ge_units}", end="")
-    if html:
-        print(f"</tr>")
+        _, _, _, major_code, college = sys.argv
+        print_debug(years[0], major_code, college)
     else:
-        print()
-
-if html:
-    print('<tr className="average"><th scope="col" className="major">Average</th>')
-    for college in university.college_codes:
-        average = sums[college] / major_count
-        color = ColorScale.color_scale((average - min_ge) / (max_ge - min_ge))
-        print(f'<td style="--color: {color};">{average: .0f}</td>')
-    print(f"</tr>")
-
-if html:
-    print("</table>")
+        print_table(years, sys.argv[2] if len(sys.argv) > 2 else "csv")
@@ -1,34 +1,16 @@
+"""
+python3 compare-curricula.py > comparisons.txt
+python3 compare-curricula.py 2024
+"""
+
 import itertools
-import re
-from typing import List, Tuple
+import sys
+from typing import List
+from curriculum_consistency import Curricula
 from parse import major_plans
 
 colleges = ["RE", "MU", "TH", "WA", "FI", "SI", "SN"]
-ignored = ["GE/DEI", "DEI/GE", "DEI"]
-
-
-def difference(a: List[str], b: List[str]) -> Tuple[List[str], List[str]]:
-    """
-    Takes two sorted lists, which may have duplicate items, and returns tuple of
-    a list of items only in `a` and items only in `b`.
-    """
-    a_exclusive: List[str] = []
-    b_exclusive: List[str] = []
-    i = 0
-    j = 0
-    while i < len(a) and j < len(b):
-        if a[i] == b[j]:
-            i += 1
-            j += 1
-        elif a[i] < b[j]:
-            a_exclusive.append(a[i])
-            i += 1
-        else:
-            b_exclusive.append(b[j])
-            j += 1
-    a_exclusive += a[i:]
-    b_exclusive += b[j:]
-    return a_exclusive, b_exclusive
+year = int(sys.argv[1]) if len(sys.argv) > 1 else 2021
 
 
 def display_set(ls: List[str]) -> str:
@@ -41,47 +23,30 @@ def display_set(ls: List[str]) -> str:
 
 oddity_scores = {college: 0 for college in colleges}
 deviation_scores = {college: 0 for college in colleges}
-for major_plan in major_plans(2021).values():
-    try:
-        curricula = {
-            college: sorted(
-                re.sub(
-                    r"( ?/ ?(awp|dei|sixth practicum)| \(dei approved\)|\*\* ?/elective)$",
-                    "",
-                    course.course_title.strip(" *^").lower(),
-                )
-                for course in major_plan.curriculum(college)
-                if course.course_title not in ignored
-            )
-            for college in colleges
-        }
-    except KeyError as e:
+for major_plan in major_plans(year).values():
+    curricula = Curricula(major_plan, colleges)
+    if curricula.missing:
         print(f"= <!> Error for {major_plan.major_code} =")
-        print(f"Missing academic plan for {e.args[0]} (and possibly others too)")
+        print(
+            f"Missing academic plan for {curricula.missing[0]} (and possibly others too)"
+        )
         print()
         continue
 
-    local_scores = {college: 0 for college in colleges}
     header_printed = False
-    for (clg1, curr1), (clg2, curr2) in itertools.combinations(curricula.items(), 2):
-        if curr1 != curr2:
+    for clg1, clg2 in itertools.combinations(colleges, 2):
+        if not curricula.same(clg1, clg2):
             if not header_printed:
                 print(f"= Discrepancies for {major_plan.major_code} =")
                 header_printed = True
             print(f"== {clg1} vs {clg2} ==")
-            only1, only2 = difference(curr1, curr2)
-            print(f"[{clg1}] {display_set(only1)}")
-            print(f"[{clg2}] {display_set(only2)}")
-            local_scores[clg1] += 1
-            local_scores[clg2] += 1
-            oddity_scores[clg1] += 1
-            oddity_scores[clg2] += 1
+            only1, only2 = curricula.difference(clg1, clg2)
+            print(f"[{clg1}] {display_set(sorted(only1.elements()))}")
+            print(f"[{clg2}] {display_set(sorted(only2.elements()))}")
+    for college in colleges:
+        oddity_scores[college] += curricula.oddity(college)
     if header_printed:
-        unique = [
-            college
-            for college, score in local_scores.items()
-            if score == len(colleges) - 1
-        ]
+        unique = curricula.deviations()
         if len(unique) > 0:
             print(f"Deviations: {unique}")
             for college in unique:
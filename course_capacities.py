@@ -1,16 +1,35 @@
 """
 python3 course_capacities.py > files/course_capacities_output.csv
+
+python3 course_capacities.py project 2019-2022 > files/course_demand.csv
+python3 course_capacities.py project 2019-2022 CS26 -10 10  # What if CS26 had 10% fewer or more students
+
+`project` assumes that every cohort from the given years had as many incoming
+first years as files/ClassCapCalculatorNewStudents.csv, and that they follow
+the plans from the year they started. It outputs how many students need each
+course in each term, from when the first cohort starts to when the last one
+graduates. A what-if sweep outputs a column for each change in a major's
+enrollment.
+
+files/ClassCapCalculatorNewStudents.csv isn't generated by any script here. It's
+a spreadsheet of incoming first years from the shared Google Drive folder,
+exported as CSV, with a row per major code and a column per college (named like
+"Revelle", in alphabetical order) followed by a total column.
 """
 
 import csv
-from typing import Dict, List, NamedTuple, TextIO, Tuple
+from typing import Dict, Iterable, List, NamedTuple, Sequence, TextIO, Tuple, cast
+import numpy as np
+import numpy.typing as npt
 from parse import major_plans
 from parse_defs import CourseCode
 
 from university import university
+from util import parse_years
 
 YEAR = 2022
 YEAR_COUNT = 4
+FIRST_YEARS_PATH = "files/ClassCapCalculatorNewStudents.csv"
 
 
 class StudentType(NamedTuple):
@@ -55,6 +74,17 @@ def from_first_years(file: TextIO) -> StudentBody:
     return students
 
 
+def read_first_years() -> StudentBody:
+    try:
+        with open(FIRST_YEARS_PATH, newline="") as file:
+            return from_first_years(file)
+    except FileNotFoundError:
+        raise FileNotFoundError(
+            f"Missing {FIRST_YEARS_PATH}, the incoming first years per major and"
+            " college. Export it from the shared Google Drive folder."
+        ) from None
+
+
 def class_sizes(students: StudentBody, year: int) -> ClassSizeOutput:
     """
     Iterates over each major plan and calculates the
@@ -78,6 +108,174 @@ def class_sizes(students: StudentBody, year: int) -> ClassSizeOutput:
     return courses
 
 
+class Cohort(NamedTuple):
+    start_year: int
+    major: str
+    college: str
+
+
+def cohorts_from_first_years(
+    first_years: StudentBody, start_years: Iterable[int]
+) -> Dict[Cohort, int]:
+    """
+    Assumes that every year has the same number of incoming first years in
+    each major and college.
+    """
+    return {
+        Cohort(start_year, student_type.major, student_type.college): count
+        for start_year in start_years
+        for student_type, count in first_years.items()
+        if student_type.year == 0
+    }
+
+
+class Projection:
+    """
+    Projects how many students need each course in each term when cohorts from
+    several years overlap. A cohort takes the courses in the plan from the year
+    it started.
+
+    The plans are stored as a sparse matrix from cohorts to (course, term)
+    pairs in coordinate form, where each entry is how many times the plan has
+    the course that term. Then the demand for a vector of cohort sizes is a
+    vector-matrix product, which is done with `np.bincount`.
+    """
+
+    start_years: List[int]
+    cohorts: List[Cohort]
+    courses: List[CourseCode]
+    term_codes: List[str]
+    """
+    Every term from when the first cohort starts to when the last one
+    graduates, like `FA22`.
+    """
+    _cohort_index: Dict[Cohort, int]
+    _rows: npt.NDArray[np.intp]
+    _columns: npt.NDArray[np.intp]
+    _counts: npt.NDArray[np.float64]
+
+    def __init__(self, start_years: Sequence[int]) -> None:
+        if not start_years:
+            raise ValueError("Need at least one start year to project.")
+        self.start_years = sorted(start_years)
+        self.cohorts = []
+        self.courses = []
+        self._cohort_index = {}
+        course_index: Dict[CourseCode, int] = {}
+        entries: Dict[Tuple[int, CourseCode, int], int] = {}
+        first_year = self.start_years[0]
+        last_term = 0
+        for start_year in self.start_years:
+            offset = (start_year - first_year) * len(university.terms)
+            for major_code, plans in major_plans(start_year).items():
+                for college in university.college_codes:
+                    if college not in plans.colleges:
+                        continue
+                    cohort = Cohort(start_year, major_code, college)
+                    self._cohort_index[cohort] = len(self.cohorts)
+                    self.cohorts.append(cohort)
+                    for course in plans.plan(college):
+                        if not course.course_code:
+                            continue
+                        if course.course_code not in course_index:
+                            course_index[course.course_code] = len(self.courses)
+                            self.courses.append(course.course_code)
+                        key = (
+                            self._cohort_index[cohort],
+                            course.course_code,
+                            offset + course.term_index,
+                        )
+                        entries[key] = entries.get(key, 0) + 1
+                        last_term = max(last_term, offset + course.term_index)
+
+        self.term_codes = [
+            university.get_term_code(first_year, term_index)
+            for term_index in range(last_term + 1)
+        ]
+        self._rows = np.array([row for row, _, _ in entries], dtype=np.intp)
+        self._columns = np.array(
+            [
+                course_index[course_code] * len(self.term_codes) + term
+                for _, course_code, term in entries
+            ],
+            dtype=np.intp,
+        )
+        self._counts = np.array(list(entries.values()), dtype=np.float64)
+
+    def student_vector(self, students: Dict[Cohort, int]) -> npt.NDArray[np.float64]:
+        """
+        Converts cohort sizes to a vector indexed like `cohorts`. Cohorts
+        without a plan are ignored.
+        """
+        vector = np.zeros(len(self.cohorts))
+        for cohort, count in students.items():
+            if cohort in self._cohort_index:
+                vector[self._cohort_index[cohort]] = count
+        return vector
+
+    def major_mask(self, major: str) -> npt.NDArray[np.float64]:
+        """
+        A vector that is 1 for the major's cohorts and 0 otherwise.
+        """
+        return np.array([float(cohort.major == major) for cohort in self.cohorts])
+
+    def demand(self, students: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        """
+        Returns a matrix of how many students need each course (rows, indexed
+        like `courses`) in each term (columns, indexed like `term_codes`).
+        """
+        size = len(self.courses) * len(self.term_codes)
+        # With weights, bincount sums them as floats, which its stubs don't know
+        demand = cast(
+            npt.NDArray[np.float64],
+            np.bincount(
+                self._columns,
+                weights=students[self._rows] * self._counts,
+                minlength=size,
+            ),
+        )
+        return demand.reshape(len(self.courses), len(self.term_codes))
+
+    def sweep(
+        self, students: npt.NDArray[np.float64], major: str, changes: Sequence[float]
+    ) -> List[npt.NDArray[np.float64]]:
+        """
+        Returns the demand when the major's enrollment is changed by each
+        fraction in `changes` (e.g. -0.1 for 10% fewer students). Because
+        demand is linear in the number of students, the major's demand is only
+        computed once and scaled for each change.
+        """
+        base = self.demand(students)
+        major_demand = self.demand(students * self.major_mask(major))
+        return [base + change * major_demand for change in changes]
+
+
+def output_demand(
+    projection: Projection,
+    columns: Dict[str, npt.NDArray[np.float64]],
+    file: TextIO,
+) -> None:
+    """
+    Writes a row for every course and term that some column needs seats for.
+    Demand is rounded to the nearest student.
+    """
+    writer = csv.writer(file)
+    writer.writerow(["Course", "Term", *columns.keys()])
+    demands = [np.rint(demand).astype(int) for demand in columns.values()]
+    needed = np.any([demand > 0 for demand in demands], axis=0)
+    for course_index, course in sorted(
+        enumerate(projection.courses), key=lambda item: item[1]
+    ):
+        for term_index in np.flatnonzero(needed[course_index]):
+            writer.writerow(
+                [
+                    str(course),
+                    projection.term_codes[term_index],
+                    *(demand[course_index, term_index] for demand in demands),
+                ]
+            )
+
+
 def output_class_sizes(sizes: ClassSizeOutput, file: TextIO) -> None:
     file.write("Course,")
     file.write(",".join(university.terms))
@@ -107,11 +305,28 @@ def output_seats_left(
         file.write("\n")
 
 
+def project(start_years: Sequence[int], major: str, changes: List[float]) -> None:
+    import sys
+
+    # Read it first to fail before building the projection if it's missing
+    first_years = read_first_years()
+    projection = Projection(start_years)
+    students = projection.student_vector(
+        cohorts_from_first_years(first_years, start_years)
+    )
+    columns = {"Students needing course": projection.demand(students)}
+    if major:
+        for change, demand in zip(
+            changes, projection.sweep(students, major, [c / 100 for c in changes])
+        ):
+            columns[f"{major} {change:+g}%"] = demand
+    output_demand(projection, columns, sys.stdout)
+
+
 def main() -> None:
     import sys
 
-    with open("files/ClassCapCalculatorNewStudents.csv", newline="") as file:
-        student_body = from_first_years(file)
+    student_body = read_first_years()
 
     courses: CourseEnrollment = {}
     with open("files/ClassCapCalculatorCourses.csv", newline="") as file:
@@ -147,4 +362,13 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
+    import sys
+
+    if len(sys.argv) > 2 and sys.argv[1] == "project":
+        project(
+            parse_years(sys.argv[2]),
+            sys.argv[3] if len(sys.argv) > 3 else "",
+            [float(change) for change in sys.argv[4:]],
+        )
+    else:
+        main()
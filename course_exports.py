@@ -0,0 +1,231 @@
+"""
+Reads the protected enrollment/DFW and waitlist exports one row at a time, so
+any number of them (e.g. several years of exports) can be read without loading
+them into memory. The exports only list each course code on its first row, so
+the readers fill the course code down to the rows below it.
+
+`summarize` reads every export in one pass and gathers each course's DFW rate,
+the terms it was offered, and its average waitlist, both overall and per term.
+
+Exports:
+    `parse_number`, which parses a number like `1,234` from an export, where
+    empty cells are 0.
+
+    `read_dfw` and `read_waitlist`, which stream the rows of an enrollment/DFW
+    export and a waitlist export, and `read_export`, which streams either.
+
+    `summarize`, which aggregates the rows of several exports by course and
+    term.
+
+python3 course_exports.py './files/21-22 Enrollment_DFW CJ.xlsx.csv' './files/Waitlist by Course for CJ.xlsx.csv' > files/protected/course_exports.json
+python3 course_exports.py --min-enrolled 4 <paths...>
+"""
+
+import csv
+from typing import Dict, Iterator, List, NamedTuple, Optional, Union
+
+from parse_defs import TermCode
+
+DFW_COLUMNS = 9
+WAITLIST_COLUMNS = 4
+
+
+def parse_number(number: str) -> float:
+    return float(number.replace(",", "") or "0")
+
+
+class DfwRow(NamedTuple):
+    course_code: str
+    title: str
+    """
+    The course title, or "Total" for the row totaling every term of the
+    course.
+    """
+    term: str
+    "The term code, which is empty for the total rows."
+    total: float
+    "Number of students enrolled."
+    abc: float
+    dfw: float
+
+
+class WaitlistRow(NamedTuple):
+    course_code: str
+    title: str
+    term: str
+    waitlist: int
+
+
+def read_dfw(path: str) -> Iterator[DfwRow]:
+    """
+    Streams the rows of an enrollment/DFW export like
+    `21-22 Enrollment_DFW CJ.xlsx.csv`.
+    """
+    with open(path) as file:
+        reader = csv.reader(file)
+        # Skip header
+        next(reader)
+        next(reader)
+        course_code = ""
+        for (
+            course,
+            title,
+            term,
+            _,  # Grand Total: % of Total Enrolled
+            total,  # Grand Total: N
+            _,  # ABC: % of Total Enrolled
+            abc_count,  # ABC: N
+            _,  # DFW: % of Total Enrolled
+            dfw_count,  # DFW: N
+        ) in reader:
+            course_code = course or course_code
+            yield DfwRow(
+                course_code,
+                title,
+                term,
+                parse_number(total),
+                parse_number(abc_count),
+                parse_number(dfw_count),
+            )
+
+
+def read_waitlist(path: str) -> Iterator[WaitlistRow]:
+    """
+    Streams the rows of a waitlist export like
+    `Waitlist by Course for CJ.xlsx.csv`.
+    """
+    with open(path) as file:
+        reader = csv.reader(file)
+        # Skip header
+        next(reader)
+        course_code = ""
+        for (
+            course,  # Course Subject Code and Number
+            title,  # Course Title or "Total"
+            term,  # Term Code
+            waitlist,  # Waitlist
+        ) in reader:
+            course_code = course or course_code
+            yield WaitlistRow(course_code, title, term, int(parse_number(waitlist)))
+
+
+def read_export(path: str) -> Iterator[Union[DfwRow, WaitlistRow]]:
+    """
+    Streams the rows of either kind of export, telling them apart by their
+    number of columns.
+    """
+    with open(path) as file:
+        columns = len(next(csv.reader(file)))
+    if columns == DFW_COLUMNS:
+        return read_dfw(path)
+    if columns == WAITLIST_COLUMNS:
+        return read_waitlist(path)
+    raise ValueError(f"{path} has {columns} columns, which isn't a known export.")
+
+
+class TermStats:
+    enrolled: float = 0
+    dfw: float = 0
+    waitlist_total: int = 0
+    waitlist_count: int = 0
+
+    @property
+    def dfw_rate(self) -> Optional[float]:
+        return self.dfw / self.enrolled if self.enrolled else None
+
+    @property
+    def average_waitlist(self) -> Optional[float]:
+        return (
+            self.waitlist_total / self.waitlist_count if self.waitlist_count else None
+        )
+
+
+class CourseStats(TermStats):
+    """
+    `enrolled` and `dfw` are from the course's total rows, and the waitlist is
+    averaged over every term.
+    """
+
+    terms: Dict[TermCode, TermStats]
+
+    def __init__(self) -> None:
+        self.terms = {}
+
+    def term(self, term: str) -> TermStats:
+        term_code = TermCode(term)
+        if term_code not in self.terms:
+            self.terms[term_code] = TermStats()
+        return self.terms[term_code]
+
+
+def summarize(paths: List[str]) -> Dict[str, CourseStats]:
+    """
+    Aggregates the rows of every export by course and term in one pass.
+    """
+    courses: Dict[str, CourseStats] = {}
+    for path in paths:
+        for row in read_export(path):
+            if not row.course_code:
+                continue
+            if row.course_code not in courses:
+                courses[row.course_code] = CourseStats()
+            course = courses[row.course_code]
+            if isinstance(row, DfwRow):
+                if row.title == "Total":
+                    course.enrolled += row.total
+                    course.dfw += row.dfw
+                elif row.term:
+                    term = course.term(row.term)
+                    term.enrolled += row.total
+                    term.dfw += row.dfw
+            elif row.term:
+                term = course.term(row.term)
+                term.waitlist_total += row.waitlist
+                term.waitlist_count += 1
+                course.waitlist_total += row.waitlist
+                course.waitlist_count += 1
+    return courses
+
+
+def main() -> None:
+    import argparse
+    import json
+    import sys
+
+    parser = argparse.ArgumentParser(
+        description="Summarizes enrollment/DFW and waitlist exports by course."
+    )
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument(
+        "--min-enrolled",
+        type=int,
+        default=0,
+        help="Omits the DFW rate of courses with at most this many students.",
+    )
+    args = parser.parse_args()
+
+    json.dump(
+        {
+            course_code: {
+                "dfw": (
+                    course.dfw_rate if course.enrolled > args.min_enrolled else None
+                ),
+                "waitlist": course.average_waitlist,
+                "terms": {
+                    term_code: {
+                        "dfw": term.dfw_rate,
+                        "waitlist": term.average_waitlist,
+                    }
+                    for term_code, term in sorted(course.terms.items())
+                },
+            }
+            for course_code, course in sorted(summarize(args.paths).items())
+        },
+        sys.stdout,
+        indent=2,
+    )
+    print()
+
+
+if __name__ == "__main__":
+    main()
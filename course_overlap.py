@@ -2,7 +2,7 @@
 python3 course_overlap.py
 """
 
-from parse import major_plans
+from parse import major_plans, plan_years
 from util import CsvWriter
 
 HEADER = [
@@ -42,7 +42,7 @@ def main() -> None:
         writer = CsvWriter(len(HEADER), file)
         writer.row(*HEADER)
 
-        for year in range(2015, 2050):
+        for year in plan_years():
             print_year(writer, year)
 
 
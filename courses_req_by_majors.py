@@ -3,13 +3,19 @@ Lists what majors require each course. I might've done this already, I forgot.
 
 python3 courses_req_by_majors.py 2022
 python3 courses_req_by_majors.py 2022 json > courses_req_by_majors.json
+python3 courses_req_by_majors.py 2022 json verbose  # An object per course taker
+python3 courses_req_by_majors.py 2022 MATH 18
+
+The JSON is columnar by default: majors are listed once, and each course taker
+is packed into a single integer (see `pack_taker`).
+reports/seats/courses-by-major.ts decodes it.
 """
 
 import json
 from sys import stdout
-from typing import NamedTuple
-from parse import major_plans
+from typing import Dict, List, NamedTuple
 from parse_defs import CourseCode
+from plan_db import plan_colleges, plan_courses
 from university import university
 from util import partition, sorted_dict
 
@@ -26,64 +32,142 @@ MOST = 0.5
 'Minimum percentage considered to be "most" colleges/majors (to allow for errors)'
 
 
-def print_json(year: int) -> None:
+def pack_taker(
+    taker: CourseTaker,
+    major_index: int,
+    college_index: int,
+    college_count: int,
+    term_count: int,
+) -> int:
+    """
+    Packs a course taker into an integer as mixed-radix digits, from most to
+    least significant: the major's index, the college's index, the term index
+    (`year * 3 + quarter`), and whether it's for the major.
+    """
+    term_index = taker.year * len(university.terms) + taker.quarter
+    return (
+        (major_index * college_count + college_index) * term_count + term_index
+    ) * 2 + int(taker.for_major)
+
+
+def print_json(year: int, compact: bool = True) -> None:
     # TODO: partition by term
-    majors = major_plans(year)
+    colleges = plan_colleges(year)
     courses = partition(
         (
             course.course_code,
             CourseTaker(
                 course.term_index // 3,
                 course.term_index % 3,
-                major_code,
-                college,
+                course.major_code,
+                course.college_code,
                 course.for_major,
             ),
         )
-        for major_code, plans in majors.items()
+        for course in plan_courses(year)
         # Exclude undeclared majors
-        if len(plans.colleges) >= len(university.college_codes) * MOST
-        for college in university.college_codes
-        if college in plans.colleges
-        for course in plans.plan(college)
-        if course.course_code
+        if len(colleges[course.major_code]) >= len(university.college_codes) * MOST
+        and course.college_code in university.college_codes
     )
+    if not compact:
+        json.dump(
+            {
+                "colleges": list(university.college_names.items()),
+                "quarterNames": university.terms,
+                "courses": [
+                    {
+                        "courseCode": str(course_code),
+                        "takers": takers,
+                    }
+                    for course_code, takers in sorted_dict(
+                        courses, key=CourseCode.parts
+                    )
+                ],
+            },
+            stdout,
+        )
+        return
+
+    college_codes = list(university.college_names.keys())
+    college_indices = {college: i for i, college in enumerate(college_codes)}
+    major_indices: Dict[str, int] = {}
+    term_count = 1
+    for takers in courses.values():
+        for taker in takers:
+            if taker.major_code not in major_indices:
+                major_indices[taker.major_code] = len(major_indices)
+            term_count = max(
+                term_count, taker.year * len(university.terms) + taker.quarter + 1
+            )
+    course_codes: List[str] = []
+    packed_takers: List[List[int]] = []
+    for course_code, takers in sorted_dict(courses, key=CourseCode.parts):
+        course_codes.append(str(course_code))
+        packed_takers.append(
+            [
+                pack_taker(
+                    taker,
+                    major_indices[taker.major_code],
+                    college_indices[taker.college_code],
+                    len(college_codes),
+                    term_count,
+                )
+                for taker in takers
+            ]
+        )
     json.dump(
         {
             "colleges": list(university.college_names.items()),
             "quarterNames": university.terms,
-            "courses": [
-                {
-                    "courseCode": str(course_code),
-                    "takers": takers,
-                }
-                for course_code, takers in sorted_dict(courses, key=CourseCode.parts)
-            ],
+            "majors": list(major_indices.keys()),
+            "termCount": term_count,
+            "courseCodes": course_codes,
+            "takers": packed_takers,
         },
         stdout,
+        separators=(",", ":"),
     )
 
 
 def print_readable(year: int) -> None:
     courses = partition(
-        (course.course_code, major_code)
-        for major_code, plans in major_plans(year).items()
-        for college in plans.colleges
-        for course in plans.plan(college)
-        if course.for_major and course.course_code
+        (course.course_code, course.major_code)
+        for course in plan_courses(year)
+        if course.for_major
     )
     for course_code, major_codes in sorted_dict(courses, key=CourseCode.parts):
         majors = ", ".join(sorted(set(major_codes)))
         print(f"[{course_code}] {majors}")
 
 
+def print_course(year: int, course_code: CourseCode) -> None:
+    """
+    Lists the majors that take a single course and when.
+    """
+    takers = partition(
+        (course.major_code, course)
+        for course in plan_courses(year, course_code)
+        if course.for_major
+    )
+    for major_code, courses in sorted(takers.items()):
+        terms = ", ".join(
+            f"{course.college_code} {university.get_term_code(year, course.term_index)}"
+            for course in courses
+        )
+        print(f"[{major_code}] {terms}")
+
+
 if __name__ == "__main__":
     import sys
 
     if len(sys.argv) < 2:
-        raise ValueError("Need year: python3 courses_req_by_majors.py <year> (json)")
+        raise ValueError(
+            "Need year: python3 courses_req_by_majors.py <year> (json [verbose])"
+        )
     year = int(sys.argv[1])
     if len(sys.argv) > 2 and sys.argv[2] == "json":
-        print_json(year)
+        print_json(year, "verbose" not in sys.argv[3:])
+    elif len(sys.argv) > 3:
+        print_course(year, CourseCode(sys.argv[2].upper(), sys.argv[3].upper()))
     else:
         print_readable(year)
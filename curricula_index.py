@@ -1,33 +1,60 @@
 """
 python3 curricula_index.py 2015 2022 > files/curricula_index.csv
+
+Exports:
+    `urls`, which returns a dictionary mapping from a year and major code to the
+    URL of its curriculum on Curricular Analytics, for every year with a
+    `files/uploaded<year>.yml`. The files are only read the first time it's
+    called.
+
+    `print_index`, which prints a CSV of the curricula uploaded between two
+    years, with their school and department.
 """
 
-import sys
+from functools import cached_property
+import os
+import re
 from typing import Dict, Tuple
+from departments import departments, dept_schools
+from parse import major_codes
 from upload import track_uploaded_curricula
 
-__all__ = ["urls"]
+__all__ = ["urls", "print_index"]
+
 
-_, start_year, end_year = sys.argv
+class _CurriculaIndexCache:
+    @cached_property
+    def urls(self) -> Dict[Tuple[int, str], str]:
+        years = sorted(
+            int(match.group(1))
+            for name in os.listdir("./files/")
+            for match in (re.fullmatch(r"uploaded(\d+)\.yml", name),)
+            if match
+        )
+        urls: Dict[Tuple[int, str], str] = {}
+        for year in years:
+            with track_uploaded_curricula(year) as curricula:
+                for major_code, curriculum_id in curricula.items():
+                    urls[year, major_code] = (
+                        f"https://curricularanalytics.org/curricula/{curriculum_id}/graph"
+                    )
+        return urls
 
-urls: Dict[Tuple[int, str], str] = {}
 
-for year in range(int(start_year), int(end_year) + 1):
-    with track_uploaded_curricula(year) as curricula:
-        for major_code, curriculum_id in curricula.items():
-            urls[year, major_code] = (
-                f"https://curricularanalytics.org/curricula/{curriculum_id}/graph"
-            )
+_cache = _CurriculaIndexCache()
 
 
-if __name__ == "__main__":
-    from departments import departments, dept_schools
-    from parse import major_codes
+def urls() -> Dict[Tuple[int, str], str]:
+    return _cache.urls
 
+
+def print_index(start_year: int, end_year: int) -> None:
     print("School,Department,Major,Year,URL")
-    for (year, major_code), url in urls.items():
+    for (year, major_code), url in urls().items():
+        if not start_year <= year <= end_year:
+            continue
         department = major_codes()[major_code].department
-        department_name = departments.get(department) or "UNKNOWN"
+        department_name = departments().get(department) or "UNKNOWN"
         print(
             ",".join(
                 [
@@ -39,3 +66,10 @@ if __name__ == "__main__":
                 ]
             )
         )
+
+
+if __name__ == "__main__":
+    import sys
+
+    _, start_year, end_year = sys.argv
+    print_index(int(start_year), int(end_year))
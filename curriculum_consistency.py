@@ -0,0 +1,217 @@
+"""
+Checks whether each major's degree plans have the same major courses at every
+college. Each college's major courses are counted into a `Counter`, and
+colleges with identical counts are grouped by hashing the counts, so the
+detailed differences only have to be found once per pair of distinct groups
+rather than for every pair of colleges.
+
+A college's oddity score for a major is how many other colleges' plans differ
+from its plan, and it deviates if its plan differs from every other college's
+(out of at least three). Summed over majors, these score how often a college's
+plans are the odd one out, which the time series tracks across catalog years.
+
+python3 curriculum_consistency.py > files/curriculum_consistency.csv
+python3 curriculum_consistency.py 2015-2024
+
+Exports:
+    `course_title`, the default key that courses are compared by: their
+    normalized title, or None for courses to ignore.
+
+    `Curricula`, which groups a major's colleges by identical curricula and
+    finds the differences between them.
+
+    `all_curricula`, which makes the `Curricula` of every major in several
+    years.
+
+    `score_series`, which sums each college's oddity and deviation scores for
+    every year.
+"""
+
+from collections import Counter
+import re
+from typing import Callable, Dict, FrozenSet, Generic, Hashable, Iterator, List
+from typing import NamedTuple, Optional, Sequence, Tuple, TypeVar
+
+from parse import MajorPlans, major_plans, plan_years
+from parse_defs import ProcessedCourse
+from university import university
+
+IGNORED_TITLES = ["GE/DEI", "DEI/GE", "DEI"]
+
+K = TypeVar("K", bound=Hashable)
+
+CourseKey = Callable[[ProcessedCourse], Optional[K]]
+
+
+def course_title(course: ProcessedCourse) -> Optional[str]:
+    """
+    Normalizes a course title so that notes about whether it satisfies a
+    writing or DEI requirement don't count as a difference.
+    """
+    if course.course_title in IGNORED_TITLES:
+        return None
+    return re.sub(
+        r"( ?/ ?(awp|dei|sixth practicum)| \(dei approved\)|\*\* ?/elective)$",
+        "",
+        course.course_title.strip(" *^").lower(),
+    )
+
+
+class Curricula(Generic[K]):
+    """
+    A major's curricula at each college that has a plan for it, grouped by
+    identical curricula. Courses are compared by a key of type `K`.
+    """
+
+    year: int
+    major_code: str
+    colleges: List[str]
+    "Colleges with plans, in the order given."
+    missing: List[str]
+    "Colleges without plans, in the order given."
+    groups: List[List[str]]
+    """
+    Colleges with identical curricula, in order of their first college.
+    """
+    _group_of: Dict[str, int]
+    _counts: List["Counter[K]"]
+    _differences: Dict[Tuple[int, int], Tuple["Counter[K]", "Counter[K]"]]
+
+    def __init__(
+        self,
+        plans: MajorPlans,
+        colleges: Sequence[str],
+        key: CourseKey[K] = course_title,
+        unique: bool = False,
+    ) -> None:
+        """
+        Courses are compared by `key`, skipping courses it returns None for.
+        If `unique` is true, how many times a course is listed doesn't matter.
+        """
+        self.year = plans.year
+        self.major_code = plans.major_code
+        self.colleges = []
+        self.missing = []
+        self.groups = []
+        self._group_of = {}
+        self._counts = []
+        self._differences = {}
+        group_indices: Dict[FrozenSet[Tuple[K, int]], int] = {}
+        for college in colleges:
+            if college not in plans.colleges:
+                self.missing.append(college)
+                continue
+            self.colleges.append(college)
+            keys = (key(course) for course in plans.curriculum(college))
+            counts = Counter(
+                set(k for k in keys if k is not None)
+                if unique
+                else (k for k in keys if k is not None)
+            )
+            # A multiset's hash doesn't depend on the order of its courses
+            multiset = frozenset(counts.items())
+            if multiset not in group_indices:
+                group_indices[multiset] = len(self.groups)
+                self.groups.append([])
+                self._counts.append(counts)
+            self._group_of[college] = group_indices[multiset]
+            self.groups[group_indices[multiset]].append(college)
+
+    def same(self, a: str, b: str) -> bool:
+        return self._group_of[a] == self._group_of[b]
+
+    def difference(self, a: str, b: str) -> Tuple["Counter[K]", "Counter[K]"]:
+        """
+        Returns the courses only in college `a`'s curriculum and the courses
+        only in college `b`'s, with how many more times they're listed.
+        """
+        group_a = self._group_of[a]
+        group_b = self._group_of[b]
+        if (group_a, group_b) not in self._differences:
+            counts_a = self._counts[group_a]
+            counts_b = self._counts[group_b]
+            self._differences[group_a, group_b] = (
+                counts_a - counts_b,
+                counts_b - counts_a,
+            )
+        return self._differences[group_a, group_b]
+
+    def oddity(self, college: str) -> int:
+        """
+        The number of other colleges whose curricula differ from the college's.
+        """
+        return len(self.colleges) - len(self.groups[self._group_of[college]])
+
+    def deviations(self) -> List[str]:
+        """
+        The colleges whose curricula differ from every other college's, if
+        there are at least three colleges (with two, neither is the odd one
+        out).
+        """
+        if len(self.colleges) < 3:
+            return []
+        return [
+            college
+            for college in self.colleges
+            if self.oddity(college) == len(self.colleges) - 1
+        ]
+
+
+def all_curricula(
+    years: Sequence[int],
+    colleges: Sequence[str] = university.college_codes,
+    key: CourseKey[K] = course_title,
+    unique: bool = False,
+) -> Iterator[Curricula[K]]:
+    for year in years:
+        for plans in major_plans(year).values():
+            yield Curricula(plans, colleges, key, unique)
+
+
+class CollegeScores(NamedTuple):
+    majors: int
+    "Number of majors with a plan for the college and at least one other."
+    oddity: int
+    deviations: int
+
+
+def score_series(
+    years: Sequence[int], colleges: Sequence[str] = university.college_codes
+) -> Dict[int, Dict[str, CollegeScores]]:
+    """
+    Sums each college's oddity and deviation scores over every major in each
+    year. Majors with plans for only one college are skipped.
+    """
+    series: Dict[int, Dict[str, CollegeScores]] = {
+        year: {college: CollegeScores(0, 0, 0) for college in colleges}
+        for year in years
+    }
+    for curricula in all_curricula(years, colleges):
+        if len(curricula.colleges) < 2:
+            continue
+        deviations = curricula.deviations()
+        scores = series[curricula.year]
+        for college in curricula.colleges:
+            majors, oddity, deviation_count = scores[college]
+            scores[college] = CollegeScores(
+                majors + 1,
+                oddity + curricula.oddity(college),
+                deviation_count + (college in deviations),
+            )
+    return series
+
+
+if __name__ == "__main__":
+    import csv
+    import sys
+
+    from util import parse_years
+
+    writer = csv.writer(sys.stdout)
+    writer.writerow(["Year", "College", "Majors", "Oddity", "Deviations"])
+    for year, scores in score_series(
+        parse_years(sys.argv[1]) if len(sys.argv) > 1 else plan_years()
+    ).items():
+        for college, (majors, oddity, deviations) in scores.items():
+            if majors > 0:
+                writer.writerow([year, college, majors, oddity, deviations])
@@ -3,31 +3,45 @@ Loads department codes and names from a JSON file saved from plans.ucsd.edu:
 https://plans.ucsd.edu/controller.php?action=LoadSearchControls
 
 Exports:
-    `departments`, a dictionary mapping from department codes to their names.
+    `departments`, which returns a dictionary mapping from department codes to
+    their names. The JSON file is only read the first time it's called.
 
     `dept_schools`, a dictionary mapping from department codes to the name of
     the school they're part of.
 """
 
+from functools import cached_property
 import json
 from typing import Dict, List
 
 __all__ = ["departments", "dept_schools"]
 
 
-departments: Dict[str, str] = {}
-with open("./files/LoadSearchControls.json") as controls:
-    for department in json.load(controls)["departments"]:
-        departments[department["code"]] = department["name"]
-# Add old department names
-# https://registrar.ucsd.edu/catalog/15-16/curric/JUDA-ug.html
-departments["JUDA"] = "Jewish Studies Program"
-# https://registrar.ucsd.edu/catalog/15-16/curric/TWS.html
-departments["TWS"] = "Third World Studies Program"
-# https://registrar.ucsd.edu/catalog/15-16/curric/FPM-ug.html
-departments["FPMU"] = "Undergraduate Program in Public Health"
-# https://registrar.ucsd.edu/catalog/15-16/curric/HDP.html
-departments["HDP"] = "Human Development Program"
+class _DepartmentCache:
+    @cached_property
+    def departments(self) -> Dict[str, str]:
+        departments: Dict[str, str] = {}
+        with open("./files/LoadSearchControls.json") as controls:
+            for department in json.load(controls)["departments"]:
+                departments[department["code"]] = department["name"]
+        # Add old department names
+        # https://registrar.ucsd.edu/catalog/15-16/curric/JUDA-ug.html
+        departments["JUDA"] = "Jewish Studies Program"
+        # https://registrar.ucsd.edu/catalog/15-16/curric/TWS.html
+        departments["TWS"] = "Third World Studies Program"
+        # https://registrar.ucsd.edu/catalog/15-16/curric/FPM-ug.html
+        departments["FPMU"] = "Undergraduate Program in Public Health"
+        # https://registrar.ucsd.edu/catalog/15-16/curric/HDP.html
+        departments["HDP"] = "Human Development Program"
+        return departments
+
+
+_cache = _DepartmentCache()
+
+
+def departments() -> Dict[str, str]:
+    return _cache.departments
+
 
 # List of school names: https://evc.ucsd.edu/about/Divisions%20and%20Schools.html
 _schools: Dict[str, List[str]] = {
@@ -99,7 +113,7 @@ for school, depts in _schools.items():
         dept_schools[department] = school
 
 if __name__ == "__main__":
-    for code, name in departments.items():
+    for code, name in departments().items():
         if code not in dept_schools:
             print(f"{code}: {name}")
-    # print(" ".join(departments.keys()))
+    # print(" ".join(departments().keys()))
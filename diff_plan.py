@@ -9,8 +9,8 @@ python3 college_ges.py <from> <to> [major] [college]
 import csv
 from difflib import SequenceMatcher
 import json
-from sys import argv, stdout
-from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+import sys
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
 from curricula_index import urls
 from departments import departments, dept_schools
 
@@ -127,9 +127,9 @@ def similarity(a: str, b: str) -> float:
     return SequenceMatcher(None, a.lower(), b.lower()).ratio()
 
 
-def diff(old: List[RawCourse], new: List[RawCourse]) -> DiffResults:
-    old_only = old.copy()
-    new_only = new.copy()
+def diff(old: Sequence[RawCourse], new: Sequence[RawCourse]) -> DiffResults:
+    old_only = list(old)
+    new_only = list(new)
     for course in old:
         if course in new_only:
             old_only.remove(course)
@@ -221,7 +221,7 @@ def diff_all(start: int, end: int) -> None:
                 major_plans(year + 1)[major].raw_plans[college],
             ).to_json()
             differences["year"] = year + 1
-            differences["url"] = urls.get((year + 1, major))
+            differences["url"] = urls().get((year + 1, major))
             if (
                 complexities[year, major, college]
                 != complexities[year + 1, major, college]
@@ -237,7 +237,7 @@ def diff_all(start: int, end: int) -> None:
     for year in range(start, end + 1):
         for major_code in major_plans(year).keys():
             major = f"{major_code} {major_codes()[major_code].name}"
-            department = departments[major_codes()[major_code].department]
+            department = departments()[major_codes()[major_code].department]
             school = dept_schools.get(major_codes()[major_code].department) or ""
             if school not in majors_by_dept:
                 majors_by_dept[school] = {}
@@ -253,7 +253,7 @@ def diff_all(start: int, end: int) -> None:
                         "changes": output,
                         "first": {
                             "year": first_year - 1,
-                            "url": urls.get((first_year - 1, major_code)),
+                            "url": urls().get((first_year - 1, major_code)),
                         },
                     }
     json.dump(
@@ -261,7 +261,7 @@ def diff_all(start: int, end: int) -> None:
             "diffs": majors_by_dept,
             "collegeNames": list(university.college_names.values()),
         },
-        stdout,
+        sys.stdout,
     )
 
 
@@ -273,14 +273,14 @@ if __name__ == "__main__":
     if os.name == "nt":
         os.system("color")
 
-    if len(argv) < 3:
+    if len(sys.argv) < 3:
         raise ValueError(
             "Need years: python3 college_ges.py <from> <to> [major] [college]"
         )
-    start = int(argv[1])
-    end = int(argv[2])
+    start = int(sys.argv[1])
+    end = int(sys.argv[2])
 
-    if len(argv) < 5:
+    if len(sys.argv) < 5:
         diff_all(start, end)
     else:
-        print_major_changes(start, end, *argv[1:3])
+        print_major_changes(start, end, *sys.argv[1:3])
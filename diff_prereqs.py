@@ -5,36 +5,57 @@ python3 diff_prereqs.py > reports/output/prereq-diffs-fragment.html
 python3 diff_prereqs.py timeline > reports/output/prereq-timeline-fragment.html
 """
 
-from typing import List, NamedTuple, Optional, Tuple, TypeVar, Union
+from functools import cached_property
+from typing import List, NamedTuple, Optional, Sequence, Tuple, TypeVar, Union
 from common_prereqs import parse_int
 from parse import prereqs, terms
-from parse_defs import CourseCode, Prerequisite, TermCode
+from parse_defs import CourseCode, Prerequisite, Requirements, TermCode
 
-Prereqs = List[List[Prerequisite]]
+Prereqs = Requirements
 
 T = TypeVar("T")
 
 
-def remove_duplicates(ls: List[T]) -> List[T]:
+def remove_duplicates(ls: Sequence[T]) -> List[T]:
     return [item for i, item in enumerate(ls) if item not in ls[0:i]]
 
 
-course_codes = sorted(
-    {course for term in terms() for course in prereqs(term).keys()},
-    key=lambda subject_code: (subject_code.subject, *parse_int(subject_code.number)),
-)
-# Ignore special and medical summer, which seems to often omit prereqs only for
-# them to be readded in fall
-term_codes = sorted(
-    term_code
-    for term_code in terms()
-    if term_code.quarter() != "S3" and term_code.quarter() != "SU"
-)
+class _DiffCache:
+    @cached_property
+    def course_codes(self) -> List[CourseCode]:
+        return sorted(
+            {course for term in terms() for course in prereqs(term).keys()},
+            key=lambda subject_code: (
+                subject_code.subject,
+                *parse_int(subject_code.number),
+            ),
+        )
+
+    @cached_property
+    def term_codes(self) -> List[TermCode]:
+        # Ignore special and medical summer, which seems to often omit prereqs
+        # only for them to be readded in fall
+        return sorted(
+            term_code
+            for term_code in terms()
+            if term_code.quarter() != "S3" and term_code.quarter() != "SU"
+        )
+
+
+_cache = _DiffCache()
+
+
+def course_codes() -> List[CourseCode]:
+    return _cache.course_codes
+
+
+def term_codes() -> List[TermCode]:
+    return _cache.term_codes
 
 
 def find_requirement_with_course(
-    prereqs: Prereqs, course_code: CourseCode
-) -> Optional[List[Prerequisite]]:
+    prereqs: Sequence[Tuple[Prerequisite, ...]], course_code: CourseCode
+) -> Optional[Tuple[Prerequisite, ...]]:
     for requirement in prereqs:
         for course, _ in requirement:
             if course == course_code:
@@ -91,25 +112,25 @@ def diff_prereqs(
             old_only.remove(old_req)
             new_only.remove(new_req)
 
-            old_req = old_req.copy()
-            new_req = new_req.copy()
+            removed = list(old_req)
+            added = list(new_req)
             unchanged: List[Prerequisite] = []
             flipped_concurrent: List[Prerequisite] = []
-            for prereq in old_req[:]:
-                if prereq in new_req:
-                    old_req.remove(prereq)
-                    new_req.remove(prereq)
+            for prereq in old_req:
+                if prereq in added:
+                    removed.remove(prereq)
+                    added.remove(prereq)
                     unchanged.append(prereq)
                     continue
-                for new_prereq in new_req:
+                for new_prereq in added:
                     if new_prereq.course_code == prereq.course_code:
-                        old_req.remove(prereq)
-                        new_req.remove(new_prereq)
+                        removed.remove(prereq)
+                        added.remove(new_prereq)
                         flipped_concurrent.append(new_prereq)
                         break
-            changes.append(Change(unchanged, flipped_concurrent, old_req, new_req))
+            changes.append(Change(unchanged, flipped_concurrent, removed, added))
             break
-    return Changed(term, new_only, old_only, changes)
+    return Changed(term, tuple(new_only), tuple(old_only), changes)
 
 
 class History(NamedTuple):
@@ -121,22 +142,24 @@ class History(NamedTuple):
 
 
 def get_history(course_code: CourseCode) -> History:
-    prereq_history = [
+    prereq_history: List[Tuple[TermCode, Optional[Prereqs]]] = [
         (
             term_code,
             (
-                remove_duplicates(
-                    [
-                        remove_duplicates(req)
-                        for req in prereqs(term_code)[course_code]
-                        if req
-                    ]
+                tuple(
+                    remove_duplicates(
+                        [
+                            tuple(remove_duplicates(req))
+                            for req in prereqs(term_code)[course_code]
+                            if req
+                        ]
+                    )
                 )
                 if course_code in prereqs(term_code)
                 else None
             ),
         )
-        for term_code in term_codes
+        for term_code in term_codes()
     ]
     diffs: List[Diff] = []
     for i, (term_code, reqs) in enumerate(prereq_history):
@@ -154,12 +177,12 @@ def get_history(course_code: CourseCode) -> History:
 
 
 def get_changed_courses() -> List[History]:
-    return [get_history(course_code) for course_code in course_codes]
+    return [get_history(course_code) for course_code in course_codes()]
 
 
 def print_prereq_diff(course_id: str, diff: Diff) -> None:
     if isinstance(diff, NewCourse):
-        if diff.term != term_codes[0]:
+        if diff.term != term_codes()[0]:
             print(f'<h3 id="{course_id}-{diff.term.lower()}">{diff.term}</h3>')
             if diff.prereqs:
                 print("<p>Course introduced requiring:</p>")
@@ -282,14 +305,14 @@ def print_timeline() -> None:
     changed_courses = get_changed_courses()
 
     terms = " ".join(
-        f'<a href="#{term_code.lower()}">{term_code}</a>' for term_code in term_codes
+        f'<a href="#{term_code.lower()}">{term_code}</a>' for term_code in term_codes()
     )
     print(f"<p>Jump to: {terms}</p>")
 
     # Skip first term because we assume FA12 is when the prereqs have always
     # existed (it won't print the first time a course's prereqs are added to
     # ISIS)
-    for term_code in term_codes[1:]:
+    for term_code in term_codes()[1:]:
         changed = [
             (course_code, diff)
             for course_code, _, _, diffs, _ in changed_courses
@@ -2,58 +2,202 @@
 python3 dump_graphs.py json
 python3 dump_graphs.py html > reports/output/plan-editor-index.html
 python3 dump_graphs.py files
+python3 dump_graphs.py files deltas  # One prereqs/deltas.json instead of a file per term
+python3 dump_graphs.py files --jobs 1  # Don't use worker processes
 """
 
 import json
+import multiprocessing
 import os
 import re
 import sys
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple, TypedDict
 from urllib.parse import urlencode
 from departments import departments, dept_schools
 from output import MajorOutput
-from parse import major_codes, major_plans, prereqs, terms
+from parse import major_codes, major_plans, plan_years, prereqs, terms
+from parse_defs import Requirements
 from university import university
 
+JsonPrereqs = Dict[str, List[List[str]]]
+
+
+class PrereqDeltas(TypedDict):
+    """
+    The prereqs of every term, stored as the first term's prereqs followed by
+    only the courses that changed in each term after it. Most courses'
+    prereqs don't change from term to term, so this is much smaller than a
+    file per term. Use `prereqs_at_term` (or `prereqsAtTerm` in
+    reports/util/Prereqs.ts) to get a term's prereqs.
+    """
+
+    terms: List[str]
+    base: JsonPrereqs
+    """
+    The prereqs of `terms[0]`.
+    """
+    deltas: List[Dict[str, Optional[List[List[str]]]]]
+    """
+    `deltas[i]` maps courses whose prereqs changed between `terms[i]` and
+    `terms[i + 1]` to their new prereqs, or None if the course was removed.
+    """
+
+
+def requirements_json(reqs: Requirements) -> List[List[str]]:
+    return [[repr(alt) for alt in req] for req in reqs]
+
+
+def prereq_deltas() -> PrereqDeltas:
+    all_terms = terms()
+    base = prereqs(all_terms[0])
+    deltas: List[Dict[str, Optional[List[List[str]]]]] = []
+    previous = base
+    for term in all_terms[1:]:
+        current = prereqs(term)
+        delta: Dict[str, Optional[List[List[str]]]] = {}
+        for course_code, reqs in current.items():
+            # Unchanged prereqs are usually the same shared tuple
+            old_reqs = previous.get(course_code)
+            if old_reqs is not reqs and old_reqs != reqs:
+                delta[str(course_code)] = requirements_json(reqs)
+        for course_code in previous.keys() - current.keys():
+            delta[str(course_code)] = None
+        deltas.append(delta)
+        previous = current
+    return {
+        "terms": list(all_terms),
+        "base": {
+            str(course_code): requirements_json(reqs)
+            for course_code, reqs in base.items()
+        },
+        "deltas": deltas,
+    }
+
+
+def prereqs_at_term(snapshots: PrereqDeltas, term: str) -> JsonPrereqs:
+    """
+    Reconstructs the prereqs of a term from a `PrereqDeltas`, in the same
+    format as the per-term files in plan_csvs/prereqs/.
+    """
+    index = snapshots["terms"].index(term)
+    courses = {**snapshots["base"]}
+    for delta in snapshots["deltas"][0:index]:
+        for course_code, reqs in delta.items():
+            if reqs is None:
+                del courses[course_code]
+            else:
+                courses[course_code] = reqs
+    return courses
+
+
+def write_if_changed(path: str, content: str) -> bool:
+    """
+    Writes `content` to `path` unless the file already has exactly that
+    content, so unchanged files aren't touched and don't show up as modified
+    in the ucsd-degree-plans repo. Returns whether the file was written.
+    """
+    try:
+        with open(path, newline="") as file:
+            if file.read() == content:
+                return False
+    except FileNotFoundError:
+        pass
+    with open(path, "w", newline="") as file:
+        file.write(content)
+    return True
 
-def render_plan_files() -> None:
-    min_year = 2015
-    max_year = min_year
-    for year in range(min_year, 2050):
-        all_plans = major_plans(year)
-        if all_plans == {}:
-            break
-        max_year = year
-        for major_code, major_plan in all_plans.items():
-            output = MajorOutput(major_plan)
-            os.makedirs(f"./plan_csvs/{year}/{major_code}/", exist_ok=True)
-            with open(
-                f"./plan_csvs/{year}/{major_code}/{year}_{major_code}.csv",
-                "w",
-            ) as file:
-                file.write(output.output())
-            for college in university.college_codes:
-                if college in major_plan.colleges:
-                    with open(
-                        f"./plan_csvs/{year}/{major_code}/{year}_{major_code}_{college}.csv",
-                        "w",
-                    ) as file:
-                        file.write(output.output(college))
 
+def write_prereq_files(deltas: bool = False) -> Tuple[int, int]:
+    """
+    Writes the prereqs of every term to plan_csvs/prereqs/. Returns how many
+    files were changed and how many were already up to date.
+    """
     os.makedirs(f"./plan_csvs/prereqs/", exist_ok=True)
+    if deltas:
+        changed = write_if_changed(
+            "./plan_csvs/prereqs/deltas.json",
+            json.dumps(prereq_deltas(), separators=(",", ":")),
+        )
+        return (1, 0) if changed else (0, 1)
+    changed = 0
     for term in terms():
-        with open(f"./plan_csvs/prereqs/{term}.json", "w") as file:
-            for i, (course_code, reqs) in enumerate(prereqs(term).items()):
-                file.write("{ " if i == 0 else ", ")
-                json.dump(str(course_code), file)
-                file.write(": ")
-                json.dump(
-                    [[repr(alt) for alt in req] for req in reqs],
-                    file,
-                )
-                file.write("\n")
-            file.write("}\n")
+        lines = [
+            ("{ " if i == 0 else ", ")
+            + json.dumps(str(course_code))
+            + ": "
+            + json.dumps(requirements_json(reqs))
+            + "\n"
+            for i, (course_code, reqs) in enumerate(prereqs(term).items())
+        ]
+        if write_if_changed(f"./plan_csvs/prereqs/{term}.json", "".join(lines) + "}\n"):
+            changed += 1
+    return changed, len(terms()) - changed
+
+
+def _write_major_files(task: Tuple[int, str]) -> Tuple[int, int]:
+    """
+    Writes a major's curriculum and degree plan CSVs for a year, returning how
+    many files were changed and how many were already up to date.
+    """
+    year, major_code = task
+    major_plan = major_plans(year)[major_code]
+    output = MajorOutput(major_plan)
+    os.makedirs(f"./plan_csvs/{year}/{major_code}/", exist_ok=True)
+    files = [(f"./plan_csvs/{year}/{major_code}/{year}_{major_code}.csv", None)] + [
+        (f"./plan_csvs/{year}/{major_code}/{year}_{major_code}_{college}.csv", college)
+        for college in university.college_codes
+        if college in major_plan.colleges
+    ]
+    changed = 0
+    for path, college in files:
+        if write_if_changed(path, output.output(college)):
+            changed += 1
+    return changed, len(files) - changed
+
 
+def render_plan_files(deltas: bool = False, jobs: Optional[int] = None) -> None:
+    """
+    Writes the plan CSVs and prereqs that the plan graph fetches to
+    plan_csvs/. If `deltas` is true, the prereqs of every term are written to
+    prereqs/deltas.json (see `PrereqDeltas`) instead of a file per term.
+
+    Files whose content hasn't changed are left alone. The CSVs are made in
+    `jobs` forked worker processes (one per CPU by default), which inherit the
+    plans and prereqs parsed here. How many files changed is printed to
+    stderr.
+    """
+    years = plan_years()
+    min_year = 2015
+    max_year = years[-1] if years else min_year
+    tasks: List[Tuple[int, str]] = []
+    for year in years:
+        # Parse every major now rather than in each worker
+        for major_code, _ in major_plans(year).items():
+            tasks.append((year, major_code))
+    for term in terms():
+        prereqs(term)
+    major_codes()
+
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    # Worker processes (e.g. from build_reports.py) can't start their own
+    if jobs > 1 and not multiprocessing.current_process().daemon:
+        with multiprocessing.get_context("fork").Pool(jobs) as pool:
+            results = pool.map(_write_major_files, tasks, chunksize=8)
+    else:
+        results = [_write_major_files(task) for task in tasks]
+    changed = sum(changed for changed, _ in results)
+    unchanged = sum(unchanged for _, unchanged in results)
+
+    prereqs_changed, prereqs_unchanged = write_prereq_files(deltas)
+    changed += prereqs_changed
+    unchanged += prereqs_unchanged
+    print(
+        f"plan_csvs/: {changed} files changed, {unchanged} unchanged",
+        file=sys.stderr,
+    )
+
+    # Always written so make knows plan_csvs/ is up to date
     with open("./plan_csvs/metadata.json", "w") as file:
         json.dump(
             {
@@ -70,11 +214,8 @@ def render_plan_files() -> None:
 
 def render_plan_json() -> None:
     plan_jsons: Dict[str, str] = {}
-    for year in range(2015, 2050):
-        all_plans = major_plans(year)
-        if all_plans == {}:
-            break
-        for major_code, major_plan in all_plans.items():
+    for year in plan_years():
+        for major_code, major_plan in major_plans(year).items():
             output = MajorOutput(major_plan)
             for college in university.college_codes:
                 if college in major_plan.colleges:
@@ -98,13 +239,10 @@ def escape_html(string: str) -> str:
 def render_plan_urls() -> None:
     qs_by_dept: Dict[str, Dict[str, Dict[str, Dict[int, List[Tuple[str, str]]]]]] = {}
     years: List[int] = []
-    for year in range(2015, 2050):
-        all_plans = major_plans(year)
-        if all_plans == {}:
-            break
+    for year in plan_years():
         years.insert(0, year)
-        for major_code, major_plan in all_plans.items():
-            department = departments[major_codes()[major_code].department]
+        for major_code, major_plan in major_plans(year).items():
+            department = departments()[major_codes()[major_code].department]
             school = dept_schools.get(major_codes()[major_code].department) or ""
             if school not in qs_by_dept:
                 qs_by_dept[school] = {}
@@ -125,10 +263,8 @@ def render_plan_urls() -> None:
     titles = json.dumps(
         {
             f"{major_code}.{college}": f"{major_code} ({university.college_names[college]}, !YEAR!): {major_codes()[major_code].name}"
-            for year in range(2015, 2050)
-            for all_plans in (major_plans(year),)
-            if all_plans != {}
-            for major_code, major_plan in all_plans.items()
+            for year in plan_years()
+            for major_code, major_plan in major_plans(year).items()
             for college in university.college_codes
             if college in major_plan.colleges
         }
@@ -204,6 +340,13 @@ if __name__ == "__main__":
     if sys.argv[1] == "json":
         render_plan_json()
     elif sys.argv[1] == "files":
-        render_plan_files()
+        render_plan_files(
+            "deltas" in sys.argv[2:],
+            (
+                int(sys.argv[sys.argv.index("--jobs") + 1])
+                if "--jobs" in sys.argv
+                else None
+            ),
+        )
     else:
         render_plan_urls()
@@ -3,17 +3,22 @@ python3 dump_plans.py 2022 json
 python3 dump_plans.py 2022 html > reports/output/plan-editor-index.html
 """
 
+import base64
 import json
 import sys
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import urlencode
+import zlib
 from departments import departments, dept_schools
 from parse import major_codes, major_plans
 from parse_defs import ProcessedCourse
 from university import university
 
+PLAN_RAW = 0
+PLAN_DEFLATED = 1
 
-def to_json(courses: List[ProcessedCourse]):
+
+def to_json(courses: List[ProcessedCourse]) -> List[Tuple[str, float, int, int]]:
     return [
         (
             course.course_title,
@@ -25,6 +30,66 @@ def to_json(courses: List[ProcessedCourse]):
     ]
 
 
+def _write_varint(value: int, output: bytearray) -> None:
+    while value >= 0x80:
+        output.append(value & 0x7F | 0x80)
+        value >>= 7
+    output.append(value)
+
+
+def encode_plan(courses: List[Tuple[str, float, int, int]]) -> Optional[str]:
+    """
+    Encodes the courses from `to_json` for the `plan` URL parameter of the plan
+    editor, which is several times shorter than the JSON. `decodePlan` in
+    reports/plan-editor/save-to-url.ts decodes it.
+
+    The bytes are a list of distinct course titles, then for each course, the
+    index of its title, its units (in quarter units) and requirement type
+    packed together, and its term index, all as varints. Titles are UTF-8 and
+    prefixed with their length. If deflating makes it shorter, the bytes are
+    deflated. A byte at the start says whether they are, and the result is
+    base64url-encoded without padding.
+
+    Returns None if a course's units aren't a multiple of a quarter unit.
+    """
+    titles: Dict[str, int] = {}
+    for title, *_ in courses:
+        if title not in titles:
+            titles[title] = len(titles)
+    output = bytearray()
+    _write_varint(len(titles), output)
+    for title in titles:
+        encoded = title.encode("utf-8")
+        _write_varint(len(encoded), output)
+        output += encoded
+    _write_varint(len(courses), output)
+    for title, units, requirement, term in courses:
+        if units * 4 % 1 != 0:
+            return None
+        _write_varint(titles[title], output)
+        _write_varint(int(units * 4) << 2 | requirement, output)
+        _write_varint(term, output)
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -15)
+    deflated = compressor.compress(output) + compressor.flush()
+    payload = (
+        bytes([PLAN_DEFLATED]) + deflated
+        if len(deflated) < len(output)
+        else bytes([PLAN_RAW]) + output
+    )
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def plan_params(courses: List[Tuple[str, float, int, int]]) -> Dict[str, str]:
+    """
+    The URL parameters for a plan's courses: `plan` if it can be encoded,
+    otherwise the JSON in `courses`.
+    """
+    encoded = encode_plan(courses)
+    if encoded is None:
+        return {"courses": json.dumps(courses, separators=(",", ":"))}
+    return {"plan": encoded}
+
+
 def dump_plans(year: int) -> None:
     all_plans = major_plans(year)
     with open("./reports/output/plans.json", "w") as file:
@@ -69,7 +134,7 @@ def render_plan_urls(year: int) -> None:
     qs_by_dept: Dict[str, Dict[str, Dict[str, Dict[str, Optional[str]]]]] = {}
     for major_code, major_plan in all_plans.items():
         major_info = major_codes()[major_code]
-        department = departments[major_codes()[major_code].department]
+        department = departments()[major_codes()[major_code].department]
         school = dept_schools.get(major_codes()[major_code].department) or ""
         if school not in qs_by_dept:
             qs_by_dept[school] = {}
@@ -92,10 +157,7 @@ def render_plan_urls(year: int) -> None:
                             if major_info.award_types
                             else "BS"
                         ),
-                        "courses": json.dumps(
-                            to_json(major_plan.plan(college_code)),
-                            separators=(",", ":"),
-                        ),
+                        **plan_params(to_json(major_plan.plan(college_code))),
                     }
                 )
                 if college_code in major_plan.colleges
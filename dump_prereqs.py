@@ -1,15 +1,21 @@
 """
 python3 dump_prereqs.py FA22
 python3 dump_prereqs.py FA22 table > files/blocked.csv
+python3 dump_prereqs.py FA22 shards [ids]
 """
 
+import glob
 import json
+import os
 import sys
-from typing import Dict, List, Set
+from typing import Dict, Set
 from parse import prereqs
-from parse_defs import CourseCode, Prerequisite
+from parse_defs import CourseCode, Requirements
+from util import partition
 
-Prereqs = Dict[CourseCode, List[List[Prerequisite]]]
+SHARDS_DIR = "./reports/output/prereqs/"
+
+Prereqs = Dict[CourseCode, Requirements]
 
 
 def dump_prereqs(all_reqs: Prereqs) -> None:
@@ -28,7 +34,72 @@ def dump_prereqs(all_reqs: Prereqs) -> None:
         )
 
 
-def prereqs_satisfied(taken: Set[CourseCode], reqs: List[List[Prerequisite]]) -> bool:
+def dump_prereq_shards(all_reqs: Prereqs, ids: bool = False) -> None:
+    """
+    Splits prereqs.json into a file per subject in reports/output/prereqs/,
+    along with a manifest.json listing every course code, so a report can fetch
+    only the subjects it needs (see `PrereqShards` in reports/util/Prereqs.ts).
+
+    The manifest's `courses` starts with the `catalog_size` courses that have
+    prereqs listed, followed by courses that only appear as prereqs. If `ids`
+    is true, the shards refer to courses by their index in `courses` and are
+    lists of `[course, prereqs]` pairs instead of objects.
+    """
+    catalog = sorted(all_reqs.keys())
+    referenced = sorted(
+        {alt.course_code for reqs in all_reqs.values() for req in reqs for alt in req}
+        - all_reqs.keys()
+    )
+    courses = catalog + referenced
+    course_ids = {course_code: i for i, course_code in enumerate(courses)}
+
+    os.makedirs(SHARDS_DIR, exist_ok=True)
+    for path in glob.glob(os.path.join(SHARDS_DIR, "*.json")):
+        os.remove(path)
+    subjects = partition((course_code.subject, course_code) for course_code in catalog)
+    for subject, course_codes in subjects.items():
+        with open(os.path.join(SHARDS_DIR, f"{subject}.json"), "w") as file:
+            if ids:
+                json.dump(
+                    [
+                        [
+                            course_ids[course_code],
+                            [
+                                [course_ids[alt.course_code] for alt in req]
+                                for req in all_reqs[course_code]
+                            ],
+                        ]
+                        for course_code in course_codes
+                    ],
+                    file,
+                    separators=(",", ":"),
+                )
+            else:
+                json.dump(
+                    {
+                        str(course_code): [
+                            [str(alt.course_code) for alt in req]
+                            for req in all_reqs[course_code]
+                        ]
+                        for course_code in course_codes
+                    },
+                    file,
+                    separators=(",", ":"),
+                )
+    with open(os.path.join(SHARDS_DIR, "manifest.json"), "w") as file:
+        json.dump(
+            {
+                "ids": ids,
+                "courses": [str(course_code) for course_code in courses],
+                "catalog_size": len(catalog),
+                "subjects": list(subjects.keys()),
+            },
+            file,
+            separators=(",", ":"),
+        )
+
+
+def prereqs_satisfied(taken: Set[CourseCode], reqs: Requirements) -> bool:
     for req in reqs:
         for alt in req:
             if alt.course_code in taken:
@@ -62,5 +133,7 @@ def blocking_table(all_reqs: Prereqs) -> None:
 if __name__ == "__main__":
     if len(sys.argv) > 2 and sys.argv[2] == "table":
         blocking_table(prereqs(sys.argv[1]))
+    elif len(sys.argv) > 2 and sys.argv[2] == "shards":
+        dump_prereq_shards(prereqs(sys.argv[1]), "ids" in sys.argv[3:])
     else:
         dump_prereqs(prereqs(sys.argv[1]))
@@ -1,13 +1,27 @@
 """
 python3 units_per_course.py json > units_per_course.json
 python3 flag_issues.py 2024 > files/flagged_issues.html
+python3 flag_issues.py 2019-2024 csv > files/flagged_issues.csv
+python3 flag_issues.py 2019-2024 counts  # Issues per category for each year
+python3 flag_issues.py 2019-2024 json --jobs 2
+
+Each year is checked in its own worker process (one per CPU by default). The
+JSON and CSV formats list every issue as a row of year, major, college,
+category, course, and message; the HTML report is rendered from the same rows.
 """
 
+import csv
+from functools import cached_property
 import json
-from typing import Dict, List, Set
-from parse import major_plans, prereqs
+import multiprocessing
+import os
+import sys
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, TextIO, Tuple
+from parse import major_plans
 from parse_defs import CourseCode, ProcessedCourse
+from plan_checker import PlanChecker
 from university import university
+from util import parse_years
 
 GES = {
     "RE": [
@@ -74,36 +88,53 @@ ALLOW_DUPLICATES = [
     CourseCode("TDPR", "6"),
 ]
 
-with open("./units_per_course.json") as file:
-    consensus_units: Dict[CourseCode, float] = {
-        CourseCode(*course_code.split(" ")): units
-        for course_code, units in json.load(file).items()
-    }
+
+class _UnitsCache:
+    @cached_property
+    def consensus_units(self) -> Dict[CourseCode, float]:
+        with open("./units_per_course.json") as file:
+            return {
+                CourseCode(*course_code.split(" ")): units
+                for course_code, units in json.load(file).items()
+            }
+
+
+_cache = _UnitsCache()
 
 
-class Issues:
-    multiple_options: List[str]
-    duplicate_courses: List[str]
-    missing_ges: List[str]
-    wrong_units: List[str]
-    miscategorized_courses: List[str]
-    curriculum_deviances: List[str]
-    early_upper_division: List[str]
-    missing_prereqs: List[str]
-    dne: List[str]
-    missing_major: List[str]
-
-    def __init__(self) -> None:
-        self.multiple_options = []
-        self.duplicate_courses = []
-        self.missing_ges = []
-        self.wrong_units = []
-        self.miscategorized_courses = []
-        self.curriculum_deviances = []
-        self.early_upper_division = []
-        self.missing_prereqs = []
-        self.dne = []
-        self.missing_major = []
+def consensus_units() -> Dict[CourseCode, float]:
+    """
+    Maps course codes to their most common unit count, from
+    `units_per_course.json`. The file is only read the first time it's called.
+    """
+    return _cache.consensus_units
+
+
+CATEGORIES = {
+    "missing_major": "Missing plans",
+    "wrong_units": "Wrong unit numbers",
+    "missing_prereqs": "Missing prerequisites",
+    "miscategorized_courses": "College GE courses marked as major/department courses",
+    "missing_ges": "Missing college GE",
+    "duplicate_courses": "Duplicate courses",
+    "dne": "Nonexistent courses",
+    "early_upper_division": "Upper division courses taken before junior year",
+    "multiple_options": "Courses with multiple options listed multiple times",
+    "curriculum_deviances": "Course names marked as for the major not present in other colleges' curricula",
+}
+"""
+Maps issue categories to their headings, in the order they're listed in the
+HTML report.
+"""
+
+
+class Issue(NamedTuple):
+    year: int
+    major: str
+    college: str
+    category: str
+    course: Optional[CourseCode]
+    message: str
 
 
 def check_plan(
@@ -112,30 +143,37 @@ def check_plan(
     curriculum: Set[str],
     plan: List[ProcessedCourse],
     college: str,
-    issues: Issues,
+    issues: List[Issue],
 ) -> None:
-    course_codes = [course.course_code for course in plan if course.course_code]
+    def flag(category: str, course: Optional[CourseCode], message: str) -> None:
+        issues.append(Issue(year, name, college, category, course, message))
+
+    consensus = consensus_units()
+    checker = PlanChecker(year, plan)
     courses = {course.course_code: course for course in plan if course.course_code}
-    for i, code in enumerate(course_codes):
-        if code in course_codes[0:i]:
-            title = courses[code].raw.course_title
-            if any(char in title for char in ["/", "or", "OR", "-"]):
-                issues.multiple_options.append(
-                    f"[{name}] “{title}” is listed multiple times and has multiple options; assuming {code} each time"
-                )
-            elif code not in ALLOW_DUPLICATES:
-                issues.duplicate_courses.append(
-                    f"[{name}] duplicate course {code} “{title}”"
-                )
+    for code in checker.duplicates():
+        title = courses[code].raw.course_title
+        if any(char in title for char in ["/", "or", "OR", "-"]):
+            flag(
+                "multiple_options",
+                code,
+                f"[{name}] “{title}” is listed multiple times and has multiple options; assuming {code} each time",
+            )
+        elif code not in ALLOW_DUPLICATES:
+            flag(
+                "duplicate_courses", code, f"[{name}] duplicate course {code} “{title}”"
+            )
     for code in GES[college]:
         # Hack for PHIL/POLI commutativity
-        if code.subject == "POLI" and code not in course_codes:
+        if code.subject == "POLI" and code not in checker.course_codes:
             code = CourseCode("PHIL", code.number)
-        if code not in course_codes:
-            issues.missing_ges.append(f"[{name}] Missing writing course {code}")
+        if code not in checker.course_codes:
+            flag("missing_ges", code, f"[{name}] Missing writing course {code}")
         elif courses[code].raw.type != "COLLEGE":
-            issues.miscategorized_courses.append(
-                f"[{name}] “{courses[code].raw.course_title}” is a college writing course but is marked as a major requirement"
+            flag(
+                "miscategorized_courses",
+                code,
+                f"[{name}] “{courses[code].raw.course_title}” is a college writing course but is marked as a major requirement",
             )
     for course in plan:
         # Course title must match to exclude split lab courses
@@ -143,25 +181,33 @@ def check_plan(
             course.units != course.raw.units
             and course.course_title == course.raw.course_title
         ):
-            issues.wrong_units.append(
-                f"[{name}] {course.course_code} (from “{course.raw.course_title}”) should be {course.units} units but is {course.raw.units} units"
+            flag(
+                "wrong_units",
+                course.course_code,
+                f"[{name}] {course.course_code} (from “{course.raw.course_title}”) should be {course.units} units but is {course.raw.units} units",
             )
         elif (
-            course.course_code in consensus_units
-            and consensus_units[course.course_code] != course.units
+            course.course_code in consensus
+            and consensus[course.course_code] != course.units
         ):
-            issues.wrong_units.append(
-                f"[{name}] {course.course_code} (from “{course.raw.course_title}”) should be {consensus_units[course.course_code]} units but is {course.units} units"
+            flag(
+                "wrong_units",
+                course.course_code,
+                f"[{name}] {course.course_code} (from “{course.raw.course_title}”) should be {consensus[course.course_code]} units but is {course.units} units",
             )
         # if course.course_title in curriculum:
         #     if not course.for_major:
-        #         issues.miscategorized_courses.append(
+        #         flag(
+        #             "miscategorized_courses",
+        #             course.course_code,
         #             f"[{name}] Curriculum course “{course.course_title}” marked as GE"
         #         )
         # else:
         #     if course.for_major:
-        #         issues.curriculum_deviances.append(
-        #             f"[{name}] “{course.raw.course_title}” differs from curriculum"
+        #         flag(
+        #             "curriculum_deviances",
+        #             course.course_code,
+        #             f"[{name}] “{course.raw.course_title}” differs from curriculum",
         #         )
         if (
             course.term_index < 6
@@ -169,67 +215,54 @@ def check_plan(
             and course.course_code.parts()[1] >= 100
         ):
             quarter = ["fall", "winter", "spring"][course.term_index % 3]
-            issues.early_upper_division.append(
-                f"[{name}] “{course.raw.course_title}” is taken in year {course.term_index // 3 + 1} {quarter} quarter"
+            flag(
+                "early_upper_division",
+                course.course_code,
+                f"[{name}] “{course.raw.course_title}” is taken in year {course.term_index // 3 + 1} {quarter} quarter",
             )
-        if course.course_code and course.course_code not in ASSUMED_SATISFIED:
-            reqs = prereqs(university.get_term_code(year, course.term_index)).get(
-                course.course_code
+    for course, course_code, reqs, missing in checker.check_prereqs(ASSUMED_SATISFIED):
+        if reqs is None:
+            # Eighth CCE courses don't exist yet
+            if course_code.subject != "CCE":
+                flag(
+                    "dne",
+                    course_code,
+                    f"[{name}] {course_code} (from “{course.raw.course_title}”) does not exist",
+                )
+        for req in missing:
+            or_group = " or ".join(str(alt.course_code) for alt in req)
+            flag(
+                "missing_prereqs",
+                course_code,
+                f"[{name}] {course_code} (from “{course.raw.course_title}”) is missing prereq {or_group}",
             )
-            if reqs is None:
-                # Eighth CCE courses don't exist yet
-                if course.course_code.subject != "CCE":
-                    issues.dne.append(
-                        f"[{name}] {course.course_code} (from “{course.raw.course_title}”) does not exist"
-                    )
-            else:
-                taken = [
-                    past_course.course_code
-                    for past_course in plan
-                    if past_course.course_code
-                    and past_course.term_index < course.term_index
-                ]
-                taking = [
-                    curr_course.course_code
-                    for curr_course in plan
-                    if curr_course.course_code
-                    and curr_course.term_index == course.term_index
-                ]
-                for req in reqs:
-                    if not req:
-                        continue
-                    for alt in req:
-                        if (
-                            alt.course_code in taken
-                            or alt.allow_concurrent
-                            and alt.course_code in taking
-                        ):
-                            break
-                    else:
-                        or_group = " or ".join(str(alt.course_code) for alt in req)
-                        issues.missing_prereqs.append(
-                            f"[{name}] {course.course_code} (from “{course.raw.course_title}”) is missing prereq {or_group}"
-                        )
-
-
-def print_issues(issues: List[str], description: str) -> None:
-    if not issues:
-        return
-    print(f"<h2>{description}</h2>")
-    for issue in issues:
-        print(f"<p>{issue}</p>")
-    print()
 
 
-def main(year: int, length: int = 4) -> None:
-    for college_code, college_name in university.college_names.items():
-        issues = Issues()
-        for major_code, plans in major_plans(year, length).items():
+def check_year(year: int, length: int = 4) -> List[Issue]:
+    """
+    Checks every major's plans for a year. Issues are listed major by major.
+    """
+    issues: List[Issue] = []
+    for major_code, plans in major_plans(year, length).items():
+        curriculum: Set[str] = (
+            {course.course_title for course in plans.curriculum()}
+            if plans.colleges
+            else set()
+        )
+        for college_code in university.college_names.keys():
             if college_code not in plans.colleges:
                 if not major_code.startswith("UN"):
-                    issues.missing_major.append(f"Missing plan for major {major_code}")
+                    issues.append(
+                        Issue(
+                            year,
+                            major_code,
+                            college_code,
+                            "missing_major",
+                            None,
+                            f"Missing plan for major {major_code}",
+                        )
+                    )
                 continue
-            curriculum = {course.course_title for course in plans.curriculum()}
             check_plan(
                 year,
                 major_code,
@@ -238,39 +271,132 @@ def main(year: int, length: int = 4) -> None:
                 college_code,
                 issues,
             )
+    return issues
 
-        print(f"<h1>{college_name}</h1>")
-        print_issues(issues.missing_major, "Missing plans")
-        print_issues(issues.wrong_units, "Wrong unit numbers")
-        print_issues(issues.missing_prereqs, "Missing prerequisites")
-        print_issues(
-            issues.miscategorized_courses,
-            "College GE courses marked as major/department courses",
-        )
-        print_issues(issues.missing_ges, "Missing college GE")
-        print_issues(issues.duplicate_courses, "Duplicate courses")
-        print_issues(
-            issues.dne,
-            "Nonexistent courses",
-        )
-        print_issues(
-            issues.early_upper_division,
-            "Upper division courses taken before junior year",
-        )
-        print_issues(
-            issues.multiple_options,
-            "Courses with multiple options listed multiple times",
-        )
-        print_issues(
-            issues.curriculum_deviances,
-            "Course names marked as for the major not present in other colleges' curricula",
+
+def _check_year(args: Tuple[int, int]) -> List[Issue]:
+    return check_year(*args)
+
+
+def check_years(
+    years: Sequence[int], length: int = 4, jobs: Optional[int] = None
+) -> List[Issue]:
+    """
+    Checks each year in `jobs` forked worker processes (one per CPU by
+    default), returning their issues in the order of `years`.
+    """
+    # Read units_per_course.json once for the workers to inherit
+    consensus_units()
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(years))
+    tasks = [(year, length) for year in years]
+    # Worker processes (e.g. from build_reports.py) can't start their own
+    if jobs > 1 and not multiprocessing.current_process().daemon:
+        with multiprocessing.get_context("fork").Pool(jobs) as pool:
+            results = pool.map(_check_year, tasks)
+    else:
+        results = [_check_year(task) for task in tasks]
+    return [issue for issues in results for issue in issues]
+
+
+def print_issues(issues: List[str], description: str) -> None:
+    if not issues:
+        return
+    print(f"<h2>{description}</h2>")
+    for issue in issues:
+        print(f"<p>{issue}</p>")
+    print()
+
+
+def render_html(years: Sequence[int], issues: List[Issue]) -> None:
+    """
+    Prints the issues grouped by college and category. If there are multiple
+    years, each college gets a section per year.
+    """
+    grouped: Dict[Tuple[int, str, str], List[str]] = {}
+    for issue in issues:
+        key = issue.year, issue.college, issue.category
+        if key not in grouped:
+            grouped[key] = []
+        grouped[key].append(issue.message)
+
+    print("<style>p { margin: 0; white-space: pre-wrap; }</style>")
+    for year in years:
+        for college_code, college_name in university.college_names.items():
+            if len(years) > 1:
+                print(f"<h1>{college_name} ({year})</h1>")
+            else:
+                print(f"<h1>{college_name}</h1>")
+            for category, description in CATEGORIES.items():
+                print_issues(
+                    grouped.get((year, college_code, category), []), description
+                )
+
+
+def _issue_row(issue: Issue) -> Dict[str, object]:
+    return {
+        **issue._asdict(),
+        "course": str(issue.course) if issue.course else None,
+    }
+
+
+def write_json(issues: List[Issue], file: TextIO) -> None:
+    json.dump([_issue_row(issue) for issue in issues], file, indent="\t")
+    file.write("\n")
+
+
+def write_csv(issues: List[Issue], file: TextIO) -> None:
+    writer = csv.writer(file)
+    writer.writerow(Issue._fields)
+    for issue in issues:
+        writer.writerow(
+            [value if value is not None else "" for value in _issue_row(issue).values()]
         )
 
 
-if __name__ == "__main__":
-    import sys
+def write_counts(years: Sequence[int], issues: List[Issue], file: TextIO) -> None:
+    """
+    Writes a CSV of how many issues of each category there are per year, for
+    seeing how they trend across catalog years.
+    """
+    counts: Dict[Tuple[int, str], int] = {}
+    for issue in issues:
+        key = issue.year, issue.category
+        counts[key] = counts.get(key, 0) + 1
+    writer = csv.writer(file)
+    writer.writerow(["year", *CATEGORIES.keys(), "total"])
+    for year in years:
+        row = [counts.get((year, category), 0) for category in CATEGORIES.keys()]
+        writer.writerow([year, *row, sum(row)])
+
+
+def main(year: int, length: int = 4) -> None:
+    render_html([year], check_year(year, length))
 
+
+if __name__ == "__main__":
     if len(sys.argv) < 2:
-        raise ValueError("Need year: python3 courses_req_by_majors.py <year>")
-    print("<style>p { margin: 0; white-space: pre-wrap; }</style>")
-    main(int(sys.argv[1]))
+        raise ValueError(
+            "Need year: python3 flag_issues.py <year>[-<year>] [html|json|csv|counts] [--jobs <jobs>]"
+        )
+    years = parse_years(sys.argv[1])
+    output_format = (
+        sys.argv[2] if len(sys.argv) > 2 and sys.argv[2] != "--jobs" else "html"
+    )
+    issues = check_years(
+        years,
+        jobs=(
+            int(sys.argv[sys.argv.index("--jobs") + 1])
+            if "--jobs" in sys.argv
+            else None
+        ),
+    )
+    if output_format == "json":
+        write_json(issues, sys.stdout)
+    elif output_format == "csv":
+        write_csv(issues, sys.stdout)
+    elif output_format == "counts":
+        write_counts(years, issues, sys.stdout)
+    else:
+        render_html(years, issues)
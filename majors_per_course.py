@@ -1,26 +1,33 @@
+"""
+python3 majors_per_course.py [year]
+"""
+
 import csv
 from typing import Dict, Generator, List, Tuple
 
 from common_prereqs import parse_int
 
-from parse import major_plans
 from parse_defs import CourseCode
+from plan_db import plan_courses
 from university import university
 
-courses: Dict[CourseCode, Dict[str, List[str]]] = {}
-
-
-def major_has_course(major_code: str, college_code: str, code: CourseCode) -> None:
-    if code not in courses:
-        courses[code] = {college: [] for college in university.college_codes}
-    courses[code][college_code].append(major_code)
+MajorsByCollege = Dict[CourseCode, Dict[str, List[str]]]
 
 
-for major_code, major in major_plans(2021).items():
-    for college_code in major.colleges:
-        for course in major.plan(college_code):
-            if course.course_code:
-                major_has_course(major_code, college_code, course.course_code)
+def majors_per_course(year: int) -> MajorsByCollege:
+    """
+    Maps each course to the majors in each college whose plans take it.
+    """
+    courses: MajorsByCollege = {}
+    for course in plan_courses(year):
+        if course.college_code not in university.college_codes:
+            continue
+        if course.course_code not in courses:
+            courses[course.course_code] = {
+                college: [] for college in university.college_codes
+            }
+        courses[course.course_code][course.college_code].append(course.major_code)
+    return courses
 
 
 def to_sortable(code: CourseCode) -> Tuple[str, int, str]:
@@ -29,7 +36,7 @@ def to_sortable(code: CourseCode) -> Tuple[str, int, str]:
     return subject, number, letter
 
 
-def output_courses() -> Generator[List[str], None, None]:
+def output_courses(courses: MajorsByCollege) -> Generator[List[str], None, None]:
     yield ["Course", "College", "Majors"]
 
     for course_code in sorted(courses.keys(), key=to_sortable):
@@ -41,7 +48,14 @@ def output_courses() -> Generator[List[str], None, None]:
             ]
 
 
-with open("./files/majors_per_course.csv", "w", newline="") as file:
-    writer = csv.writer(file)
-    for row in output_courses():
-        writer.writerow(row)
+def main(year: int) -> None:
+    with open("./files/majors_per_course.csv", "w", newline="") as file:
+        writer = csv.writer(file)
+        for row in output_courses(majors_per_course(year)):
+            writer.writerow(row)
+
+
+if __name__ == "__main__":
+    import sys
+
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2021)
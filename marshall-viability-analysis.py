@@ -1,43 +1,43 @@
-from typing import Callable, List, Set, Tuple
+"""
+python3 marshall-viability-analysis.py > marshall.txt
+python3 marshall-viability-analysis.py 2024
+"""
+
+import sys
+from typing import Hashable
+from curriculum_consistency import Curricula
 from parse import major_plans
 from parse_defs import ProcessedCourse
 
 
-def simplify(
-    get_curriculum: Callable[[], List[ProcessedCourse]]
-) -> Set[Tuple[str, float]]:
-    try:
-        curriculum = get_curriculum()
-    except KeyError:
-        return {("No curriculum. Sad!", 0.0)}
-    return {(course.course_title, course.units) for course in curriculum}
+def simplify(course: ProcessedCourse) -> Hashable:
+    return course.course_title, course.units
 
 
 UNFUNNY = "TH"  # Least funny college per oddity analysis
 colleges = ["RE", "MU", "TH", "WA", "FI", "SI", "SN"]
-
-for major_plan in major_plans(2021).values():
-    good_curriculum = simplify(lambda: major_plan.curriculum(UNFUNNY))
-
-    curricula = {
-        college: simplify(lambda: major_plan.curriculum(college))
-        for college in colleges
-        if college != UNFUNNY
-    }
-
-    differences = {
-        college: (curriculum - good_curriculum, good_curriculum - curriculum)
-        for college, curriculum in curricula.items()
-        if curriculum != good_curriculum
-    }
-
-    if len(differences) == len(colleges) - 1:
+year = int(sys.argv[1]) if len(sys.argv) > 1 else 2021
+
+for major_plan in major_plans(year).values():
+    curricula = Curricula(major_plan, colleges, key=simplify, unique=True)
+    if UNFUNNY in curricula.missing:
+        continue
+
+    others = [college for college in colleges if college != UNFUNNY]
+    if all(
+        college in curricula.missing or not curricula.same(college, UNFUNNY)
+        for college in others
+    ):
         print(f"= {UNFUNNY} is the problematic one for {major_plan.major_code} =")
-        for college in colleges:
-            if college != UNFUNNY:
-                print(f"== {college} ==")
-                print(f"[{college}] {differences[college][0] or '🗿'}")
-                print(f"[{UNFUNNY}] {differences[college][1] or '🗿'}")
+        for college in others:
+            print(f"== {college} ==")
+            if college in curricula.missing:
+                print(f"[{college}] No curriculum. Sad!")
+                print(f"[{UNFUNNY}] 🗿")
+                continue
+            only_college, only_unfunny = curricula.difference(college, UNFUNNY)
+            print(f"[{college}] {set(only_college) or '🗿'}")
+            print(f"[{UNFUNNY}] {set(only_unfunny) or '🗿'}")
         print()
 
 print("Have a nice day.")
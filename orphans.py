@@ -1,43 +1,111 @@
 """
+Lists the lower division courses in each major's curriculum that have
+prerequisites but aren't a prerequisite for any other course in it, which
+might mean that the curriculum includes a course without its follow-up.
+
+Orphans are found from the prerequisite IDs of `OutputCourses`, so no degree
+plans are built. Years are checked in worker processes (one per CPU by
+default).
+
 python3 orphans.py 2023
+python3 orphans.py 2015-2024 csv > files/orphans.csv
+python3 orphans.py 2015-2024 csv --jobs 2
 """
 
-from typing import Set
-from curricularanalytics import AbstractCourse, Course, Curriculum
-from output import MajorOutput
+import csv
+import multiprocessing
+import os
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, TextIO
+from output import MajorOutput, OutputCourse, OutputCourses
 from parse import major_plans
 from parse_defs import CourseCode
+from util import parse_years
+
 
+class MajorOrphans(NamedTuple):
+    year: int
+    major_code: str
+    orphans: List[CourseCode]
+    "Lower division orphans, sorted."
 
-def get_orphans(curr: Curriculum) -> Set[AbstractCourse]:
+
+def get_orphans(courses: Iterable[OutputCourse]) -> List[OutputCourse]:
+    """
+    Returns the courses that have prerequisites or corequisites but that no
+    other course requires. Courses that share an ID are only listed once.
+    """
+    by_id: Dict[int, OutputCourse] = {}
     has_requisites: Set[int] = set()
     has_dependants: Set[int] = set()
-    for course in curr.courses:
-        if len(course.requisites) > 0:
-            has_requisites.add(course.id)
-            for req_id in course.requisites.keys():
-                has_dependants.add(req_id)
-    return {curr.course_from_id(id) for id in has_requisites - has_dependants}
+    for course in courses:
+        if course.course_id not in by_id:
+            by_id[course.course_id] = course
+        if course.prereq_ids or course.coreq_ids:
+            has_requisites.add(course.course_id)
+            has_dependants.update(course.prereq_ids)
+            has_dependants.update(course.coreq_ids)
+    return [by_id[id] for id in has_requisites - has_dependants]
 
 
-def check_all_orphans(year: int):
+def check_year(year: int) -> List[MajorOrphans]:
+    """
+    Finds the lower division orphans of every major's curriculum in a year.
+    Majors without any are left out.
+    """
+    results: List[MajorOrphans] = []
     for major_code, plans in major_plans(year).items():
-        output = MajorOutput(plans)
-        dp = output.output_degree_plan()
-        orphans = get_orphans(dp.curriculum)
+        orphans = get_orphans(OutputCourses(MajorOutput(plans), None).list_courses())
         course_codes = sorted(
-            CourseCode(course.prefix, course.num)
+            course.course_code
             for course in orphans
-            if isinstance(course, Course)
-        )
-        ld_orphans = ", ".join(
-            str(code) for code in course_codes if code.parts()[1] < 100
+            if course.course_code.parts()[1] < 100
         )
-        if ld_orphans:
-            print(f"[{major_code}]: {ld_orphans}")
+        if course_codes:
+            results.append(MajorOrphans(year, major_code, course_codes))
+    return results
+
+
+def check_years(years: Sequence[int], jobs: Optional[int] = None) -> List[MajorOrphans]:
+    """
+    Checks each year in `jobs` forked worker processes, returning their
+    results in the order of `years`.
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(years))
+    # Worker processes (e.g. from build_reports.py) can't start their own
+    if jobs > 1 and not multiprocessing.current_process().daemon:
+        with multiprocessing.get_context("fork").Pool(jobs) as pool:
+            results = pool.map(check_year, years)
+    else:
+        results = [check_year(year) for year in years]
+    return [major for majors in results for major in majors]
+
+
+def print_orphans(results: List[MajorOrphans]) -> None:
+    for _, major_code, orphans in results:
+        print(f"[{major_code}]: {', '.join(map(str, orphans))}")
+
+
+def write_csv(results: List[MajorOrphans], file: TextIO) -> None:
+    writer = csv.writer(file)
+    writer.writerow(["Year", "Major", "Orphans"])
+    for year, major_code, orphans in results:
+        writer.writerow([year, major_code, ", ".join(map(str, orphans))])
 
 
 if __name__ == "__main__":
     import sys
 
-    check_all_orphans(int(sys.argv[1]))
+    if len(sys.argv) < 2:
+        raise ValueError(
+            "Need year: python3 orphans.py <year>[-<year>] [csv] [--jobs <jobs>]"
+        )
+    results = check_years(
+        parse_years(sys.argv[1]),
+        (int(sys.argv[sys.argv.index("--jobs") + 1]) if "--jobs" in sys.argv else None),
+    )
+    if "csv" in sys.argv[2:]:
+        write_csv(results, sys.stdout)
+    else:
+        print_orphans(results)
@@ -7,16 +7,31 @@ Exports:
     a particular major in Curricular Analytics' CSV and JSON formats.
 """
 
-from typing import Dict, Generator, List, NamedTuple, Optional, Set
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Generator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+)
 
-import curricularanalytics as ca
 import output_json as obj
 
 from parse import MajorPlans, major_codes, prereqs
 from parse_defs import CourseCode, Prerequisite, ProcessedCourse
+from profiling import timed
 from university import university
 from util import CsvWriter
 
+if TYPE_CHECKING:
+    # Imported in `output_degree_plan` instead because it pulls in numpy,
+    # pandas, and networkx, which most scripts that only output CSV/JSON
+    # don't need
+    import curricularanalytics as ca
+
 __all__ = ["MajorOutput"]
 
 HEADER = [
@@ -106,11 +121,12 @@ class OutputCourses:
         self.claimed_ids = set(self.course_ids.keys())
 
     # 4. Get prerequisites
+    @timed("output._find_prereq")
     def _find_prereq(
         self,
         prereq_ids: List[int],
         coreq_ids: List[int],
-        alternatives: List[Prerequisite],
+        alternatives: Sequence[Prerequisite],
         before: int,
     ) -> None:
         """
@@ -144,6 +160,7 @@ class OutputCourses:
                     )
                     return
 
+    @timed("output.list_courses")
     def list_courses(
         self, show_major: Optional[bool] = None
     ) -> Generator[OutputCourse, None, None]:
@@ -220,6 +237,7 @@ class MajorOutput:
                 self.course_ids[course.course_code] = self.start_id
                 self.start_id += 1
 
+    @timed("output.output")
     def output(self, college: Optional[str] = None) -> str:
         """
         Outputs a curriculum or degree plan in Curricular Analytics' CSV
@@ -284,6 +302,7 @@ class MajorOutput:
 
         return output.done()
 
+    @timed("output.output_json")
     def output_json(self, college: Optional[str] = None) -> obj.Curriculum:
         """
         Like `_output_plan`, but outputs a JSON-serializable `Curriculum` object
@@ -336,10 +355,13 @@ class MajorOutput:
                 )
         return curriculum
 
-    def output_degree_plan(self, college: Optional[str] = None) -> ca.DegreePlan:
+    @timed("output.output_degree_plan")
+    def output_degree_plan(self, college: Optional[str] = None) -> "ca.DegreePlan":
+        import curricularanalytics as ca
+
         processed = list(OutputCourses(self, college).list_courses())
-        course_objects: List[ca.AbstractCourse] = []
-        course_object_by_id: Dict[int, ca.AbstractCourse] = {}
+        course_objects: List["ca.AbstractCourse"] = []
+        course_object_by_id: Dict[int, "ca.AbstractCourse"] = {}
         for course in processed:
             course_object = ca.Course(
                 course.course_title,
@@ -3,28 +3,78 @@ Parses the prerequisite and academic plan CSV files into objects for easier
 manipulation.
 
 Exports:
-    `prereqs`, a dictionary mapping from a subject code-number tuple to a list
-    of prerequisites, which are each lists of possible course codes to satisfy
-    the requirement.
+    `prereqs`, a dictionary mapping from a subject code-number tuple to a tuple
+    of prerequisites, which are each tuples of possible course codes to satisfy
+    the requirement. Identical prerequisites are shared between terms, and
+    `limit_prereq_cache` can cap how many terms are kept in memory.
 
     `major_plans`, a dictionary mapping from ISIS major codes to `MajorPlans`
     objects, which contains a dictionary mapping college codes to `Plan`s, which
-    have a list of list of `PlannedCourse`s for each quarter.
+    have a list of list of `PlannedCourse`s for each quarter. If split_csv.py
+    wrote an index for the plans file, majors are only parsed when accessed.
 
     `major_codes`, a dictionary mapping from ISIS major codes to `MajorInfo`
     objects, which contains data from the ISIS major codes spreadsheet.
 
+If the SQLite database made by plan_db.py exists, it is read instead of the
+split CSV files.
+
 python3 parse.py <year> # Get a list of major codes to upload with upload.sh
+python3 parse.py prereqs # How much memory sharing prereqs between terms saves
 """
 
+from collections import OrderedDict
 import csv
 from functools import cached_property
+import io
+import json
 import os
-from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
-from parse_defs import CourseCode, ProcessedCourse, Prerequisite, RawCourse, TermCode
+import sqlite3
+import sys
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Set,
+    Sized,
+    Tuple,
+)
+from parse_defs import (
+    CourseCode,
+    PlanTable,
+    ProcessedCourse,
+    Prerequisite,
+    RawPlan,
+    Requirements,
+    TermCode,
+)
+from profiling import count, timed
 from university import university
 
-__all__ = ["prereqs", "major_plans", "major_codes"]
+__all__ = [
+    "prereqs",
+    "limit_prereq_cache",
+    "prereq_memory",
+    "major_plans",
+    "major_codes",
+]
+
+DATABASE_PATH = "./files/plans.db"
+
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Modules that process the rows stored in the database, so it's out of date if
+# they change
+DATABASE_SOURCES = ["parse", "parse_defs", "university", "plan_db"]
+
+# Columns of the database tables, in the same order as the CSV files
+PREREQ_COLUMNS = "term, term_id, course_id, subject, number, seq_id, req_course_id, req_subject, req_number, req_grade_priority, req_grade, allow_concurrent"
+PLAN_COLUMNS = "department, major, college, course, units, course_type, overlap, start_year, year_taken, quarter_taken, term_taken, plan_length"
+MAJOR_COLUMNS = "previous_code, ucop_code, isis_code, abbreviation, description, diploma_title, start_term, end_term, student_level, department, award_type, program_length, colleges, cip_code"
 
 
 def prereq_rows_to_dict(
@@ -39,7 +89,8 @@ def prereq_rows_to_dict(
     courses to satisfy the requirement, like an OR.
     """
     courses: Dict[CourseCode, List[List[Prerequisite]]] = {}
-    for (
+    row_count = 0
+    for row_count, (
         _,  # Term Code
         _,  # Term ID
         _,  # Course ID
@@ -52,7 +103,7 @@ def prereq_rows_to_dict(
         _,  # Prereq Minimum Grade Priority
         _,  # Prereq Minimum Grade
         allow_concurrent,  # Allow concurrent registration
-    ) in rows:
+    ) in enumerate(rows, 1):
         course = CourseCode(subject.strip(), number.strip())
         prereq = Prerequisite(
             CourseCode(req_subj.strip(), req_num.strip()), allow_concurrent == "Y"
@@ -66,6 +117,7 @@ def prereq_rows_to_dict(
             courses[course].append([])
         # Could probably include the allow concurrent registration info here
         courses[course][index].append(prereq)
+    count("prereq rows parsed", row_count)
     return courses
 
 
@@ -73,23 +125,191 @@ def terms() -> List[TermCode]:
     return _cache.terms
 
 
-_prereq_cache: Dict[TermCode, Dict[CourseCode, List[List[Prerequisite]]]] = {}
+class SharedPrereqs:
+    """
+    Hash-conses prerequisites so that identical course codes, requirements,
+    and lists of requirements are the same tuple in every term that has them.
+    Most courses' prerequisites don't change from term to term, so loading
+    every term costs about as much memory as the distinct prerequisites
+    rather than a copy for each term.
+
+    Shared values live as long as this object does, even after the terms that
+    used them are evicted from the cache.
+    """
+
+    course_codes: Dict[CourseCode, CourseCode]
+    prerequisites: Dict[Prerequisite, Prerequisite]
+    alternatives: Dict[Tuple[Prerequisite, ...], Tuple[Prerequisite, ...]]
+    requirements: Dict[Requirements, Requirements]
+
+    def __init__(self) -> None:
+        self.course_codes = {}
+        self.prerequisites = {}
+        self.alternatives = {}
+        self.requirements = {}
+
+    def course_code(self, course_code: CourseCode) -> CourseCode:
+        shared = self.course_codes.get(course_code)
+        if shared is None:
+            shared = self.course_codes[course_code] = course_code
+        return shared
+
+    def _prerequisite(self, prereq: Prerequisite) -> Prerequisite:
+        shared = self.prerequisites.get(prereq)
+        if shared is None:
+            shared = Prerequisite(
+                self.course_code(prereq.course_code), prereq.allow_concurrent
+            )
+            self.prerequisites[shared] = shared
+        return shared
+
+    def _alternatives(
+        self, alternatives: Tuple[Prerequisite, ...]
+    ) -> Tuple[Prerequisite, ...]:
+        shared = self.alternatives.get(alternatives)
+        if shared is None:
+            shared = tuple(self._prerequisite(prereq) for prereq in alternatives)
+            self.alternatives[shared] = shared
+        return shared
+
+    def share(
+        self, courses: Dict[CourseCode, List[List[Prerequisite]]]
+    ) -> Dict[CourseCode, Requirements]:
+        """
+        Replaces the lists of prerequisites for a term with shared tuples.
+        """
+        shared: Dict[CourseCode, Requirements] = {}
+        for course_code, reqs in courses.items():
+            requirements = tuple(tuple(req) for req in reqs)
+            # Most courses are unchanged from the last term, so check the whole
+            # list of requirements first
+            shared_reqs = self.requirements.get(requirements)
+            if shared_reqs is None:
+                shared_reqs = tuple(
+                    self._alternatives(alternatives) for alternatives in requirements
+                )
+                self.requirements[shared_reqs] = shared_reqs
+            shared[self.course_code(course_code)] = shared_reqs
+        return shared
+
+
+_shared_prereqs = SharedPrereqs()
+_prereq_cache: "OrderedDict[TermCode, Dict[CourseCode, Requirements]]" = OrderedDict()
+_prereq_cache_limit: Optional[int] = None
+
+
+def limit_prereq_cache(max_terms: Optional[int]) -> None:
+    """
+    Only keeps the prereqs of the `max_terms` most recently used terms in
+    memory, or every term if `max_terms` is None (the default). Evicted terms
+    are loaded again the next time they're needed.
+    """
+    global _prereq_cache_limit
+    _prereq_cache_limit = max_terms
+    _evict_prereqs()
+
+
+def _evict_prereqs() -> None:
+    if _prereq_cache_limit is None:
+        return
+    while len(_prereq_cache) > _prereq_cache_limit:
+        _prereq_cache.popitem(last=False)
+        count("prereqs cache evictions")
 
 
-def prereqs(term: str) -> Dict[CourseCode, List[List[Prerequisite]]]:
+def prereqs(term: str) -> Dict[CourseCode, Requirements]:
     term = TermCode(term)
     if term < terms()[0]:
         term = terms()[0]
     elif term > terms()[-1]:
         term = terms()[-1]
     if term not in _prereq_cache:
+        count("prereqs cache misses")
+        _prereq_cache[term] = _load_prereqs(term)
+        _evict_prereqs()
+    else:
+        count("prereqs cache hits")
+        if _prereq_cache_limit is not None:
+            _prereq_cache.move_to_end(term)
+    return _prereq_cache[term]
+
+
+@timed("parse.prereqs")
+def _load_prereqs(term: TermCode) -> Dict[CourseCode, Requirements]:
+    if _cache.database:
+        rows = _cache.database.execute(
+            f"SELECT {PREREQ_COLUMNS} FROM prereqs WHERE term = ? ORDER BY rowid",
+            (term,),
+        ).fetchall()
+        if not rows:
+            return {}
+        courses = prereq_rows_to_dict(rows)
+    else:
         try:
             with open(f"./files/prereqs/prereqs_{term}.csv", newline="") as file:
-                _prereq_cache[term] = prereq_rows_to_dict(csv.reader(file))
-            university.fix_prereqs(_prereq_cache[term], term)
+                courses = prereq_rows_to_dict(csv.reader(file))
         except FileNotFoundError:
-            _prereq_cache[term] = {}
-    return _prereq_cache[term]
+            return {}
+    university.fix_prereqs(courses, term)
+    return _shared_prereqs.share(courses)
+
+
+class PrereqMemory(NamedTuple):
+    terms: int
+    shared_bytes: int
+    """
+    The size of the cached prereqs, counting shared values once.
+    """
+    unshared_bytes: int
+    """
+    The size the cached prereqs would be if each term had its own copy.
+    """
+
+
+def prereq_memory() -> PrereqMemory:
+    """
+    Estimates how much memory sharing prereqs between the cached terms saves,
+    counting the dictionaries, tuples, and strings that make up each term and
+    the lookup tables used to share them.
+    """
+    seen: Set[int] = set()
+    shared_bytes = 0
+    unshared_bytes = 0
+
+    def add(value: object) -> None:
+        nonlocal shared_bytes, unshared_bytes
+        size = sys.getsizeof(value)
+        unshared_bytes += size
+        if id(value) not in seen:
+            seen.add(id(value))
+            shared_bytes += size
+
+    def add_code(course_code: CourseCode) -> None:
+        add(course_code)
+        add(course_code.subject)
+        add(course_code.number)
+
+    for courses in _prereq_cache.values():
+        add(courses)
+        for course_code, reqs in courses.items():
+            add_code(course_code)
+            add(reqs)
+            for alternatives in reqs:
+                add(alternatives)
+                for prereq in alternatives:
+                    add(prereq)
+                    add_code(prereq.course_code)
+    # The lookup tables only exist because of sharing
+    shared_bytes += sum(
+        sys.getsizeof(table)
+        for table in (
+            _shared_prereqs.course_codes,
+            _shared_prereqs.prerequisites,
+            _shared_prereqs.alternatives,
+            _shared_prereqs.requirements,
+        )
+    )
+    return PrereqMemory(len(_prereq_cache), shared_bytes, unshared_bytes)
 
 
 class MajorPlans:
@@ -98,6 +318,9 @@ class MajorPlans:
 
     To get the plan for a specific college, use the two-letter college code. For
     example, `plan("FI")` contains the academic plan for ERC (Fifth College).
+
+    `raw_plans` are views over the `PlanTable` shared by every major from the
+    same plans file rather than lists of their own.
     """
 
     year: int
@@ -105,23 +328,31 @@ class MajorPlans:
     department: str
     major_code: str
     colleges: Set[str]
-    raw_plans: Dict[str, List[RawCourse]]
+    raw_plans: Dict[str, RawPlan]
+    _table: PlanTable
     _parsed_plans: Dict[str, List[ProcessedCourse]]
 
-    def __init__(self, year: int, department: str, major_code: str) -> None:
+    def __init__(
+        self, year: int, department: str, major_code: str, table: PlanTable
+    ) -> None:
         self.year = year
         self.department = department
         self.major_code = major_code
         self.colleges = set()
         self.raw_plans = {}
+        self._table = table
         self._parsed_plans = {}
 
-    def add_raw_course(self, college_code: str, course: RawCourse) -> None:
-        if college_code not in self.colleges:
+    def add_raw_course(self, college_code: str, row: int) -> None:
+        """
+        Adds the course at index `row` of the shared `PlanTable` to a college's
+        plan.
+        """
+        if college_code not in self.raw_plans:
             if university.keep_plan(self.year, college_code):
                 self.colleges.add(college_code)
-            self.raw_plans[college_code] = []
-        self.raw_plans[college_code].append(course)
+            self.raw_plans[college_code] = RawPlan(self._table)
+        self.raw_plans[college_code].append_row(row)
 
     def plan(self, college: str) -> List[ProcessedCourse]:
         if college not in self._parsed_plans:
@@ -160,13 +391,22 @@ class MajorPlans:
         return [course for course in self.plan(college) if course.for_major]
 
 
-def plan_rows_to_dict(rows: Iterable[List[str]]) -> Dict[str, MajorPlans]:
+@timed("parse.plan_rows_to_dict")
+def plan_rows_to_dict(
+    rows: Iterable[List[str]], table: Optional[PlanTable] = None
+) -> Dict[str, MajorPlans]:
     """
     Converts the academic plans CSV rows into a dictionary of major codes to
     `Major` objects.
+
+    Rows are stored in `table` if given, so majors read separately from the
+    same file can share one.
     """
     plans: Dict[str, MajorPlans] = {}
-    for (
+    if table is None:
+        table = PlanTable()
+    row_count = 0
+    for row_count, (
         department,  # Department
         major_code,  # Major
         college_code,  # College
@@ -178,15 +418,15 @@ def plan_rows_to_dict(rows: Iterable[List[str]]) -> Dict[str, MajorPlans]:
         plan_yr,  # Year Taken
         plan_qtr,  # Quarter Taken
         *_,  # Term Taken, Plan Length
-    ) in rows:
+    ) in enumerate(rows, 1):
         year = int(year)
         if major_code not in plans:
-            plans[major_code] = MajorPlans(year, department, major_code)
+            plans[major_code] = MajorPlans(year, department, major_code, table)
         if course_type != "COLLEGE" and course_type != "DEPARTMENT":
             raise TypeError('Course type is neither "COLLEGE" nor "DEPARTMENT"')
         plans[major_code].add_raw_course(
             college_code,
-            RawCourse(
+            table.add_row(
                 course_title,
                 float(units),
                 course_type,
@@ -195,22 +435,131 @@ def plan_rows_to_dict(rows: Iterable[List[str]]) -> Dict[str, MajorPlans]:
                 int(plan_qtr) - 1,
             ),
         )
+    count("plan rows parsed", row_count)
     return plans
 
 
-_plan_cache: Dict[Tuple[int, int], Dict[str, MajorPlans]] = {}
+class LazyMajorPlans(Mapping[str, MajorPlans]):
+    """
+    A read-only dictionary of major codes to `MajorPlans` whose majors are only
+    parsed the first time they're accessed, so scripts that only need one major
+    don't have to parse the whole year. `read_rows` returns the plan CSV rows
+    for a given major, e.g. from the byte ranges in a plans index (written by
+    split_csv.py) or from the database.
+    """
 
+    _major_codes: Dict[str, None]
+    "An ordered set, so lookups don't scan every major."
+    _read_rows: Callable[[str], Iterable[List[str]]]
+    _table: PlanTable
+    _majors: Dict[str, MajorPlans]
+
+    def __init__(
+        self,
+        major_codes: Iterable[str],
+        read_rows: Callable[[str], Iterable[List[str]]],
+    ) -> None:
+        self._major_codes = dict.fromkeys(major_codes)
+        self._read_rows = read_rows
+        self._table = PlanTable()
+        self._majors = {}
+
+    def __getitem__(self, major_code: str) -> MajorPlans:
+        if major_code not in self._majors:
+            if major_code not in self._major_codes:
+                raise KeyError(major_code)
+            self._majors[major_code] = plan_rows_to_dict(
+                self._read_rows(major_code), self._table
+            )[major_code]
+        return self._majors[major_code]
+
+    def __contains__(self, major_code: object) -> bool:
+        return major_code in self._major_codes
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._major_codes)
+
+    def __len__(self) -> int:
+        return len(self._major_codes)
+
+    def __eq__(self, other: object) -> bool:
+        # Avoid parsing every major for `major_plans(year) == {}`
+        if isinstance(other, Sized) and len(self) != len(other):
+            return False
+        return super().__eq__(other)
+
+
+def read_byte_ranges(path: str, ranges: List[List[int]]) -> Iterable[List[str]]:
+    """
+    Reads the CSV rows in the given byte ranges of a file.
+    """
+    with open(path, "rb") as file:
+        chunks: List[bytes] = []
+        for start, end in ranges:
+            file.seek(start)
+            chunks.append(file.read(end - start))
+    # Decode the same way `open` would have
+    return csv.reader(io.TextIOWrapper(io.BytesIO(b"".join(chunks)), newline=""))
 
-def major_plans(year: int, length: int = 4) -> Dict[str, MajorPlans]:
+
+_plan_cache: Dict[Tuple[int, int], Mapping[str, MajorPlans]] = {}
+
+
+def major_plans(year: int, length: int = 4) -> Mapping[str, MajorPlans]:
     if (year, length) not in _plan_cache:
-        try:
-            with open(f"./files/plans/plans_{year}_{length}yr.csv", newline="") as file:
-                _plan_cache[year, length] = plan_rows_to_dict(csv.reader(file))
-        except FileNotFoundError:
-            _plan_cache[year, length] = {}
+        count("major_plans cache misses")
+        _plan_cache[year, length] = _load_major_plans(year, length)
+    else:
+        count("major_plans cache hits")
     return _plan_cache[year, length]
 
 
+def plan_years() -> List[int]:
+    """
+    The years with plans, from 2015 up to the first year without any.
+    """
+    years: List[int] = []
+    for year in range(2015, 2050):
+        if not major_plans(year):
+            break
+        years.append(year)
+    return years
+
+
+@timed("parse.major_plans")
+def _load_major_plans(year: int, length: int) -> Mapping[str, MajorPlans]:
+    database = _cache.database
+    if database:
+        return LazyMajorPlans(
+            (
+                major_code
+                for (major_code,) in database.execute(
+                    "SELECT major FROM plans WHERE start_year = ? AND plan_length = ? GROUP BY major ORDER BY MIN(rowid)",
+                    (year, length),
+                )
+            ),
+            lambda major_code: database.execute(
+                f"SELECT {PLAN_COLUMNS} FROM plans WHERE start_year = ? AND major = ? AND plan_length = ? ORDER BY rowid",
+                (year, major_code, length),
+            ),
+        )
+    path = f"./files/plans/plans_{year}_{length}yr.csv"
+    try:
+        with open(path.replace(".csv", ".index.json")) as file:
+            index: Dict[str, List[List[int]]] = json.load(file)
+        return LazyMajorPlans(
+            index.keys(),
+            lambda major_code: read_byte_ranges(path, index[major_code]),
+        )
+    except FileNotFoundError:
+        pass
+    try:
+        with open(path, newline="") as file:
+            return plan_rows_to_dict(csv.reader(file))
+    except FileNotFoundError:
+        return {}
+
+
 class MajorInfo(NamedTuple):
     """
     Represents information about a major from the ISIS major code list.
@@ -257,9 +606,82 @@ def major_rows_to_dict(rows: Iterable[List[str]]) -> Dict[str, MajorInfo]:
     return majors
 
 
+def database_stamp(inputs: Iterable[str]) -> List[List[object]]:
+    """
+    The modification times and sizes of the data files that plan_db.py made
+    the database from and of `DATABASE_SOURCES`, to tell if the database is
+    out of date. Files that don't exist have no time or size.
+    """
+    stamp: List[List[object]] = []
+    for path in [
+        *inputs,
+        *(os.path.join(SOURCE_DIR, f"{module}.py") for module in DATABASE_SOURCES),
+    ]:
+        try:
+            stat = os.stat(path)
+            stamp.append([path, stat.st_mtime_ns, stat.st_size])
+        except FileNotFoundError:
+            stamp.append([path, None])
+    return stamp
+
+
+def _database_changes(database: sqlite3.Connection) -> List[str]:
+    """
+    Lists the files that have changed since plan_db.py made the database. Data
+    files that have since been deleted aren't counted, since the database may
+    be the only copy left.
+    """
+    try:
+        inputs_json, stamp_json = [
+            value
+            for (value,) in database.execute(
+                "SELECT value FROM meta WHERE key IN ('inputs', 'stamp') ORDER BY key"
+            )
+        ]
+    except (sqlite3.OperationalError, ValueError):
+        # Made before plan_db.py stored stamps
+        return ["plan_db.py"]
+    inputs: List[str] = json.loads(inputs_json)
+    saved: Dict[str, List[object]] = {
+        entry[0]: entry for entry in json.loads(stamp_json)
+    }
+    return [
+        os.path.relpath(str(path))
+        for path, *state in database_stamp(inputs)
+        if saved.get(str(path)) != [path, *state]
+        and not (path in inputs and state == [None])
+    ]
+
+
 class _ParseCache:
+    @cached_property
+    def database(self) -> Optional[sqlite3.Connection]:
+        """
+        The database created by plan_db.py, if there is one and it's up to date.
+        When it is, it's used instead of the split CSV files.
+        """
+        if not os.path.exists(DATABASE_PATH):
+            return None
+        database = sqlite3.connect(f"file:{DATABASE_PATH}?mode=ro", uri=True)
+        changes = _database_changes(database)
+        if changes:
+            print(
+                f"{DATABASE_PATH} is out of date ({', '.join(changes)} changed), so the CSV files are read instead. Run `make db` to update it.",
+                file=sys.stderr,
+            )
+            database.close()
+            return None
+        return database
+
     @cached_property
     def terms(self) -> List[TermCode]:
+        if self.database:
+            return sorted(
+                TermCode(term)
+                for (term,) in self.database.execute(
+                    "SELECT DISTINCT term FROM prereqs"
+                )
+            )
         return sorted(
             TermCode(name.replace("prereqs_", "").replace(".csv", ""))
             for name in os.listdir("./files/prereqs/")
@@ -268,6 +690,12 @@ class _ParseCache:
 
     @cached_property
     def major_codes(self) -> Dict[str, MajorInfo]:
+        if self.database:
+            rows = self.database.execute(
+                f"SELECT {MAJOR_COLUMNS} FROM majors ORDER BY rowid"
+            ).fetchall()
+            if rows:
+                return major_rows_to_dict(rows)
         with open(university.majors_file, newline="") as file:
             reader = csv.reader(file)
             next(reader)  # Skip header
@@ -281,7 +709,33 @@ def major_codes() -> Dict[str, MajorInfo]:
     return _cache.major_codes
 
 
-if __name__ == "__main__":
-    import sys
+def database() -> Optional[sqlite3.Connection]:
+    """
+    The connection to the database made by plan_db.py, or None if there isn't
+    one.
+    """
+    return _cache.database
+
+
+def forget_database() -> None:
+    """
+    Drops the database connection so that the next query opens a new one.
+    SQLite connections can't be shared with a forked process, so workers call
+    this before reading from the database.
+    """
+    _cache.__dict__.pop("database", None)
+
 
-    print(" ".join(major_plans(int(sys.argv[1])).keys()))
+if __name__ == "__main__":
+    if sys.argv[1] == "prereqs":
+        for term in terms():
+            prereqs(term)
+        memory = prereq_memory()
+        print(f"{memory.terms} terms")
+        print(f"Shared: {memory.shared_bytes / 1_000_000:.1f} MB")
+        print(f"Unshared: {memory.unshared_bytes / 1_000_000:.1f} MB")
+        print(
+            f"Saved: {(memory.unshared_bytes - memory.shared_bytes) / 1_000_000:.1f} MB"
+        )
+    else:
+        print(" ".join(major_plans(int(sys.argv[1])).keys()))
@@ -1,4 +1,17 @@
-from typing import Literal, NamedTuple, Optional, Tuple
+from array import array
+import sys
+from typing import (
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    overload,
+)
 
 
 class TermCode(str):
@@ -82,6 +95,14 @@ class Prerequisite(NamedTuple):
         return f"{self.course_code}{'*' if self.allow_concurrent else ''}"
 
 
+Requirements = Tuple[Tuple[Prerequisite, ...], ...]
+"""
+A course's prerequisites. The outer tuple is a list of requirements, like an
+AND, while each inner tuple is a list of possible courses to satisfy the
+requirement, like an OR.
+"""
+
+
 class RawCourse(NamedTuple):
     """
     Represents a course in an academic plan containing raw values from the CSV,
@@ -113,3 +134,124 @@ class ProcessedCourse(NamedTuple):
     for_major: bool
     term_index: int
     raw: RawCourse
+
+
+class PlanTable:
+    """
+    Column-oriented storage for every row of an academic plans CSV. Loading
+    every year at once used to keep a `RawCourse` tuple (and a separate float
+    and title string) alive per row; here each column is a compact `array`, and
+    course titles are interned in a shared table since the same handful of
+    titles repeat across every major and college.
+
+    Rows are only turned back into `RawCourse`s when a `RawPlan` is indexed.
+    """
+
+    titles: List[str]
+    _title_ids: Dict[str, int]
+    title: "array[int]"
+    units: "array[float]"
+    department: "array[int]"
+    overlaps_ge: "array[int]"
+    year: "array[int]"
+    quarter: "array[int]"
+
+    def __init__(self) -> None:
+        self.titles = []
+        self._title_ids = {}
+        self.title = array("I")
+        self.units = array("d")
+        self.department = array("b")
+        self.overlaps_ge = array("b")
+        self.year = array("b")
+        self.quarter = array("b")
+
+    def add_row(
+        self,
+        course_title: str,
+        units: float,
+        type: Literal["COLLEGE", "DEPARTMENT"],
+        overlaps_ge: bool,
+        year: int,
+        quarter: int,
+    ) -> int:
+        """
+        Appends a row and returns its index.
+        """
+        title_id = self._title_ids.get(course_title)
+        if title_id is None:
+            title_id = len(self.titles)
+            self.titles.append(sys.intern(course_title))
+            self._title_ids[course_title] = title_id
+        self.title.append(title_id)
+        self.units.append(units)
+        self.department.append(type == "DEPARTMENT")
+        self.overlaps_ge.append(overlaps_ge)
+        self.year.append(year)
+        self.quarter.append(quarter)
+        return len(self.title) - 1
+
+    def row(self, index: int) -> RawCourse:
+        return RawCourse(
+            self.titles[self.title[index]],
+            self.units[index],
+            "DEPARTMENT" if self.department[index] else "COLLEGE",
+            bool(self.overlaps_ge[index]),
+            self.year[index],
+            self.quarter[index],
+        )
+
+    def __len__(self) -> int:
+        return len(self.title)
+
+
+class RawPlan(Sequence[RawCourse]):
+    """
+    A read-only list of `RawCourse`s for a single plan, backed by the rows of a
+    `PlanTable`. Indexing or iterating produces the same tuples the plain list
+    used to hold, so callers can treat it like `List[RawCourse]`; use `list()`
+    to get a mutable copy.
+    """
+
+    __slots__ = ("_table", "_rows")
+
+    _table: PlanTable
+    _rows: "array[int]"
+
+    def __init__(self, table: PlanTable) -> None:
+        self._table = table
+        self._rows = array("I")
+
+    def append_row(self, index: int) -> None:
+        self._rows.append(index)
+
+    @overload
+    def __getitem__(self, index: int) -> RawCourse: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[RawCourse]: ...
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[RawCourse, List[RawCourse]]:
+        if isinstance(index, slice):
+            return [self._table.row(row) for row in self._rows[index]]
+        return self._table.row(self._rows[index])
+
+    def __iter__(self) -> Iterator[RawCourse]:
+        row = self._table.row
+        for index in self._rows:
+            yield row(index)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, RawPlan):
+            return list(self) == list(other)
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
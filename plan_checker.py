@@ -0,0 +1,143 @@
+"""
+Checks the prerequisites of every course in a degree plan in one pass. The
+plan's courses are bucketed by term once, along with the set of courses taken
+before each term, so checking a requirement is a few set lookups rather than a
+scan over the plan.
+
+Exports:
+    `PlanChecker`, which answers which courses a plan takes before or during a
+    term and whether a requirement is satisfied by then.
+
+    `PrereqResult`, the result of checking one course's prerequisites.
+"""
+
+from typing import Container, Dict, Iterator, List, NamedTuple, Optional, Sequence
+from typing import FrozenSet, Set, Tuple
+
+from parse import prereqs
+from parse_defs import CourseCode, Prerequisite, ProcessedCourse, Requirements
+from university import university
+
+__all__ = ["PlanChecker", "PrereqResult"]
+
+
+class PrereqResult(NamedTuple):
+    course: ProcessedCourse
+    course_code: CourseCode
+    """
+    The course's code. Courses without one aren't checked, so this is never
+    None, unlike `course.course_code`.
+    """
+    reqs: Optional[Requirements]
+    """
+    The course's prerequisites in the term it's taken, or None if the course
+    doesn't exist then.
+    """
+    missing: List[Tuple[Prerequisite, ...]]
+    """
+    The requirements that no course taken before (or alongside, if allowed)
+    satisfies.
+    """
+
+
+class PlanChecker:
+    """
+    A plan's courses bucketed by term index. `year` is the plan's start year,
+    which determines which term's prerequisites apply to each course.
+    """
+
+    year: int
+    plan: Sequence[ProcessedCourse]
+    course_codes: Set[CourseCode]
+    _taking: Dict[int, Set[CourseCode]]
+    _taken_before: Dict[int, FrozenSet[CourseCode]]
+
+    def __init__(self, year: int, plan: Sequence[ProcessedCourse]) -> None:
+        self.year = year
+        self.plan = plan
+        self.course_codes = set()
+        self._taking = {}
+        for course in plan:
+            if course.course_code:
+                self.course_codes.add(course.course_code)
+                if course.term_index not in self._taking:
+                    self._taking[course.term_index] = set()
+                self._taking[course.term_index].add(course.course_code)
+        self._taken_before = {}
+        taken: Set[CourseCode] = set()
+        for term_index in sorted(self._taking.keys()):
+            self._taken_before[term_index] = frozenset(taken)
+            taken |= self._taking[term_index]
+
+    def taking(self, term_index: int) -> Set[CourseCode]:
+        """
+        The courses taken during a term.
+        """
+        return self._taking.get(term_index, set())
+
+    def taken_before(self, term_index: int) -> FrozenSet[CourseCode]:
+        """
+        The courses taken in the terms before a term.
+        """
+        if term_index not in self._taken_before:
+            return frozenset(
+                code
+                for term, courses in self._taking.items()
+                if term < term_index
+                for code in courses
+            )
+        return self._taken_before[term_index]
+
+    def satisfies(self, alternatives: Sequence[Prerequisite], term_index: int) -> bool:
+        """
+        Whether any of the alternatives for a requirement is taken before a
+        term, or during it if it can be taken concurrently.
+        """
+        taken = self.taken_before(term_index)
+        taking = self.taking(term_index)
+        for alt in alternatives:
+            if alt.course_code in taken or (
+                alt.allow_concurrent and alt.course_code in taking
+            ):
+                return True
+        return False
+
+    def duplicates(self) -> Iterator[CourseCode]:
+        """
+        Yields the course code of every course that was already taken earlier
+        in the plan (in plan order, not term order).
+        """
+        seen: Set[CourseCode] = set()
+        for course in self.plan:
+            if course.course_code:
+                if course.course_code in seen:
+                    yield course.course_code
+                seen.add(course.course_code)
+
+    def check_prereqs(
+        self, skip: Container[CourseCode] = frozenset()
+    ) -> Iterator[PrereqResult]:
+        """
+        Checks the prerequisites of each course in the plan with a course code,
+        except those in `skip`. Empty requirements are ignored.
+        """
+        for course in self.plan:
+            course_code = course.course_code
+            if not course_code or course_code in skip:
+                continue
+            reqs = prereqs(university.get_term_code(self.year, course.term_index)).get(
+                course_code
+            )
+            if reqs is None:
+                yield PrereqResult(course, course_code, None, [])
+                continue
+            yield PrereqResult(
+                course,
+                course_code,
+                reqs,
+                [
+                    req
+                    for req in reqs
+                    if req and not self.satisfies(req, course.term_index)
+                ],
+            )
@@ -0,0 +1,306 @@
+"""
+Loads the prerequisite and academic plan dumps (and the ISIS major code list, if
+present) into a SQLite database at files/plans.db. When the database exists,
+parse.py reads prereqs, plans, and major codes from it instead of the split CSV
+files; delete it to go back to the CSV files.
+
+Each plan's processed courses are stored too, indexed by course code, so
+questions like "which majors take MATH 18 in which quarter" are an index lookup
+rather than a scan over every plan.
+
+The database also stores the modification times of the files it was made from
+and of the scripts that process them. If any have changed since, parse.py
+warns and reads the CSV files instead.
+
+Exports:
+    `PlanCourse`, a course with a course code in a major's degree plan.
+
+    `plan_courses`, which lists the `PlanCourse`s of a year's plans, optionally
+    only those for a single course.
+
+    `plan_colleges`, which maps each major to the colleges it has plans for.
+
+python3 plan_db.py files/prereqs_fa23.csv files/academic_plans_fa23.csv
+python3 plan_db.py takers 2022 MATH 18
+"""
+
+import csv
+import json
+import os
+import sqlite3
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from parse import (
+    DATABASE_PATH,
+    MAJOR_COLUMNS,
+    PLAN_COLUMNS,
+    PREREQ_COLUMNS,
+    database,
+    database_stamp,
+    major_plans,
+    plan_rows_to_dict,
+)
+from parse_defs import CourseCode
+from university import university
+
+__all__ = ["PlanCourse", "plan_courses", "plan_colleges"]
+
+SCHEMA = f"""
+CREATE TABLE prereqs ({PREREQ_COLUMNS});
+CREATE TABLE plans ({PLAN_COLUMNS.replace("start_year", "start_year INTEGER").replace("plan_length", "plan_length INTEGER")});
+CREATE TABLE majors ({MAJOR_COLUMNS});
+CREATE TABLE meta (key, value);
+CREATE TABLE plan_courses (
+    year INTEGER,
+    plan_length INTEGER,
+    major,
+    college,
+    subject,
+    number,
+    term_index INTEGER,
+    for_major INTEGER
+);
+"""
+
+INDICES = """
+CREATE INDEX prereqs_by_course ON prereqs (term, subject, number);
+CREATE INDEX prereqs_by_prereq ON prereqs (req_subject, req_number);
+CREATE INDEX plans_by_major ON plans (start_year, major, college);
+CREATE INDEX plan_courses_by_year ON plan_courses (year, plan_length);
+CREATE INDEX plan_courses_by_course ON plan_courses (subject, number, year);
+"""
+
+
+class PlanCourse(NamedTuple):
+    major_code: str
+    college_code: str
+    course_code: CourseCode
+    term_index: int
+    for_major: bool
+
+
+def _prereq_rows(path: str) -> Iterator[List[str]]:
+    with open(path, newline="") as file:
+        reader = csv.reader(file)
+        next(reader)  # Skip header
+        for row in reader:
+            # Strip course codes so they can be looked up by index
+            for i in 3, 4, 7, 8:
+                row[i] = row[i].strip()
+            yield row
+
+
+def _plan_rows(path: str) -> Iterator[List[str]]:
+    with open(path, newline="") as file:
+        reader = csv.reader(file)
+        next(reader)  # Skip header
+        for row in reader:
+            # Plan Length was added in later dumps
+            yield row[0:11] + [row[11] if len(row) > 11 else "4"]
+
+
+def _major_rows(path: str) -> Iterator[List[str]]:
+    with open(path, newline="") as file:
+        reader = csv.reader(file)
+        next(reader)  # Skip header
+        for row in reader:
+            yield (row + [""] * 14)[0:14]
+
+
+def ordered_colleges(colleges: Iterable[str]) -> List[str]:
+    """
+    Sorts college codes in the order of `university.college_codes`, followed by
+    any other college codes.
+    """
+    return sorted(
+        colleges,
+        key=lambda college: (
+            (0, university.college_codes.index(college), "")
+            if college in university.college_codes
+            else (1, 0, college)
+        ),
+    )
+
+
+def _placeholders(columns: str) -> str:
+    return ", ".join("?" for _ in columns.split(","))
+
+
+def _processed_rows(
+    database: sqlite3.Connection,
+) -> Iterator[Tuple[int, int, str, str, str, str, int, bool]]:
+    """
+    Processes every plan in the database, in the same order that scripts
+    iterate over them (by major, then `university.college_codes`).
+    """
+    groups = database.execute(
+        "SELECT DISTINCT start_year, plan_length FROM plans ORDER BY start_year, plan_length"
+    ).fetchall()
+    for year, length in groups:
+        plans = plan_rows_to_dict(
+            database.execute(
+                f"SELECT {PLAN_COLUMNS} FROM plans WHERE start_year = ? AND plan_length = ? ORDER BY rowid",
+                (year, length),
+            )
+        )
+        for major_code, major_plan in plans.items():
+            for college in ordered_colleges(major_plan.colleges):
+                for course in major_plan.plan(college):
+                    if course.course_code:
+                        yield (
+                            year,
+                            length,
+                            major_code,
+                            college,
+                            course.course_code.subject,
+                            course.course_code.number,
+                            course.term_index,
+                            course.for_major,
+                        )
+
+
+def ingest(prereqs_path: str, plans_path: str, majors_path: Optional[str]) -> None:
+    temp_path = DATABASE_PATH + ".tmp"
+    try:
+        os.remove(temp_path)
+    except FileNotFoundError:
+        pass
+    inputs = [
+        os.path.abspath(path)
+        for path in [prereqs_path, plans_path, majors_path]
+        if path is not None
+    ]
+    database = sqlite3.connect(temp_path)
+    database.executescript(SCHEMA)
+    with database:
+        database.executemany(
+            "INSERT INTO meta VALUES (?, ?)",
+            [
+                ("inputs", json.dumps(inputs)),
+                ("stamp", json.dumps(database_stamp(inputs))),
+            ],
+        )
+        database.executemany(
+            f"INSERT INTO prereqs VALUES ({_placeholders(PREREQ_COLUMNS)})",
+            _prereq_rows(prereqs_path),
+        )
+        database.executemany(
+            f"INSERT INTO plans VALUES ({_placeholders(PLAN_COLUMNS)})",
+            _plan_rows(plans_path),
+        )
+        if majors_path:
+            database.executemany(
+                f"INSERT INTO majors VALUES ({_placeholders(MAJOR_COLUMNS)})",
+                _major_rows(majors_path),
+            )
+        database.executemany(
+            "INSERT INTO plan_courses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            _processed_rows(database),
+        )
+    database.executescript(INDICES)
+    database.execute("ANALYZE")
+    database.close()
+    os.replace(temp_path, DATABASE_PATH)
+
+
+def plan_courses(
+    year: int, course_code: Optional[CourseCode] = None, length: int = 4
+) -> Iterable[PlanCourse]:
+    """
+    Lists the courses with course codes in every plan of the given year, by
+    major and then college in the order of `ordered_colleges`. If
+    `course_code` is given, only that course is listed, which is an index
+    lookup if the database exists.
+    """
+    connection = database()
+    if connection:
+        query = "SELECT major, college, subject, number, term_index, for_major FROM plan_courses WHERE year = ? AND plan_length = ?"
+        params: List[object] = [year, length]
+        if course_code:
+            query = "SELECT major, college, subject, number, term_index, for_major FROM plan_courses WHERE subject = ? AND number = ? AND year = ? AND plan_length = ?"
+            params = [course_code.subject, course_code.number, year, length]
+        return [
+            PlanCourse(
+                major_code,
+                college_code,
+                CourseCode(subject, number),
+                term_index,
+                bool(for_major),
+            )
+            for (
+                major_code,
+                college_code,
+                subject,
+                number,
+                term_index,
+                for_major,
+            ) in connection.execute(query + " ORDER BY rowid", params)
+        ]
+    return [
+        PlanCourse(
+            major_code,
+            college,
+            course.course_code,
+            course.term_index,
+            course.for_major,
+        )
+        for major_code, plans in major_plans(year, length).items()
+        for college in ordered_colleges(plans.colleges)
+        for course in plans.plan(college)
+        if course.course_code
+        and (course_code is None or course.course_code == course_code)
+    ]
+
+
+def plan_colleges(year: int, length: int = 4) -> Dict[str, Set[str]]:
+    """
+    Maps each major to the colleges that it has plans for, like
+    `MajorPlans.colleges`, without parsing the plans if the database exists.
+    """
+    connection = database()
+    if connection:
+        colleges: Dict[str, Set[str]] = {}
+        for major_code, college in connection.execute(
+            "SELECT DISTINCT major, college FROM plans WHERE start_year = ? AND plan_length = ?",
+            (year, length),
+        ):
+            if major_code not in colleges:
+                colleges[major_code] = set()
+            if university.keep_plan(year, college):
+                colleges[major_code].add(college)
+        return colleges
+    return {
+        major_code: plans.colleges
+        for major_code, plans in major_plans(year, length).items()
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) == 5 and sys.argv[1] == "takers":
+        _, _, year, subject, number = sys.argv
+        for major_code, college, _, term_index, for_major in plan_courses(
+            int(year), CourseCode(subject.upper(), number.upper())
+        ):
+            print(
+                f"{major_code} {college} {university.get_term_code(int(year), term_index)}"
+                + ("" if for_major else " (GE)")
+            )
+    elif len(sys.argv) >= 3:
+        ingest(
+            sys.argv[1],
+            sys.argv[2],
+            (
+                sys.argv[3]
+                if len(sys.argv) > 3
+                else (
+                    university.majors_file
+                    if os.path.exists(university.majors_file)
+                    else None
+                )
+            ),
+        )
+    else:
+        print("python3 plan_db.py <prereqs path> <plans path> [majors path]")
+        print("python3 plan_db.py takers <year> <subject> <number>")
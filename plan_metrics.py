@@ -2,8 +2,10 @@
 python3 plan_metrics.py
 """
 
+from typing import List
 from output import MajorOutput
-from parse import MajorPlans, major_plans
+from parse import MajorPlans, major_plans, plan_years
+from profiling import timed
 from university import university
 from util import CsvWriter, bool_str, float_str
 
@@ -39,15 +41,18 @@ HEADER = [
 ]
 
 
-def write_row(
-    writer: CsvWriter,
+@timed("plan_metrics.metrics_row")
+def metrics_row(
     year: int,
     major: str,
     college: str,
     plans: MajorPlans,
     output: MajorOutput,
     significant_difference: str,
-) -> None:
+) -> List[str]:
+    """
+    Computes the metrics of a degree plan as a row of `HEADER`.
+    """
     courses = plans.plan(college)
     degree_plan = output.output_degree_plan(college)
     curriculum = degree_plan.curriculum
@@ -58,7 +63,7 @@ def write_row(
     longest_path = curriculum.longest_paths[0] if curriculum.longest_paths else []
     redundant_reqs = curriculum.extraneous_requisites()
 
-    writer.row(
+    return [
         str(year),  # Year
         major,  # Major
         college,  # College
@@ -101,7 +106,21 @@ def write_row(
         # Has < 12-unit term?
         bool_str(any(term.credit_hours < 12 for term in degree_plan.terms)),
         significant_difference,  # Has > 6 unit difference across colleges?
-    )
+    ]
+
+
+def significant_difference(plans: MajorPlans) -> str:
+    """
+    Whether the total units of a major's plans differ by more than 6 units
+    across colleges.
+    """
+    plan_units = [
+        course.units
+        for college in university.college_codes
+        if college in plans.colleges
+        for course in plans.plan(college)
+    ]
+    return bool_str(max(plan_units) - min(plan_units) > 6)
 
 
 def main() -> None:
@@ -109,31 +128,16 @@ def main() -> None:
         writer = CsvWriter(len(HEADER), file)
         writer.row(*HEADER)
 
-        for year in range(2015, 2050):
-            majors = major_plans(year)
-            if majors == {}:
-                break
-            for major, plans in majors.items():
+        for year in plan_years():
+            for major, plans in major_plans(year).items():
                 output = MajorOutput(plans)
-                plan_units = [
-                    course.units
-                    for college in university.college_codes
-                    if college in plans.colleges
-                    for course in plans.plan(college)
-                ]
-                significant_difference = bool_str(max(plan_units) - min(plan_units) > 6)
+                difference = significant_difference(plans)
 
                 for college in university.college_codes:
                     if college not in plans.colleges:
                         continue
-                    write_row(
-                        writer,
-                        year,
-                        major,
-                        college,
-                        plans,
-                        output,
-                        significant_difference,
+                    writer.row(
+                        *metrics_row(year, major, college, plans, output, difference)
                     )
 
 
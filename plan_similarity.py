@@ -0,0 +1,272 @@
+"""
+Finds degree plans that are near copies of each other, across majors and
+years, such as majors that share a template or plans that were copy-pasted
+with mistakes.
+
+Each plan is reduced to the set of its course codes (or, with `--positions`,
+course codes paired with the term they're taken), and plans are compared by
+the Jaccard similarity of these sets. Comparing every pair of plans would be
+slow, so the index stores a MinHash signature of each plan and buckets the
+signatures with locality-sensitive hashing (LSH): plans that share a bucket
+are likely similar, and only they are compared exactly.
+
+Building the index parses every plan, so it's saved to files/plan_index.npz,
+and queries load it from there.
+
+python3 plan_similarity.py build [--positions]
+python3 plan_similarity.py similar 2021 CS26 RE [count]
+python3 plan_similarity.py pairs 0.9 > files/similar_plans.csv
+
+Exports:
+    `PlanIndex`, the MinHash/LSH index over every plan.
+"""
+
+from typing import Dict, Iterator, List, NamedTuple, Sequence, Set, Tuple
+import zlib
+
+import numpy as np
+import numpy.typing as npt
+
+from parse import major_plans, plan_years
+from parse_defs import ProcessedCourse
+from units_per_course import PlanId
+
+INDEX_PATH = "./files/plan_index.npz"
+
+PERMUTATIONS = 128
+BANDS = 32
+"""
+With 4 rows per band, plans with a Jaccard similarity of 0.5 share a bucket
+with a probability of about 87%, and 0.7 about 99.98%.
+"""
+
+_MASK_32 = np.uint64(0xFFFFFFFF)
+
+
+def plan_features(
+    plan: List[ProcessedCourse], positions: bool
+) -> npt.NDArray[np.uint32]:
+    """
+    Hashes the course codes of a plan (with their term indices if `positions`
+    is true) to a sorted array of unique 32-bit integers.
+    """
+    return np.unique(
+        np.array(
+            [
+                zlib.crc32(
+                    (
+                        f"{course.course_code}@{course.term_index}"
+                        if positions
+                        else str(course.course_code)
+                    ).encode("utf-8")
+                )
+                for course in plan
+                if course.course_code
+            ],
+            dtype=np.uint32,
+        )
+    )
+
+
+def _permutations(
+    seed: int = 0,
+) -> Tuple[npt.NDArray[np.uint64], npt.NDArray[np.uint64]]:
+    # Multiply-shift hashing: (a * x + b) >> 32 with an odd 64-bit `a`
+    rng = np.random.default_rng(seed)
+    a = rng.integers(0, 2**63, PERMUTATIONS, dtype=np.uint64) * np.uint64(2)
+    b = rng.integers(0, 2**63, PERMUTATIONS, dtype=np.uint64)
+    return a + np.uint64(1), b
+
+
+class SimilarPlan(NamedTuple):
+    plan: PlanId
+    similarity: float
+
+
+class PlanIndex:
+    plans: List[PlanId]
+    positions: bool
+    _plan_index: Dict[PlanId, int]
+    _offsets: npt.NDArray[np.int64]
+    "Plan `i`'s features are `_features[_offsets[i] : _offsets[i + 1]]`."
+    _features: npt.NDArray[np.uint32]
+    _signatures: npt.NDArray[np.uint32]
+    "A row of `PERMUTATIONS` minimum hashes per plan."
+    _buckets: List[Dict[bytes, List[int]]]
+    "For each band, the plans whose signatures have the same values in it."
+
+    def __init__(
+        self,
+        plans: List[PlanId],
+        positions: bool,
+        offsets: npt.NDArray[np.int64],
+        features: npt.NDArray[np.uint32],
+        signatures: npt.NDArray[np.uint32],
+    ) -> None:
+        self.plans = plans
+        self.positions = positions
+        self._plan_index = {plan: i for i, plan in enumerate(plans)}
+        self._offsets = offsets
+        self._features = features
+        self._signatures = signatures
+        rows = PERMUTATIONS // BANDS
+        self._buckets = []
+        for band in range(BANDS):
+            buckets: Dict[bytes, List[int]] = {}
+            band_signatures = np.ascontiguousarray(
+                signatures[:, band * rows : (band + 1) * rows]
+            )
+            for i, key in enumerate(band_signatures):
+                bucket = key.tobytes()
+                if bucket not in buckets:
+                    buckets[bucket] = []
+                buckets[bucket].append(i)
+            self._buckets.append(buckets)
+
+    @classmethod
+    def build(cls, years: Sequence[int], positions: bool = False) -> "PlanIndex":
+        """
+        Parses every plan from the given years and computes their signatures.
+        Plans without any course codes are left out.
+        """
+        plans: List[PlanId] = []
+        feature_sets: List[npt.NDArray[np.uint32]] = []
+        for year in years:
+            for major_code, major_plan in major_plans(year).items():
+                for college in sorted(major_plan.colleges):
+                    features = plan_features(major_plan.plan(college), positions)
+                    if len(features) > 0:
+                        plans.append(PlanId(year, major_code, college))
+                        feature_sets.append(features)
+        offsets = np.zeros(len(plans) + 1, dtype=np.int64)
+        np.cumsum([len(features) for features in feature_sets], out=offsets[1:])
+        features = (
+            np.concatenate(feature_sets) if feature_sets else np.zeros(0, np.uint32)
+        )
+
+        # Hash every feature of every plan with one permutation at a time, then
+        # take the minimum within each plan
+        a, b = _permutations()
+        values = features.astype(np.uint64)
+        signatures = np.zeros((len(plans), PERMUTATIONS), dtype=np.uint32)
+        if len(plans) > 0:
+            for i in range(PERMUTATIONS):
+                hashes = ((a[i] * values + b[i]) >> np.uint64(32)) & _MASK_32
+                signatures[:, i] = np.minimum.reduceat(hashes, offsets[:-1])
+        return cls(plans, positions, offsets, features, signatures)
+
+    def save(self, path: str = INDEX_PATH) -> None:
+        np.savez_compressed(
+            path,
+            plans=np.array([list(map(str, plan)) for plan in self.plans]),
+            positions=np.array(self.positions),
+            offsets=self._offsets,
+            features=self._features,
+            signatures=self._signatures,
+        )
+
+    @classmethod
+    def load(cls, path: str = INDEX_PATH) -> "PlanIndex":
+        with np.load(path) as data:
+            return cls(
+                [
+                    PlanId(int(year), major, college)
+                    for year, major, college in data["plans"].tolist()
+                ],
+                bool(data["positions"]),
+                data["offsets"],
+                data["features"],
+                data["signatures"],
+            )
+
+    def _features_of(self, i: int) -> npt.NDArray[np.uint32]:
+        return self._features[self._offsets[i] : self._offsets[i + 1]]
+
+    def jaccard(self, i: int, j: int) -> float:
+        """
+        The exact Jaccard similarity of two plans' feature sets, by index.
+        """
+        a = self._features_of(i)
+        b = self._features_of(j)
+        shared = len(np.intersect1d(a, b, assume_unique=True))
+        return shared / (len(a) + len(b) - shared)
+
+    def _candidates(self, i: int) -> Iterator[int]:
+        rows = PERMUTATIONS // BANDS
+        seen = {i}
+        for band, buckets in enumerate(self._buckets):
+            key = np.ascontiguousarray(
+                self._signatures[i, band * rows : (band + 1) * rows]
+            ).tobytes()
+            for j in buckets[key]:
+                if j not in seen:
+                    seen.add(j)
+                    yield j
+
+    def similar(self, plan: PlanId, count: int = 10) -> List[SimilarPlan]:
+        """
+        The plans most similar to a plan, most similar first. Only plans that
+        share an LSH bucket with it are considered, so plans with a similarity
+        below about 0.4 are likely to be missed.
+        """
+        i = self._plan_index[plan]
+        similar = [
+            SimilarPlan(self.plans[j], self.jaccard(i, j)) for j in self._candidates(i)
+        ]
+        similar.sort(key=lambda similar_plan: -similar_plan.similarity)
+        return similar[:count]
+
+    def pairs(self, threshold: float) -> List[Tuple[PlanId, PlanId, float]]:
+        """
+        Every pair of plans with a Jaccard similarity of at least `threshold`,
+        most similar first.
+        """
+        checked: Set[Tuple[int, int]] = set()
+        pairs: List[Tuple[PlanId, PlanId, float]] = []
+        for buckets in self._buckets:
+            for bucket in buckets.values():
+                for index, i in enumerate(bucket):
+                    for j in bucket[index + 1 :]:
+                        if (i, j) in checked:
+                            continue
+                        checked.add((i, j))
+                        similarity = self.jaccard(i, j)
+                        if similarity >= threshold:
+                            pairs.append((self.plans[i], self.plans[j], similarity))
+        pairs.sort(key=lambda pair: -pair[2])
+        return pairs
+
+
+def main(args: List[str]) -> None:
+    import csv
+    import sys
+
+    if args[0] == "build":
+        index = PlanIndex.build(plan_years(), "--positions" in args)
+        index.save()
+        print(f"Indexed {len(index.plans)} plans in {INDEX_PATH}", file=sys.stderr)
+    elif args[0] == "similar":
+        index = PlanIndex.load()
+        plan = PlanId(int(args[1]), args[2], args[3])
+        for similar, similarity in index.similar(
+            plan, int(args[4]) if len(args) > 4 else 10
+        ):
+            print(f"{similarity:.3f} {similar}")
+    elif args[0] == "pairs":
+        index = PlanIndex.load()
+        writer = csv.writer(sys.stdout)
+        writer.writerow(["Plan", "Other plan", "Similarity"])
+        for plan, other, similarity in index.pairs(float(args[1])):
+            writer.writerow([plan, other, f"{similarity:.3f}"])
+    else:
+        raise ValueError(f"Unknown command {args[0]}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        raise ValueError(
+            "python3 plan_similarity.py (build [--positions]|similar <year> <major> <college> [count]|pairs <threshold>)"
+        )
+    main(sys.argv[1:])
@@ -0,0 +1,215 @@
+"""
+Opt-in timers and counters for finding out where a slow run spends its time:
+parsing CSVs, cleaning course titles, finding prereqs, Curricular Analytics
+metrics, or writing output.
+
+Instrumentation is off unless the `PROFILE` environment variable is set to
+something other than `0`, in which case the functions decorated with `timed`
+are timed and `count` keeps counts (such as cache hits and rows parsed). When
+the script exits, a table of each stage's calls and total time is printed to
+stderr. Stages can be nested (e.g. `output.list_courses` calls
+`parse.prereqs`), so their times include the stages they call.
+
+If `PROFILE` is a folder rather than `1`, the whole script is also profiled
+with cProfile, and the stats are saved to `<folder>/<script>.prof` for
+`python3 -m pstats` or snakeviz.
+
+Only the main process is measured, so run build_reports.py with `--jobs 1`.
+
+PROFILE=1 python3 plan_metrics.py
+PROFILE=files/profiles make tableau
+python3 profiling.py [--stats files/profiles] flag_issues.py 2024  # Same as setting PROFILE
+
+Exports:
+    `timed`, a decorator that times every call to a function under a stage
+    name.
+
+    `timer`, a context manager that times a block under a stage name.
+
+    `count`, which adds to a named counter.
+"""
+
+import atexit
+import cProfile
+from contextlib import contextmanager
+from functools import wraps
+import inspect
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, Generator, List, Optional, TypeVar
+
+__all__ = ["timed", "timer", "count"]
+
+enabled = os.environ.get("PROFILE", "") not in ("", "0")
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class _Stage:
+    calls: int
+    seconds: float
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.seconds = 0
+
+
+_stages: Dict[str, _Stage] = {}
+_counters: Dict[str, int] = {}
+_start = time.perf_counter()
+
+
+def _stage(name: str) -> _Stage:
+    if name not in _stages:
+        _stages[name] = _Stage()
+    return _stages[name]
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """
+    Times calls to the decorated function under the stage `name`. For generator
+    functions, only the time spent producing each item is counted, not the
+    time the caller spends between items.
+
+    When instrumentation is off, the function is returned as is, so there's no
+    overhead.
+    """
+
+    def decorate(function: F) -> F:
+        if not enabled:
+            return function
+        stage = _stage(name)
+
+        if inspect.isgeneratorfunction(function):
+
+            @wraps(function)
+            def wrapper_generator(
+                *args: Any, **kwargs: Any
+            ) -> Generator[Any, None, Any]:
+                stage.calls += 1
+                generator = function(*args, **kwargs)
+                while True:
+                    start = time.perf_counter()
+                    try:
+                        item = next(generator)
+                    except StopIteration as stop:
+                        return stop.value
+                    finally:
+                        stage.seconds += time.perf_counter() - start
+                    yield item
+
+            return wrapper_generator  # type: ignore
+
+        @wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            stage.calls += 1
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                stage.seconds += time.perf_counter() - start
+
+        return wrapper  # type: ignore
+
+    return decorate
+
+
+@contextmanager
+def timer(name: str) -> Generator[None, None, None]:
+    """
+    Times the body of a `with` block under the stage `name`.
+    """
+    if not enabled:
+        yield
+        return
+    stage = _stage(name)
+    stage.calls += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage.seconds += time.perf_counter() - start
+
+
+def count(name: str, amount: int = 1) -> None:
+    """
+    Adds `amount` to the counter `name`.
+    """
+    if enabled:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def summary() -> List[str]:
+    """
+    Formats the stage times and counters as lines of a table, slowest first.
+    """
+    lines = [f"{'Stage':<36}{'Calls':>10}{'Total':>11}{'Mean':>11}"]
+    for name, stage in sorted(
+        _stages.items(), key=lambda entry: entry[1].seconds, reverse=True
+    ):
+        if stage.calls == 0:
+            continue
+        mean = stage.seconds / stage.calls * 1000
+        lines.append(
+            f"{name:<36}{stage.calls:>10}{stage.seconds:>10.3f}s{mean:>9.3f}ms"
+        )
+    lines.append(f"{'(total)':<36}{'':>10}{time.perf_counter() - _start:>10.3f}s")
+    if _counters:
+        lines.append("")
+        lines.append(f"{'Counter':<36}{'Count':>10}")
+        for name, amount in sorted(_counters.items()):
+            lines.append(f"{name:<36}{amount:>10}")
+    return lines
+
+
+def _script_name() -> str:
+    if not sys.argv or not sys.argv[0] or sys.argv[0] == "-c":
+        return "python"
+    return os.path.splitext(os.path.basename(sys.argv[0]))[0]
+
+
+def _report(profiler: Optional[cProfile.Profile], stats_dir: str) -> None:
+    if profiler:
+        profiler.disable()
+        os.makedirs(stats_dir, exist_ok=True)
+        path = os.path.join(stats_dir, f"{_script_name()}.prof")
+        profiler.dump_stats(path)
+        print(f"Saved cProfile stats to {path}", file=sys.stderr)
+    print("\n".join(summary()), file=sys.stderr)
+
+
+def _start_profiling() -> None:
+    stats_dir = os.environ.get("PROFILE", "")
+    profiler: Optional[cProfile.Profile] = None
+    if stats_dir != "1":
+        profiler = cProfile.Profile()
+        profiler.enable()
+    atexit.register(_report, profiler, stats_dir)
+
+
+if enabled and __name__ != "__main__":
+    _start_profiling()
+
+
+if __name__ == "__main__":
+    import argparse
+    import importlib
+    import runpy
+
+    parser = argparse.ArgumentParser(
+        description="Runs a script with the timers and counters enabled."
+    )
+    parser.add_argument("--stats", help="Also saves cProfile stats to this folder.")
+    parser.add_argument("script")
+    parser.add_argument("args", nargs=argparse.REMAINDER)
+    args = parser.parse_args()
+
+    os.environ["PROFILE"] = args.stats or "1"
+    sys.argv = [args.script, *args.args]
+    sys.path.insert(0, os.path.dirname(os.path.abspath(args.script)))
+    # Import this file again as a regular module, which starts profiling before
+    # the script runs, so the modules it instruments share its timers
+    importlib.import_module("profiling")
+
+    runpy.run_path(args.script, run_name="__main__")
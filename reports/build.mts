@@ -1,15 +1,16 @@
-// node --experimental-strip-types reports/build.mts <project> (build|watch)
+// node --experimental-strip-types reports/build.mts (build|watch) <project> [entry]
+// `entry` is the file in the project to bundle, index.tsx by default.
 
 import * as esbuild from 'esbuild'
 import { exit } from 'process'
 
 const subcommands = ['build', 'watch']
-const [, , subcommand, project] = process.argv
+const [, , subcommand, project, entry = 'index'] = process.argv
 if (!project || !subcommands.includes(subcommand)) {
   console.error(
     `Usage: node --experimental-strip-types reports/build.mts (${subcommands.join(
       '|'
-    )}) <project>`
+    )}) <project> [entry]`
   )
   exit(1)
 }
@@ -17,8 +18,10 @@ if (!project || !subcommands.includes(subcommand)) {
 const watchMode = subcommand === 'watch'
 
 const context = await esbuild.context({
-  entryPoints: [`reports/${project}/index.tsx`],
-  outfile: `reports/output/${project}.js`,
+  entryPoints: [`reports/${project}/${entry}.tsx`],
+  outfile: `reports/output/${
+    entry === 'index' ? project : `${project}-${entry}`
+  }.js`,
   bundle: true,
   minify: !watchMode,
   sourcemap: watchMode
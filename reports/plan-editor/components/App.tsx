@@ -1,4 +1,4 @@
-import { useState } from 'react'
+import { useEffect, useState } from 'react'
 import { CourseCode, Prereqs } from '../../util/Prereqs'
 import { AcademicPlan } from '../types'
 import { Editor } from './Editor'
@@ -9,12 +9,22 @@ export type AppProps = {
   prereqs: Prereqs
   initPlan: AcademicPlan
   mode: 'student' | 'advisor'
+  /** Course codes to suggest, if `prereqs` doesn't have every course. */
+  courseCodes?: CourseCode[]
+  /** Called with every course in the plan whenever it changes. */
+  onCourses?: (courseCodes: CourseCode[]) => void
 }
 /**
  * The top-level component containing the plan metadata and editor and the
  * sidebar.
  */
-export function App ({ prereqs: initPrereqs, initPlan, mode }: AppProps) {
+export function App ({
+  prereqs: initPrereqs,
+  initPlan,
+  mode,
+  courseCodes,
+  onCourses
+}: AppProps) {
   const [plan, setPlan] = useState(initPlan)
   const [customPrereqs, setCustomPrereqs] = useState<Prereqs>({})
   const [assumedSatisfied, setAssumedSatisfied] = useState<CourseCode[]>([
@@ -25,6 +35,10 @@ export function App ({ prereqs: initPrereqs, initPlan, mode }: AppProps) {
 
   const prereqs = { ...initPrereqs, ...customPrereqs }
 
+  useEffect(() => {
+    onCourses?.(plan.years.flat(2).map(course => course.title))
+  }, [plan, onCourses])
+
   return (
     <>
       <main className='main'>
@@ -66,7 +80,7 @@ export function App ({ prereqs: initPrereqs, initPlan, mode }: AppProps) {
         mode={mode}
       />
       <datalist id='courses'>
-        {Object.keys(prereqs).map(code => (
+        {(courseCodes ?? Object.keys(prereqs)).map(code => (
           <option value={code} key={code} />
         ))}
       </datalist>
@@ -4,12 +4,10 @@ import { App } from './components/App'
 import { fromSearchParams } from './save-to-url'
 import prereqs from '../output/prereqs.json'
 
-createRoot(document.getElementById('root')!).render(
-  <StrictMode>
-    <App
-      prereqs={prereqs}
-      initPlan={fromSearchParams(new URL(window.location.href).searchParams)}
-      mode='advisor'
-    />
-  </StrictMode>
-)
+fromSearchParams(new URL(window.location.href).searchParams).then(initPlan => {
+  createRoot(document.getElementById('root')!).render(
+    <StrictMode>
+      <App prereqs={prereqs} initPlan={initPlan} mode='advisor' />
+    </StrictMode>
+  )
+})
@@ -9,7 +9,64 @@ export type UrlCourseJson = [
   forCredit?: number
 ]
 
-export function fromSearchParams (params: URLSearchParams): AcademicPlan {
+const PLAN_DEFLATED = 1
+
+function fromBase64Url (base64: string): Uint8Array {
+  const binary = atob(base64.replaceAll('-', '+').replaceAll('_', '/'))
+  return Uint8Array.from(binary, char => char.charCodeAt(0))
+}
+
+async function inflate (bytes: Uint8Array): Promise<Uint8Array> {
+  const stream = new Blob([bytes])
+    .stream()
+    .pipeThrough(new DecompressionStream('deflate-raw'))
+  return new Uint8Array(await new Response(stream).arrayBuffer())
+}
+
+/**
+ * Decodes the `plan` URL parameter made by `encode_plan` in dump_plans.py.
+ */
+export async function decodePlan (encoded: string): Promise<UrlCourseJson[]> {
+  const payload = fromBase64Url(encoded)
+  const bytes =
+    payload[0] === PLAN_DEFLATED
+      ? await inflate(payload.subarray(1))
+      : payload.subarray(1)
+  let index = 0
+  function varint (): number {
+    let value = 0
+    let shift = 0
+    let byte: number
+    do {
+      byte = bytes[index++]
+      value += (byte & 0x7f) * 2 ** shift
+      shift += 7
+    } while (byte & 0x80)
+    return value
+  }
+  const decoder = new TextDecoder()
+  const titles = Array.from({ length: varint() }, () => {
+    const length = varint()
+    const title = decoder.decode(bytes.subarray(index, index + length))
+    index += length
+    return title
+  })
+  return Array.from({ length: varint() }, (): UrlCourseJson => {
+    const title = titles[varint()]
+    const unitsAndRequirement = varint()
+    const term = varint()
+    return [
+      title,
+      (unitsAndRequirement >> 2) / 4,
+      unitsAndRequirement & 0b11,
+      term
+    ]
+  })
+}
+
+export async function fromSearchParams (
+  params: URLSearchParams
+): Promise<AcademicPlan> {
   const plan: AcademicPlan = {
     startYear: String(new Date().getFullYear()),
     years: [],
@@ -39,9 +96,14 @@ export function fromSearchParams (params: URLSearchParams): AcademicPlan {
   plan.collegeName = colleges[plan.collegeCode]
   urlParam('degreeType', 'degree')
   const termCount = params.get('terms')
+  const encodedPlan = params.get('plan')
   const coursesJson = params.get('courses')
   const courses: UrlCourseJson[] | null =
-    coursesJson !== null ? JSON.parse(coursesJson) : null
+    encodedPlan !== null
+      ? await decodePlan(encodedPlan)
+      : coursesJson !== null
+        ? JSON.parse(coursesJson)
+        : null
   const terms = Math.max(
     courses?.reduce((cum, curr) => Math.max(cum, curr[3]), 0) ?? 0,
     termCount !== null ? +termCount : 12
@@ -0,0 +1,53 @@
+import { StrictMode, useCallback, useState } from 'react'
+import { createRoot } from 'react-dom/client'
+import { App } from './components/App'
+import { fromSearchParams } from './save-to-url'
+import { AcademicPlan } from './types'
+import { CourseCode, Prereqs, PrereqShards } from '../util/Prereqs'
+
+type ShardedAppProps = {
+  shards: PrereqShards
+  initPrereqs: Prereqs
+  initPlan: AcademicPlan
+}
+/**
+ * The plan editor, but prereqs are fetched from `prereqs/` next to the page
+ * for only the subjects in the plan rather than bundled into the page. See
+ * `PrereqShards`.
+ */
+function ShardedApp ({ shards, initPrereqs, initPlan }: ShardedAppProps) {
+  const [prereqs, setPrereqs] = useState(initPrereqs)
+  const handleCourses = useCallback(
+    (courseCodes: CourseCode[]) => {
+      shards.get(courseCodes).then(setPrereqs)
+    },
+    [shards]
+  )
+  return (
+    <App
+      prereqs={prereqs}
+      initPlan={initPlan}
+      mode='advisor'
+      courseCodes={shards.catalog}
+      onCourses={handleCourses}
+    />
+  )
+}
+
+Promise.all([
+  PrereqShards.fetch(new URL('./prereqs/', window.location.href)),
+  fromSearchParams(new URL(window.location.href).searchParams)
+]).then(async ([shards, initPlan]) => {
+  const initPrereqs = await shards.get(
+    initPlan.years.flat(2).map(course => course.title)
+  )
+  createRoot(document.getElementById('root')!).render(
+    <StrictMode>
+      <ShardedApp
+        shards={shards}
+        initPrereqs={initPrereqs}
+        initPlan={initPlan}
+      />
+    </StrictMode>
+  )
+})
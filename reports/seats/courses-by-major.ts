@@ -1,4 +1,5 @@
 import { CourseCode } from '../util/Prereqs'
+import { GroupsByCourseRaw } from './students-by-group'
 
 // TODO: Remove
 
@@ -25,3 +26,51 @@ export type StudentsByGroup = {
 export function isMajorCode (code: MajorCode | CollegeCode): code is MajorCode {
   return code.length === 4
 }
+
+/**
+ * The columnar JSON from `courses_req_by_majors.py <year> json`. Each course
+ * taker is packed into an integer whose mixed-radix digits are, from most to
+ * least significant: the index of the major in `majors`, the index of the
+ * college in `colleges`, the term index (`year * quarterNames.length +
+ * quarter`), and whether it's for the major.
+ */
+export type GroupsByCourseCompact = {
+  colleges: [code: CollegeCode, name: string][]
+  quarterNames: string[]
+  majors: MajorCode[]
+  termCount: number
+  courseCodes: CourseCode[]
+  takers: number[][]
+}
+
+export function decodeGroupsByCourse ({
+  colleges,
+  quarterNames,
+  majors,
+  termCount,
+  courseCodes,
+  takers
+}: GroupsByCourseCompact): GroupsByCourseRaw {
+  return {
+    colleges,
+    quarterNames,
+    courses: courseCodes.map((courseCode, i) => ({
+      courseCode,
+      takers: takers[i].map(packed => {
+        const forMajor = packed % 2 === 1
+        packed = Math.floor(packed / 2)
+        const termIndex = packed % termCount
+        packed = Math.floor(packed / termCount)
+        const collegeIndex = packed % colleges.length
+        const majorIndex = Math.floor(packed / colleges.length)
+        return [
+          Math.floor(termIndex / quarterNames.length),
+          termIndex % quarterNames.length,
+          majors[majorIndex],
+          colleges[collegeIndex][0],
+          forMajor
+        ]
+      })
+    }))
+  }
+}
@@ -1,6 +1,10 @@
 import { StrictMode } from 'react'
 import { createRoot } from 'react-dom/client'
 import { App } from './components/App'
+// The seats report is unused (see the Makefile). `courses_req_by_majors.py
+// <year> json` outputs the compact shape that `decodeGroupsByCourse` decodes,
+// but `App` still expects the older `CoursesByGroupJson` shape, so the JSON is
+// passed through as is until `App` is rewritten or removed.
 // @ts-ignore (`make` no longer generates this file by default so I don't want
 // type errors from here showing up)
 import courses from '../../courses_req_by_majors.json'
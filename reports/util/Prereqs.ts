@@ -10,3 +10,108 @@ export function cleanCourseCode (userCourseCode: string): CourseCode | string {
   }
   return `${match[1]} ${match[2]}`
 }
+
+/**
+ * The prereqs of every term, written to `plan_csvs/prereqs/deltas.json` by
+ * `python3 dump_graphs.py files deltas`. `deltas[i]` has the courses whose
+ * prereqs changed between `terms[i]` and `terms[i + 1]`, or `null` if the
+ * course was removed.
+ */
+export type PrereqDeltas = {
+  terms: string[]
+  base: Prereqs
+  deltas: Record<CourseCode, CourseCode[][] | null>[]
+}
+
+export function prereqsAtTerm (snapshots: PrereqDeltas, term: string): Prereqs {
+  const index = snapshots.terms.indexOf(term)
+  if (index === -1) {
+    throw new RangeError(`No prereqs for ${term}.`)
+  }
+  const prereqs = { ...snapshots.base }
+  for (const delta of snapshots.deltas.slice(0, index)) {
+    for (const [courseCode, reqs] of Object.entries(delta)) {
+      if (reqs) {
+        prereqs[courseCode] = reqs
+      } else {
+        delete prereqs[courseCode]
+      }
+    }
+  }
+  return prereqs
+}
+
+/**
+ * `manifest.json` from `python3 dump_prereqs.py <term> shards [ids]`.
+ * `courses` starts with the `catalog_size` courses that have prereqs listed.
+ */
+export type PrereqManifest = {
+  ids: boolean
+  courses: CourseCode[]
+  catalog_size: number
+  subjects: string[]
+}
+type IdShard = [course: number, reqs: number[][]][]
+
+/**
+ * Fetches the prereqs of each subject from the shards written by
+ * `python3 dump_prereqs.py <term> shards` as they're needed, rather than
+ * loading every course's prereqs up front.
+ */
+export class PrereqShards {
+  #baseUrl: URL
+  #manifest: PrereqManifest
+  #shards: Record<string, Promise<Prereqs>> = {}
+
+  constructor (baseUrl: URL, manifest: PrereqManifest) {
+    this.#baseUrl = baseUrl
+    this.#manifest = manifest
+  }
+
+  static async fetch (baseUrl: URL): Promise<PrereqShards> {
+    const response = await fetch(new URL('manifest.json', baseUrl))
+    return new PrereqShards(baseUrl, await response.json())
+  }
+
+  /**
+   * Every course that has prereqs listed, even if its subject hasn't been
+   * fetched yet.
+   */
+  get catalog (): CourseCode[] {
+    return this.#manifest.courses.slice(0, this.#manifest.catalog_size)
+  }
+
+  #fetchSubject (subject: string): Promise<Prereqs> {
+    this.#shards[subject] ??= fetch(new URL(`${subject}.json`, this.#baseUrl))
+      .then(response => response.json())
+      .then((shard: Prereqs | IdShard): Prereqs => {
+        if (!this.#manifest.ids) {
+          return shard as Prereqs
+        }
+        const { courses } = this.#manifest
+        return Object.fromEntries(
+          (shard as IdShard).map(([course, reqs]) => [
+            courses[course],
+            reqs.map(req => req.map(alt => courses[alt]))
+          ])
+        )
+      })
+    return this.#shards[subject]
+  }
+
+  /**
+   * Fetches the subjects of `courseCodes` that haven't been fetched yet.
+   * Resolves to the prereqs of every subject fetched so far.
+   */
+  async get (courseCodes: CourseCode[]): Promise<Prereqs> {
+    const subjects = new Set(
+      courseCodes
+        .map(courseCode => courseCode.split(' ')[0])
+        .filter(subject => this.#manifest.subjects.includes(subject))
+    )
+    await Promise.all(
+      Array.from(subjects, subject => this.#fetchSubject(subject))
+    )
+    return Object.assign({}, ...(await Promise.all(Object.values(this.#shards))))
+  }
+}
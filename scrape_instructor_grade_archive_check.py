@@ -7,9 +7,7 @@ python3 scrape_instructor_grade_archive_check.py
 from collections import defaultdict
 import csv
 
-
-def parse(number: str) -> float:
-    return float(number.replace(",", "") or "0")
+from course_exports import read_dfw
 
 
 def as_parse(number: str) -> float:
@@ -19,28 +17,11 @@ def as_parse(number: str) -> float:
 def main():
     courses: dict[tuple[str, str], float] = {}
 
-    with open("./files/21-22 Enrollment_DFW CJ.xlsx.csv") as file:
-        reader = csv.reader(file)
-        # Skip header
-        next(reader)
-        next(reader)
-        course_code = ""
-        for (
-            course,
-            _title,
-            term,
-            _,  # Grand Total: % of Total Enrolled
-            total,  # Grand Total: N
-            _,  # ABC: % of Total Enrolled
-            abc_count,  # ABC: N
-            _,  # DFW: % of Total Enrolled
-            dfw_count,  # DFW: N
-        ) in reader:
-            course_code = course or course_code
-            if term:
-                courses[course_code, term] = parse(dfw_count) / parse(total)
-                # the assertion passes, meaning that P/NP is not included
-                assert parse(total) == parse(abc_count) + parse(dfw_count)
+    for row in read_dfw("./files/21-22 Enrollment_DFW CJ.xlsx.csv"):
+        if row.term:
+            courses[row.course_code, row.term] = row.dfw / row.total
+            # the assertion passes, meaning that P/NP is not included
+            assert row.total == row.abc + row.dfw
 
     # "as" refers to associated students since that's where this data is from
     as_courses_count: dict[tuple[str, str], int] = defaultdict(int)
@@ -0,0 +1,315 @@
+"""
+A local HTTP server that keeps the parsed plans and prereqs in memory, so
+questions about a single major or term don't pay for starting Python and parsing
+the data files every time. Each response is cached after it's first made, so
+repeated requests (such as from a report frontend in development) are just a
+dictionary lookup.
+
+Requests are handled one at a time because the caches in parse.py aren't
+thread-safe (and a SQLite connection can only be used by the thread that opened
+it).
+
+Endpoints (responses are CSV or JSON depending on the extension):
+    /                                      This list of endpoints
+    /years.json                            Years with plans
+    /terms.json                            Terms with prereqs
+    /majors/<year>.json                    Majors with their names and colleges
+    /curriculum/<year>/<major>.(csv|json)  Curricular Analytics curriculum
+    /plan/<year>/<major>/<college>.(csv|json)
+                                           Curricular Analytics degree plan
+    /prereqs/<term>.(csv|json)[?course=MATH+20C]
+                                           Prereqs of every course, or one
+    /ge-units/<year>.(csv|json)            Units of college courses per plan
+    /metrics/<year>/<major>/<college>.(csv|json)
+                                           The plan's row in metrics_fa12_py.csv
+
+python3 serve.py [port] [warm]  # Port 8001 by default; `warm` parses everything up front
+"""
+
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import json
+import re
+import sys
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from output import MajorOutput
+from parse import major_codes, major_plans, plan_years, prereqs, terms
+from parse_defs import CourseCode, TermCode
+from university import university
+from util import CsvWriter
+
+# Docstrings are stripped by `python -OO`, which leaves the index empty
+ENDPOINTS = __doc__.split("Endpoints")[1].split("\n\n")[0] if __doc__ else ":"
+
+Response = Tuple[str, str]
+"""
+The content type and body of a response.
+"""
+
+CONTENT_TYPES = {"csv": "text/csv; charset=utf-8", "json": "application/json"}
+
+# Like cleanCourseCode in reports/util/Prereqs.ts, so "math20c" is MATH 20C
+COURSE_CODE = re.compile(r"\s*([A-Z]+)\s*(\d+[A-Z]*)\s*")
+
+
+class NotFound(Exception):
+    pass
+
+
+class BadRequest(Exception):
+    pass
+
+
+_outputs: Dict[Tuple[int, str], MajorOutput] = {}
+
+
+def major_output(year: int, major_code: str) -> MajorOutput:
+    if (year, major_code) not in _outputs:
+        plans = major_plans(year)
+        if major_code not in plans:
+            raise NotFound(f"No plans for {major_code} in {year}.")
+        _outputs[year, major_code] = MajorOutput(plans[major_code])
+    return _outputs[year, major_code]
+
+
+def csv_response(rows: List[List[str]]) -> Response:
+    writer = CsvWriter(max(len(row) for row in rows))
+    for row in rows:
+        writer.row(*row)
+    return CONTENT_TYPES["csv"], writer.done()
+
+
+def json_response(value: object) -> Response:
+    return CONTENT_TYPES["json"], json.dumps(value)
+
+
+def table_response(
+    extension: str, header: List[str], rows: List[List[str]]
+) -> Response:
+    if extension == "csv":
+        return csv_response([header, *rows])
+    return json_response([dict(zip(header, row)) for row in rows])
+
+
+def get_index(match: re.Match[str], query: Dict[str, List[str]]) -> Response:
+    return "text/plain; charset=utf-8", "Endpoints" + ENDPOINTS + "\n"
+
+
+def get_years(match: re.Match[str], query: Dict[str, List[str]]) -> Response:
+    return json_response(plan_years())
+
+
+def get_terms(match: re.Match[str], query: Dict[str, List[str]]) -> Response:
+    return json_response(terms())
+
+
+def get_majors(match: re.Match[str], query: Dict[str, List[str]]) -> Response:
+    return json_response(
+        {
+            major_code: {
+                "name": major_codes()[major_code].name,
+                "department": major_codes()[major_code].department,
+                "colleges": [
+                    college
+                    for college in university.college_codes
+                    if college in plans.colleges
+                ],
+            }
+            for major_code, plans in major_plans(int(match["year"])).items()
+        }
+    )
+
+
+def plan_response(
+    year: int, major_code: str, college: Optional[str], extension: str
+) -> Response:
+    """
+    Outputs a degree plan, or the major's curriculum if `college` is None.
+    """
+    output = major_output(year, major_code)
+    if college is not None and college not in output.plans.colleges:
+        raise NotFound(f"No {college} plan for {major_code} in {year}.")
+    if extension == "csv":
+        return CONTENT_TYPES["csv"], output.output(college)
+    return json_response(output.output_json(college))
+
+
+def get_curriculum(match: re.Match[str], query: Dict[str, List[str]]) -> Response:
+    return plan_response(int(match["year"]), match["major"], None, match["ext"])
+
+
+def get_plan(match: re.Match[str], query: Dict[str, List[str]]) -> Response:
+    return plan_response(
+        int(match["year"]), match["major"], match["college"], match["ext"]
+    )
+
+
+def get_prereqs(match: re.Match[str], query: Dict[str, List[str]]) -> Response:
+    term = TermCode(match["term"].upper())
+    if term not in terms():
+        raise NotFound(f"No prereqs for {term}.")
+    all_reqs = prereqs(term)
+    if "course" in query:
+        course_match = COURSE_CODE.fullmatch(query["course"][0].upper())
+        if not course_match:
+            raise BadRequest(f"{query['course'][0]!r} isn't a course code.")
+        course_code = CourseCode(course_match[1], course_match[2])
+        if course_code not in all_reqs:
+            raise NotFound(f"{course_code} has no prereqs in {term}.")
+        all_reqs = {course_code: all_reqs[course_code]}
+    if match["ext"] == "csv":
+        return csv_response(
+            [
+                ["Course", "Requirement", "Prereq", "Allow concurrent"],
+                *(
+                    [str(course_code), str(i + 1), str(alt.course_code)]
+                    + (["true"] if alt.allow_concurrent else ["false"])
+                    for course_code, reqs in all_reqs.items()
+                    for i, req in enumerate(reqs)
+                    for alt in req
+                ),
+            ]
+        )
+    return json_response(
+        {
+            str(course_code): [[repr(alt) for alt in req] for req in reqs]
+            for course_code, reqs in all_reqs.items()
+        }
+    )
+
+
+def get_ge_units(match: re.Match[str], query: Dict[str, List[str]]) -> Response:
+    from college_ges import ge_matrix, ge_rows
+
+    year = int(match["year"])
+    if not major_plans(year):
+        raise NotFound(f"No plans for {year}.")
+    return table_response(
+        match["ext"],
+        ["Major", "College", "Units"],
+        [
+            [major_code, college, f"{ge_units:g}"]
+            for _, major_code, units in ge_rows(ge_matrix([year]))
+            for college, ge_units in zip(university.college_codes, units)
+            # Colleges without a plan for the major are NaN
+            if ge_units == ge_units
+        ],
+    )
+
+
+def get_metrics(match: re.Match[str], query: Dict[str, List[str]]) -> Response:
+    from plan_metrics import HEADER, metrics_row, significant_difference
+
+    year = int(match["year"])
+    output = major_output(year, match["major"])
+    college = match["college"]
+    if college not in output.plans.colleges:
+        raise NotFound(f"No {college} plan for {match['major']} in {year}.")
+    row = metrics_row(
+        year,
+        match["major"],
+        college,
+        output.plans,
+        output,
+        significant_difference(output.plans),
+    )
+    return table_response(match["ext"], HEADER, [row])
+
+
+ROUTES: List[Tuple[re.Pattern[str], Callable[..., Response]]] = [
+    (re.compile(pattern), handler)
+    for pattern, handler in [
+        (r"/", get_index),
+        (r"/years\.json", get_years),
+        (r"/terms\.json", get_terms),
+        (r"/majors/(?P<year>\d+)\.json", get_majors),
+        (
+            r"/curriculum/(?P<year>\d+)/(?P<major>\w+)\.(?P<ext>csv|json)",
+            get_curriculum,
+        ),
+        (
+            r"/plan/(?P<year>\d+)/(?P<major>\w+)/(?P<college>\w+)\.(?P<ext>csv|json)",
+            get_plan,
+        ),
+        (r"/prereqs/(?P<term>\w+)\.(?P<ext>csv|json)", get_prereqs),
+        (r"/ge-units/(?P<year>\d+)\.(?P<ext>csv|json)", get_ge_units),
+        (
+            r"/metrics/(?P<year>\d+)/(?P<major>\w+)/(?P<college>\w+)\.(?P<ext>csv|json)",
+            get_metrics,
+        ),
+    ]
+]
+
+_responses: Dict[str, Response] = {}
+
+
+def respond(url: str) -> Response:
+    """
+    Gets the response for a URL path and query string, caching it for later.
+    Raises `NotFound` if there's no such data, or `BadRequest` if the query
+    can't be parsed.
+    """
+    if url not in _responses:
+        path, query = urlsplit(url)[2:4]
+        for pattern, handler in ROUTES:
+            match = pattern.fullmatch(path)
+            if match:
+                _responses[url] = handler(match, parse_qs(query))
+                break
+        else:
+            raise NotFound(f"No endpoint at {path}.")
+    return _responses[url]
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        try:
+            content_type, body = respond(self.path)
+            status = HTTPStatus.OK
+        except NotFound as error:
+            content_type, body = json_response({"error": str(error)})
+            status = HTTPStatus.NOT_FOUND
+        except BadRequest as error:
+            content_type, body = json_response({"error": str(error)})
+            status = HTTPStatus.BAD_REQUEST
+        except Exception as error:
+            self.log_error("%s: %r", self.path, error)
+            content_type, body = json_response({"error": repr(error)})
+            status = HTTPStatus.INTERNAL_SERVER_ERROR
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        # Let the report frontends fetch from a different port
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def warm() -> None:
+    for year in plan_years():
+        for plans in major_plans(year).values():
+            for college in plans.colleges:
+                plans.plan(college)
+    for term in terms():
+        prereqs(term)
+
+
+def main(port: int, preload: bool = False) -> None:
+    if preload:
+        warm()
+    server = HTTPServer(("127.0.0.1", port), Handler)
+    print(f"Listening on http://localhost:{port}/", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 8001,
+        "warm" in sys.argv[2:],
+    )
@@ -2,12 +2,17 @@
 Split the prereq and plan files into smaller, header-less files so they're
 faster to parse.
 
+Plan files also get an index (`plans_<year>_<length>yr.index.json`) mapping
+each major code to the byte ranges of its rows, so `parse.major_plans` can read
+just the majors that are used.
+
 python3 prereqs files/prereqs_fa23.csv
 python3 plans files/academic_plans_fa23.csv
 """
 
 from abc import abstractmethod
 import csv
+import json
 import os
 from shutil import rmtree
 from typing import (
@@ -17,6 +22,7 @@ from typing import (
     List,
     NamedTuple,
     Optional,
+    TextIO,
     Tuple,
     TypeVar,
 )
@@ -35,6 +41,16 @@ class Grouper(Generic[T]):
     def file_name(self, group: T) -> str:
         pass
 
+    def index_key(self, row: List[str]) -> Optional[str]:
+        """
+        If this returns a key, the byte ranges of rows with the same key are
+        saved in an index file next to the group's file.
+        """
+        return None
+
+    def index_file_name(self, group: T) -> str:
+        return self.file_name(group).replace(".csv", ".index.json")
+
 
 class PrereqGrouper(Grouper[str]):
     def group(self, row: List[str]) -> str:
@@ -52,6 +68,9 @@ class PlanGrouper(Grouper[Tuple[int, int]]):
         year, length = group
         return f"plans_{year}_{length}yr.csv"
 
+    def index_key(self, row: List[str]) -> Optional[str]:
+        return row[1]
+
 
 class Options(NamedTuple, Generic[T]):
     source: str
@@ -59,6 +78,22 @@ class Options(NamedTuple, Generic[T]):
     grouper: Grouper[T]
 
 
+Index = Dict[str, List[List[int]]]
+
+
+def write_index(
+    path: str, output: TextIO, index: Index, last_key: Optional[str]
+) -> None:
+    """
+    Ends the byte range of the last key at the current end of `output`, then
+    saves `index` to `path`.
+    """
+    if last_key is not None:
+        index[last_key][-1][1] = output.tell()
+    with open(path, "w") as file:
+        json.dump(index, file, separators=(",", ":"))
+
+
 def main(options: "Options[T]") -> None:
     try:
         rmtree(options.dir_path)
@@ -71,15 +106,39 @@ def main(options: "Options[T]") -> None:
         # Skip header
         next(reader)
         last_group: Optional[T] = None
+        output: Optional[TextIO] = None
+        index: Index = {}
+        last_key: Optional[str] = None
         for row in reader:
             group = options.grouper.group(row)
             if group != last_group:
-                writers[group] = CsvWriter(
-                    len(row),
-                    open(options.dir_path + options.grouper.file_name(group), "w"),
-                )
+                if output and index and last_group is not None:
+                    write_index(
+                        options.dir_path + options.grouper.index_file_name(last_group),
+                        output,
+                        index,
+                        last_key,
+                    )
+                output = open(options.dir_path + options.grouper.file_name(group), "w")
+                writers[group] = CsvWriter(len(row), output)
                 last_group = group
+                index = {}
+                last_key = None
+            key = options.grouper.index_key(row)
+            if key is not None and key != last_key and output:
+                position = output.tell()
+                if last_key is not None:
+                    index[last_key][-1][1] = position
+                index.setdefault(key, []).append([position, position])
+                last_key = key
             writers[group].row(*row)
+        if output and index and last_group is not None:
+            write_index(
+                options.dir_path + options.grouper.index_file_name(last_group),
+                output,
+                index,
+                last_key,
+            )
     for writer in writers.values():
         writer.done()
     with open(options.dir_path + ".done", "w") as file:
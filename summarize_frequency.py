@@ -3,11 +3,11 @@ python3 summarize_frequency.py './files/21-22 Enrollment_DFW CJ.xlsx.csv' './fil
 """
 
 
-import csv
 import json
 import sys
 from typing import Dict, Set
 
+from course_exports import read_export
 from parse_defs import TermCode
 
 
@@ -20,23 +20,14 @@ def main():
     all_terms: Set[TermCode] = set()
 
     for path in sys.argv[1:]:
-        with open(path) as file:
-            reader = csv.reader(file)
-            # Skip header
-            next(reader)
-            next(reader)
-            course_code = ""
-            for course, _, term, *_ in reader:
-                if not term:
-                    continue
-                course_code = course or course_code
-                if not course_code:
-                    continue
-                if course_code not in course_offerings:
-                    course_offerings[course_code] = set()
-                term = TermCode(term)
-                course_offerings[course_code].add(term)
-                all_terms.add(term)
+        for row in read_export(path):
+            if not row.term or not row.course_code:
+                continue
+            if row.course_code not in course_offerings:
+                course_offerings[row.course_code] = set()
+            term = TermCode(row.term)
+            course_offerings[row.course_code].add(term)
+            all_terms.add(term)
 
     # Sort by course code
     courses = dict(
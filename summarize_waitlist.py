@@ -3,16 +3,11 @@ python3 summarize_waitlist.py './files/Waitlist by Course for CJ.xlsx.csv' > fil
 """
 
 
-import csv
 import json
 import sys
 from typing import Dict
 
-from parse_defs import TermCode
-
-
-def parse(number: str) -> int:
-    return int(number.replace(",", "") or "0")
+from course_exports import read_waitlist
 
 
 class Averager:
@@ -31,25 +26,13 @@ def main():
 
     waitlists: Dict[str, Averager] = {}
 
-    with open(sys.argv[1]) as file:
-        reader = csv.reader(file)
-        # Skip header
-        next(reader)
-        course_code = ""
-        for (
-            course,  # Course Subject Code and Number
-            _,  # Course Title or "Total"
-            term,  # Term Code
-            waitlist,  # Waitlist
-        ) in reader:
-            if not term:
-                continue
-            course_code = course or course_code
-            term = TermCode(term)
-            if course_code not in waitlists:
-                waitlists[course_code] = Averager()
-            waitlists[course_code].total += parse(waitlist)
-            waitlists[course_code].count += 1
+    for row in read_waitlist(sys.argv[1]):
+        if not row.term:
+            continue
+        if row.course_code not in waitlists:
+            waitlists[row.course_code] = Averager()
+        waitlists[row.course_code].total += row.waitlist
+        waitlists[row.course_code].count += 1
 
     # Sort by highest waitlist first
     courses = dict(
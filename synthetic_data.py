@@ -0,0 +1,675 @@
+"""
+Generates a fake prerequisite dump, academic plan dump, ISIS major code list,
+and department list with the same columns as the real files, so scripts can be
+run, profiled, and regression-tested without the private data dumps. The same
+seed and options always produce the same files.
+
+The files are written to `<root>/files/` and split with split_csv.py like
+`make split` does, so run scripts from `<root>`, like
+
+python3 synthetic_data.py synthetic/
+cd synthetic/ && python3 ../plan_metrics.py
+
+python3 synthetic_data.py <root> [--scale 10] [--seed 0] [--depth 6] [...]
+
+Exports:
+    `Config`, the options for `generate`. A scale of 1 is roughly the size of
+    UCSD's data.
+
+    `generate`, which writes the files to a directory.
+"""
+
+import csv
+import json
+import os
+import random
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from parse_defs import CourseCode, TermCode
+from split_csv import Options, PlanGrouper, PrereqGrouper, main as split
+from university import non_subjects, university
+
+__all__ = ["Config", "generate"]
+
+# Subjects of major courses, before making up more for larger scales
+SUBJECTS = [
+    "MATH", "CSE", "PHYS", "CHEM", "BILD", "ECON", "POLI", "PSYC", "COGS",
+    "SOCI", "ANTH", "HIST", "LIGN", "PHIL", "MUS", "VIS", "ECE", "MAE", "BENG",
+    "SIO", "EDS", "ETHN", "USP", "COMM", "GLBH", "MGT", "DSC", "CHIN", "JAPN",
+    "GPS", "ENVR", "FMPH", "LATI", "CGS", "MATS", "RELI", "NANO", "CENG", "SE",
+    "BIMM", "BICD", "BIPN", "BIEB", "LTEN", "LTWL", "TDAC", "ESYS", "HDS", "AAS",
+    "JWSP",
+]  # fmt: skip
+
+# Subjects whose courses can have a lab section taken alongside them, which
+# plans list like "PHYS 2A/2AL"
+LAB_SUBJECTS = {"PHYS", "CHEM", "BILD", "BIMM", "BICD", "BIPN", "BIEB", "NANO"}
+
+# College writing sequences, which plans take one at a time from the first
+# quarter
+COLLEGE_SEQUENCES = {
+    "RE": ["HUM 1", "HUM 2", "HUM 3", "HUM 4", "HUM 5"],
+    "MU": ["MCWP 40", "MCWP 50"],
+    "TH": ["DOC 1", "DOC 2", "DOC 3"],
+    "WA": ["WCWP 10A", "WCWP 10B"],
+    "FI": ["MMW 11", "MMW 12", "MMW 13", "MMW 14", "MMW 15"],
+    "SI": ["CAT 1", "CAT 2", "CAT 3"],
+    "SN": ["SYN 1", "SYN 2"],
+    "EI": ["CCE 1", "CCE 2", "CCE 3"],
+}
+
+# Colleges that didn't exist for some of the years
+COLLEGE_FIRST_YEAR = {"EI": 2020}
+
+# Placeholders for courses that plans leave up to the student, and their course
+# type. Some are written inconsistently on purpose.
+FILLERS = [
+    ("GE", "COLLEGE"),
+    ("GE", "COLLEGE"),
+    ("ELECTIVE", "COLLEGE"),
+    ("GE/DEI", "COLLEGE"),
+    ("GE (see note)", "COLLEGE"),
+    ("ELECT", "COLLEGE"),
+    ("TECHNICAL ELECTIVE", "DEPARTMENT"),
+    ("TECH ELECTIVE", "DEPARTMENT"),
+    ("UPPER DIVISION ELECTIVE", "DEPARTMENT"),
+]
+
+PREREQ_HEADER = [
+    "Term Code",
+    "Term ID",
+    "Course ID",
+    "Course Subject Code",
+    "Course Number",
+    "Prereq Sequence ID",
+    "Prereq Course ID",
+    "Prereq Subject Code",
+    "Prereq Course Number",
+    "Prereq Minimum Grade Priority",
+    "Prereq Minimum Grade",
+    "Allow concurrent registration",
+]
+
+PLAN_HEADER = [
+    "Department",
+    "Major",
+    "College",
+    "Course",
+    "Units",
+    "Course Type",
+    "GE/Major Overlap",
+    "Start Year",
+    "Year Taken",
+    "Quarter Taken",
+    "Term Taken",
+    "Plan Length",
+]
+
+MAJOR_HEADER = [
+    "Previous Local Code",
+    "UCOP Major Code (CSS)",
+    "ISIS Major Code",
+    "Major Abbreviation",
+    "Major Description",
+    "Diploma Title",
+    "Start Term",
+    "End Term",
+    "Student Level",
+    "Department",
+    "Award Type",
+    "Program Length (in years)",
+    "College",
+    "CIP Code",
+    "Major Status",
+    "Major Type",
+    "Ed Level",
+    "Is Active",
+    "Notes",
+]
+
+
+class Config(NamedTuple):
+    seed: int = 0
+    scale: float = 1.0
+    """
+    Multiplies the number of majors and subjects.
+    """
+    majors: int = 150
+    subjects: int = 80
+    courses_per_subject: int = 40
+    colleges: Sequence[str] = university.college_codes
+    start_year: int = 2015
+    end_year: int = 2024
+    """
+    Plans are made for every start year from `start_year` to `end_year`, and
+    prereqs for every term from `start_year` to the year after `end_year`.
+    """
+    depth: int = 6
+    """
+    The number of levels in the prerequisite DAG. Courses only require courses
+    from lower levels, so this is the longest possible prereq chain.
+    """
+    fan_in: int = 3
+    """
+    The most requirements a course can have. Each requirement can be satisfied
+    by one to three alternatives.
+    """
+    messy: float = 0.1
+    """
+    The fraction of plan course titles that are written inconsistently.
+    """
+    prereq_churn: float = 0.01
+    """
+    The fraction of courses whose prereqs change each term.
+    """
+
+
+class Course(NamedTuple):
+    code: CourseCode
+    level: int
+    units: float
+    lab: Optional[CourseCode]
+    """
+    A lab section taken alongside the course, if it has one.
+    """
+    sequence_prev: Optional[CourseCode]
+    """
+    The previous course in a sequence like MATH 20A → 20B → 20C.
+    """
+
+
+Reqs = List[List[Tuple[CourseCode, bool]]]
+
+
+class Major(NamedTuple):
+    code: str
+    name: str
+    department: str
+    award: str
+    courses: List[Course]
+
+
+def _rng(config: Config, *key: object) -> random.Random:
+    """
+    A random number generator for one part of the data. Seeding with a string
+    doesn't depend on `PYTHONHASHSEED`, and giving each part its own generator
+    keeps the rest of the data the same when one part changes.
+    """
+    return random.Random(":".join(map(str, (config.seed, *key))))
+
+
+def _subjects(count: int) -> List[str]:
+    subjects = SUBJECTS[0:count]
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    for first in letters:
+        for second in letters:
+            for third in letters:
+                if len(subjects) >= count:
+                    return subjects
+                subject = f"X{first}{second}{third}"
+                if subject not in non_subjects:
+                    subjects.append(subject)
+    return subjects
+
+
+def make_catalog(config: Config, subjects: List[str]) -> Dict[str, List[Course]]:
+    """
+    Makes up each subject's courses, spread across `config.depth` levels with
+    higher course numbers at higher levels. Some courses are sequences with
+    lettered numbers.
+    """
+    catalog: Dict[str, List[Course]] = {}
+    span = max(199 // config.depth, 1)
+    for subject in subjects:
+        rng = _rng(config, "catalog", subject)
+        courses: List[Course] = []
+        number = 0
+        for level in range(config.depth):
+            number = max(number, 1 + level * span)
+            count = config.courses_per_subject // config.depth + (
+                level < config.courses_per_subject % config.depth
+            )
+            while count > 0:
+                length = min(rng.choice([1, 1, 1, 2, 3]), count)
+                letters = "ABC"[0:length] if length > 1 else rng.choice(["", "", "R"])
+                prev: Optional[CourseCode] = None
+                for letter in letters or [""]:
+                    code = CourseCode(subject, f"{number}{letter}")
+                    has_lab = letter != "" and subject in LAB_SUBJECTS
+                    units = rng.choice([4.0] * 8 + [2.0, 5.0])
+                    courses.append(
+                        Course(
+                            code,
+                            level,
+                            units,
+                            (
+                                CourseCode(subject, f"{number}{letter}L")
+                                if has_lab and rng.random() < 0.4
+                                else None
+                            ),
+                            prev,
+                        )
+                    )
+                    prev = code
+                count -= length
+                number += 1
+        catalog[subject] = courses
+    return catalog
+
+
+def make_reqs(
+    config: Config,
+    rng: random.Random,
+    course: Course,
+    catalog: Dict[str, List[Course]],
+    subjects: List[str],
+) -> Reqs:
+    """
+    Picks a course's requirements from courses in lower levels, mostly in the
+    same subject. Each requirement lists one to three alternatives.
+    """
+    if course.level == 0:
+        return []
+    reqs: Reqs = []
+    if course.sequence_prev:
+        reqs.append([(course.sequence_prev, False)])
+    count = rng.randint(0 if rng.random() < 0.15 else 1, config.fan_in)
+    while len(reqs) < count:
+        subject = (
+            course.code.subject if rng.random() < 0.7 else rng.choice(subjects[0:5])
+        )
+        options = [
+            other
+            for other in catalog[subject]
+            if other.level < course.level and other.code != course.code
+        ]
+        if not options:
+            break
+        level = max(other.level for other in options)
+        if rng.random() < 0.3:
+            level = rng.choice(options).level
+        siblings = [other.code for other in options if other.level == level]
+        alternatives = rng.sample(
+            siblings, min(len(siblings), rng.choice([1, 1, 1, 2, 2, 3]))
+        )
+        req = [(code, rng.random() < 0.05) for code in alternatives]
+        if req not in reqs:
+            reqs.append(req)
+        else:
+            count -= 1
+    return reqs
+
+
+def term_codes(config: Config) -> List[TermCode]:
+    return [
+        TermCode(f"{quarter}{year % 100:02d}")
+        for year in range(config.start_year, config.end_year + 2)
+        for quarter in TermCode.quarters
+    ]
+
+
+def _padded(code: CourseCode) -> Tuple[str, str]:
+    # The real dump pads course codes with spaces
+    return f"{code.subject:<4}", f"{code.number:<5}"
+
+
+def write_prereqs(
+    config: Config,
+    path: str,
+    catalog: Dict[str, List[Course]],
+    subjects: List[str],
+) -> None:
+    """
+    Writes every term's prereqs. Most courses exist in every term, but some are
+    added later, and some courses' prereqs change from term to term. College
+    writing courses require the previous course in their sequence.
+    """
+    courses = [course for subject in subjects for course in catalog[subject]]
+    major_courses = len(courses)
+    terms = term_codes(config)
+    rng = _rng(config, "prereqs")
+    first_terms = {
+        course.code: 0 if rng.random() < 0.95 else rng.randrange(len(terms))
+        for course in courses
+    }
+    reqs = {
+        course.code: make_reqs(config, rng, course, catalog, subjects)
+        for course in courses
+    }
+    for college in config.colleges:
+        prev: Optional[CourseCode] = None
+        for title in COLLEGE_SEQUENCES.get(college, []):
+            code = CourseCode(*title.split(" "))
+            courses.append(Course(code, 0, 4.0, None, prev))
+            first_terms[code] = 0
+            reqs[code] = [[(prev, False)]] if prev else []
+            prev = code
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(PREREQ_HEADER)
+        for i, term in enumerate(terms):
+            if i > 0:
+                term_rng = _rng(config, "prereqs", term)
+                for course in term_rng.sample(
+                    courses[0:major_courses],
+                    round(major_courses * config.prereq_churn),
+                ):
+                    reqs[course.code] = make_reqs(
+                        config, term_rng, course, catalog, subjects
+                    )
+            for course in courses:
+                if first_terms[course.code] > i:
+                    continue
+                for code in [course.code, course.lab]:
+                    if code is None:
+                        continue
+                    subject, number = _padded(code)
+                    course_id = f"{code.subject}{code.number}"
+                    prefix = [term, str(5000 + i), course_id, subject, number]
+                    # Lab sections require their course
+                    code_reqs = (
+                        reqs[code] if code == course.code else [[(course.code, True)]]
+                    )
+                    if not code_reqs:
+                        writer.writerow(prefix + [""] * 7)
+                    for j, req in enumerate(code_reqs):
+                        for req_code, concurrent in req:
+                            writer.writerow(
+                                prefix
+                                + [
+                                    f"{j + 1:03d}",
+                                    f"{req_code.subject}{req_code.number}",
+                                    *_padded(req_code),
+                                    "600",
+                                    "D-",
+                                    "Y" if concurrent else "N",
+                                ]
+                            )
+
+
+def make_majors(
+    config: Config,
+    catalog: Dict[str, List[Course]],
+    subjects: List[str],
+    count: int,
+) -> List[Major]:
+    """
+    Makes up majors in each subject, with about 16 to 22 major courses from
+    every level of their subject and the lower levels of other subjects. A
+    course's first prereq is usually also in the major.
+    """
+    rng = _rng(config, "majors")
+    majors: List[Major] = []
+    codes: Set[str] = set()
+    by_code = {
+        course.code: course for subject in subjects for course in catalog[subject]
+    }
+    for i in range(count):
+        department = subjects[i % len(subjects)]
+        number = 25
+        while f"{department[0:2]}{number}" in codes:
+            number += 1
+        code = f"{department[0:2]}{number}"
+        codes.add(code)
+        home = catalog[department]
+        chosen = rng.sample(home, min(len(home), rng.randint(10, 14)))
+        for subject in rng.sample(subjects[0:5], 2):
+            lower = [
+                course
+                for course in catalog[subject]
+                if course.level < max(config.depth // 2, 1)
+            ]
+            chosen += rng.sample(lower, min(len(lower), rng.randint(1, 4)))
+        for course in list(chosen):
+            if course.sequence_prev and len(chosen) < 22:
+                prev = by_code[course.sequence_prev]
+                if prev not in chosen:
+                    chosen.append(prev)
+        majors.append(
+            Major(
+                code,
+                f"Major in {department} {number}",
+                department,
+                rng.choice(["BS", "BA"]),
+                sorted(
+                    {course.code: course for course in chosen}.values(),
+                    key=lambda course: (course.level, course.code),
+                ),
+            )
+        )
+    return majors
+
+
+def _messy_title(rng: random.Random, course: Course) -> str:
+    subject, number = course.code
+    return rng.choice(
+        [
+            f"{subject} {number}*",
+            f"{subject} {number} (see note)",
+            f"{subject}{number}",
+            f"{subject.lower()} {number.lower()}",
+            f" {subject}  {number}^",
+            f"DF-1 - {subject} {number}",
+            f"{subject} {number} or {int(course.code.parts()[1]) + 1}",
+        ]
+    )
+
+
+def plan_rows(
+    config: Config,
+    year: int,
+    major: Major,
+    curriculum: List[Course],
+    college: str,
+) -> List[List[str]]:
+    rng = _rng(config, "plan", year, major.code, college)
+    # (title, units, type, overlaps GE) for each quarter
+    quarters: List[List[Tuple[str, float, str, bool]]] = [[] for _ in range(12)]
+    for i, title in enumerate(COLLEGE_SEQUENCES.get(college, [])):
+        quarters[i].append((title, 4.0, "COLLEGE", False))
+    for i, course in enumerate(curriculum):
+        quarter = i * 12 // len(curriculum)
+        title = f"{course.code.subject} {course.code.number}"
+        units = course.units
+        if course.lab:
+            title = f"{title}/{course.lab.number}"
+            units += 2
+        elif rng.random() < config.messy:
+            title = _messy_title(rng, course)
+        if rng.random() < config.messy / 10:
+            units = rng.choice([2.0, 5.0, 6.0])
+        quarters[quarter].append((title, units, "DEPARTMENT", rng.random() < 0.03))
+    for courses in quarters:
+        while len(courses) < (3 if rng.random() < 0.2 else 4):
+            title, course_type = rng.choice(FILLERS)
+            courses.append((title, 4.0, course_type, False))
+    rows: List[List[str]] = []
+    for i, courses in enumerate(quarters):
+        year_taken, quarter = i // 3 + 1, i % 3 + 1
+        for title, units, course_type, overlap in courses:
+            # Occasionally take something over the summer
+            course_quarter = 4 if rng.random() < 0.005 else quarter
+            term = (
+                f"FA{(year + year_taken - 1) % 100:02d}"
+                if course_quarter == 1
+                else f"{['WI', 'SP', 'SU'][course_quarter - 2]}{(year + year_taken) % 100:02d}"
+            )
+            rows.append(
+                [
+                    major.department,
+                    major.code,
+                    college,
+                    title,
+                    f"{units:.1f}",
+                    course_type,
+                    "Y" if overlap else "N",
+                    str(year),
+                    str(year_taken),
+                    str(course_quarter),
+                    term,
+                    "4",
+                ]
+            )
+    return rows
+
+
+def write_plans(config: Config, path: str, majors: List[Major]) -> None:
+    """
+    Writes every major's plans for every college and year, sorted by year,
+    major, and college like the real dump. Each year, some majors swap out one
+    of their courses for another in the same level, and now and then a college
+    is missing a plan.
+    """
+    curricula = {major.code: list(major.courses) for major in majors}
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(PLAN_HEADER)
+        for year in range(config.start_year, config.end_year + 1):
+            rng = _rng(config, "plans", year)
+            for major in majors:
+                curriculum = curricula[major.code]
+                if year > config.start_year and rng.random() < 0.3:
+                    i = rng.randrange(len(curriculum))
+                    replacement = rng.choice(
+                        [
+                            course
+                            for course in major.courses
+                            if course.level == curriculum[i].level
+                        ]
+                    )
+                    curriculum[i] = replacement
+                for college in config.colleges:
+                    if year < COLLEGE_FIRST_YEAR.get(college, 0):
+                        continue
+                    if rng.random() < 0.02:
+                        continue
+                    writer.writerows(
+                        plan_rows(config, year, major, curriculum, college)
+                    )
+
+
+def write_majors(path: str, majors: List[Major]) -> None:
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(MAJOR_HEADER)
+        for major in majors:
+            writer.writerow(
+                [
+                    "",
+                    "",
+                    major.code,
+                    major.code,
+                    major.name,
+                    major.name,
+                    "FA15",
+                    "",
+                    "UN",
+                    major.department,
+                    major.award,
+                    "4",
+                    "",
+                    "110701",
+                    "A",
+                    "",
+                    "UN",
+                    "Y",
+                    "",
+                ]
+            )
+
+
+def write_departments(path: str, subjects: List[str]) -> None:
+    with open(path, "w") as file:
+        json.dump(
+            {
+                "years": [],
+                "departments": [
+                    {
+                        "code": subject,
+                        "description": subject,
+                        "name": f"Department of {subject}",
+                    }
+                    for subject in subjects
+                ],
+                "colleges": [],
+            },
+            file,
+            indent="\t",
+        )
+        file.write("\n")
+
+
+def generate(root: str, config: Config = Config(), split_files: bool = True) -> None:
+    """
+    Writes prereqs.csv, academic_plans.csv, isis_major_code_list.csv, and
+    LoadSearchControls.json to `<root>/files/`, then splits the dumps into
+    `<root>/files/prereqs/` and `<root>/files/plans/` if `split_files` is true.
+    """
+    if os.path.realpath(root) == os.path.dirname(os.path.realpath(__file__)):
+        raise ValueError("Refusing to overwrite the repo's files/ folder.")
+    files = os.path.join(root, "files")
+    os.makedirs(files, exist_ok=True)
+    subjects = _subjects(max(round(config.subjects * config.scale), 5))
+    catalog = make_catalog(config, subjects)
+    majors = make_majors(
+        config, catalog, subjects, max(round(config.majors * config.scale), 1)
+    )
+    write_prereqs(config, os.path.join(files, "prereqs.csv"), catalog, subjects)
+    write_plans(config, os.path.join(files, "academic_plans.csv"), majors)
+    write_majors(os.path.join(files, "isis_major_code_list.csv"), majors)
+    write_departments(os.path.join(files, "LoadSearchControls.json"), subjects)
+    if split_files:
+        split(
+            Options(
+                os.path.join(files, "prereqs.csv"),
+                os.path.join(files, "prereqs/"),
+                PrereqGrouper(),
+            )
+        )
+        split(
+            Options(
+                os.path.join(files, "academic_plans.csv"),
+                os.path.join(files, "plans/"),
+                PlanGrouper(),
+            )
+        )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    defaults = Config()
+    parser = argparse.ArgumentParser(description="Generates synthetic data files.")
+    parser.add_argument("root", help="Files are written to <root>/files/.")
+    field_types: Dict[str, Callable[[str], float]] = {
+        "seed": int,
+        "scale": float,
+        "majors": int,
+        "subjects": int,
+        "courses_per_subject": int,
+        "start_year": int,
+        "end_year": int,
+        "depth": int,
+        "fan_in": int,
+        "messy": float,
+        "prereq_churn": float,
+    }
+    for field, field_type in field_types.items():
+        parser.add_argument(
+            f"--{field.replace('_', '-')}",
+            type=field_type,
+            default=getattr(defaults, field),
+        )
+    parser.add_argument(
+        "--colleges",
+        type=lambda colleges: colleges.split(","),
+        default=list(defaults.colleges),
+        help="Comma-separated college codes.",
+    )
+    parser.add_argument(
+        "--no-split", action="store_true", help="Don't run split_csv.py."
+    )
+    args = vars(parser.parse_args())
+    root = args.pop("root")
+    split_files = not args.pop("no_split")
+    generate(root, Config(**args), split_files)
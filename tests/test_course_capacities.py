@@ -0,0 +1,83 @@
+"""
+Checks course_capacities.py's projection against the plans it's built from. Run
+from the repository root, since the data files are read from ./files:
+
+python3 -m unittest discover tests
+"""
+
+from typing import Dict, Tuple
+import unittest
+
+import numpy as np
+
+from course_capacities import Cohort, Projection
+from parse import major_plans
+from parse_defs import CourseCode
+from university import university
+
+
+class ProjectionTest(unittest.TestCase):
+    projection: Projection
+    students: Dict[Cohort, int]
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.projection = Projection([2021, 2020])
+        # Leave some cohorts out to check that they don't count
+        cls.students = {
+            cohort: i % 5
+            for i, cohort in enumerate(cls.projection.cohorts)
+            if i % 5 != 0
+        }
+
+    def test_demand(self) -> None:
+        expected: Dict[Tuple[CourseCode, str], float] = {}
+        for cohort, count in self.students.items():
+            plans = major_plans(cohort.start_year)[cohort.major]
+            for course in plans.plan(cohort.college):
+                if course.course_code:
+                    key = (
+                        course.course_code,
+                        university.get_term_code(cohort.start_year, course.term_index),
+                    )
+                    expected[key] = expected.get(key, 0) + count
+        demand = self.projection.demand(self.projection.student_vector(self.students))
+        self.assertEqual(
+            {
+                (self.projection.courses[row], self.projection.term_codes[column]): (
+                    demand[row, column]
+                )
+                for row, column in zip(*np.nonzero(demand))
+            },
+            expected,
+        )
+
+    def test_sweep(self) -> None:
+        major = self.projection.cohorts[1].major
+        changes = [-0.1, 0, 0.25]
+        sweep = self.projection.sweep(
+            self.projection.student_vector(self.students), major, changes
+        )
+        self.assertEqual(len(sweep), len(changes))
+        for change, demand in zip(changes, sweep):
+            scaled = {
+                cohort: count * (1 + change) if cohort.major == major else count
+                for cohort, count in self.students.items()
+            }
+            np.testing.assert_allclose(
+                demand,
+                self.projection.demand(
+                    np.array(
+                        [scaled.get(cohort, 0) for cohort in self.projection.cohorts],
+                        dtype=np.float64,
+                    )
+                ),
+            )
+
+    def test_no_years(self) -> None:
+        with self.assertRaises(ValueError):
+            Projection([])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+"""
+Requests endpoints from serve.py over HTTP. Run from the repository root, since
+the data files are read from ./files:
+
+python3 -m unittest discover tests
+"""
+
+import csv
+from http.server import HTTPServer
+import io
+import json
+import threading
+import unittest
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+from serve import Handler
+
+
+class ServeTest(unittest.TestCase):
+    server: HTTPServer
+    thread: threading.Thread
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # Port 0 lets the OS pick a free port
+        cls.server = HTTPServer(("127.0.0.1", 0), Handler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.thread.join()
+        cls.server.server_close()
+
+    def get(self, path: str, status: int = 200) -> str:
+        url = f"http://127.0.0.1:{self.server.server_port}{path}"
+        try:
+            with urlopen(url) as response:
+                code, body = response.status, response.read()
+        except HTTPError as error:
+            with error:
+                code, body = error.code, error.read()
+        self.assertEqual(code, status)
+        return body.decode("utf-8")
+
+    def test_ge_units_csv(self) -> None:
+        rows = list(csv.reader(io.StringIO(self.get("/ge-units/2021.csv"))))
+        self.assertEqual(rows[0], ["Major", "College", "Units"])
+        self.assertGreater(len(rows), 1)
+        for major_code, college, units in rows[1:]:
+            self.assertTrue(major_code)
+            self.assertTrue(college)
+            self.assertGreaterEqual(float(units), 0)
+
+    def test_plan(self) -> None:
+        rows = list(csv.reader(io.StringIO(self.get("/plan/2021/CS25/RE.csv"))))
+        self.assertEqual(rows[1][:2], ["Degree Plan", "Major CS25/ Revelle"])
+        plan = json.loads(self.get("/plan/2021/CS25/RE.json"))
+        self.assertTrue(plan["curriculum_terms"])
+
+    def test_not_found(self) -> None:
+        self.assertIn("error", json.loads(self.get("/nowhere", 404)))
+        self.get("/plan/2021/CS25/XX.json", 404)
+        self.get("/plan/2021/XX99/RE.json", 404)
+        self.get("/prereqs/XX99.json", 404)
+
+    def test_prereqs(self) -> None:
+        all_reqs = json.loads(self.get("/prereqs/WI25.json"))
+        self.assertEqual(all_reqs["BILD 1"], [["PHYS 11A", "MATH 4B", "MATH 20"]])
+        for path in [
+            "/prereqs/WI25.json?course=BILD+1",
+            "/prereqs/wi25.json?course=bild1",
+        ]:
+            self.assertEqual(json.loads(self.get(path)), {"BILD 1": all_reqs["BILD 1"]})
+        rows = list(
+            csv.reader(io.StringIO(self.get("/prereqs/WI25.csv?course=BILD+1")))
+        )
+        self.assertEqual(
+            rows,
+            [
+                ["Course", "Requirement", "Prereq", "Allow concurrent"],
+                ["BILD 1", "1", "PHYS 11A", "false"],
+                ["BILD 1", "1", "MATH 4B", "false"],
+                ["BILD 1", "1", "MATH 20", "false"],
+            ],
+        )
+
+    def test_prereqs_bad_course(self) -> None:
+        self.get("/prereqs/WI25.json?course=20C", 400)
+        self.get("/prereqs/WI25.json?course=MATH+20C+L", 400)
+        # Parses, but has no prereqs that term
+        self.get("/prereqs/WI25.json?course=MATH20C", 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,16 +3,28 @@ python3 units_per_course.py > units_per_course.txt
 python3 units_per_course.py json > units_per_course.json
 
 python3 units_per_course.py (json) [year]
+
+How many plans list each course with each unit count is saved per year in
+files/units_per_year.json, so only years whose plans (or the scripts that
+process them) have changed since the last run are read again.
 """
 
 from functools import cmp_to_key
-from typing import Dict, List, NamedTuple
-from parse import major_plans
+import json
+import os
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, TypedDict
+from parse import DATABASE_PATH, major_plans
 from parse_defs import CourseCode
 from university import university
 
 MAX_SAMPLE_LEN = 5
 
+AGGREGATE_PATH = "./files/units_per_year.json"
+
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Modules that determine the units of the courses in a plan
+SOURCES = ["parse", "parse_defs", "university", "units_per_course"]
+
 
 class PlanId(NamedTuple):
     year: int
@@ -36,39 +48,175 @@ def comp_plan_id(a: PlanId, b: PlanId) -> int:
     return b.year - a.year
 
 
-UnitVariant = List[PlanId]
+class UnitVariant(NamedTuple):
+    plans: int
+    """
+    The number of plans that list the course with these units. A plan that
+    lists the course twice is counted twice.
+    """
+    samples: List[PlanId]
+    """
+    The first `MAX_SAMPLE_LEN` of the plans, sorted by `comp_plan_id`.
+    """
+
 
+YearUnits = Dict[CourseCode, Dict[float, UnitVariant]]
+"""
+Maps each course to the unit counts it's listed with in a year's plans, in the
+order they first appear.
+"""
 
-def main() -> None:
-    import sys
+VariantJson = Tuple[float, int, List[List[str]]]
+"""
+A unit count, the number of plans with it, and the major and college of each
+sample plan. JSON stores the tuple as a list.
+"""
+
+
+class YearUnitsJson(TypedDict):
+    """
+    A year's entry in `AGGREGATE_PATH`, which maps years to these.
+    """
+
+    stamp: List[object]
+    "The year's `_stamp` when its units were counted."
+    courses: Dict[str, List[VariantJson]]
+
+
+def count_units(year: int) -> YearUnits:
+    """
+    Reads every plan from a year and counts the unit counts of each course.
+    """
+    plan_ids: Dict[CourseCode, Dict[float, List[PlanId]]] = {}
+    for major_code, colleges in major_plans(year).items():
+        for college in colleges.colleges:
+            for course in colleges.plan(college):
+                if not course.course_code:
+                    continue
+                variants = plan_ids.get(course.course_code) or {}
+                if course.course_code not in plan_ids:
+                    plan_ids[course.course_code] = variants
+                unit_variant = variants.get(course.units) or []
+                if course.units not in variants:
+                    variants[course.units] = unit_variant
+                unit_variant.append(PlanId(year, major_code, college))
+    return {
+        course_code: {
+            units: UnitVariant(
+                len(plans),
+                sorted(plans, key=cmp_to_key(comp_plan_id))[0:MAX_SAMPLE_LEN],
+            )
+            for units, plans in variants.items()
+        }
+        for course_code, variants in plan_ids.items()
+    }
 
-    courses: Dict[CourseCode, Dict[float, UnitVariant]] = {}
 
+def _stamp(year: int) -> List[object]:
+    """
+    The modification times and sizes of the files that a year's units are
+    made from, to tell if they need to be counted again.
+    """
+    plans_path = f"./files/plans/plans_{year}_4yr.csv"
+    paths = [
+        plans_path,
+        plans_path.replace(".csv", ".index.json"),
+        DATABASE_PATH,
+        *(os.path.join(SOURCE_DIR, f"{module}.py") for module in SOURCES),
+    ]
+    stamp: List[object] = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            stamp.append([path, stat.st_mtime_ns, stat.st_size])
+        except FileNotFoundError:
+            stamp.append([path, None])
+    return stamp
+
+
+def _units_to_json(units: YearUnits) -> Dict[str, List[VariantJson]]:
+    return {
+        str(course_code): [
+            (
+                units,
+                variant.plans,
+                [[plan.major, plan.college] for plan in variant.samples],
+            )
+            for units, variant in variants.items()
+        ]
+        for course_code, variants in units.items()
+    }
+
+
+def _units_from_json(year: int, courses: Dict[str, List[VariantJson]]) -> YearUnits:
+    return {
+        CourseCode(*course_code.split(" ")): {
+            units: UnitVariant(
+                plans, [PlanId(year, major, college) for major, college in samples]
+            )
+            for units, plans, samples in variants
+        }
+        for course_code, variants in courses.items()
+    }
+
+
+def year_units(years: Iterable[int]) -> Dict[int, YearUnits]:
+    """
+    Gets the unit counts of each year, only counting the years that aren't
+    saved in `AGGREGATE_PATH` or whose plans have changed since, and saving
+    them.
+    """
     try:
-        max_year = int(sys.argv[2])
-        years = [max_year]
-    except (ValueError, IndexError):
+        with open(AGGREGATE_PATH) as file:
+            saved: Dict[str, YearUnitsJson] = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        saved = {}
+    changed = False
+    units: Dict[int, YearUnits] = {}
+    for year in years:
+        stamp = _stamp(year)
+        entry = saved.get(str(year))
+        if entry is not None and entry["stamp"] == stamp:
+            units[year] = _units_from_json(year, entry["courses"])
+        else:
+            units[year] = count_units(year)
+            saved[str(year)] = {"stamp": stamp, "courses": _units_to_json(units[year])}
+            changed = True
+    if changed:
+        os.makedirs(os.path.dirname(AGGREGATE_PATH), exist_ok=True)
+        with open(AGGREGATE_PATH, "w") as file:
+            json.dump(saved, file, separators=(",", ":"))
+    return units
+
+
+def main(json_mode: bool = False, year: Optional[int] = None) -> None:
+    if year is None:
         years = range(2015, 2024)
         max_year = max(years)
-    json_mode = len(sys.argv) > 1 and sys.argv[1] == "json"
+    else:
+        max_year = year
+        years = [max_year]
 
-    def score(variant: UnitVariant) -> float:
-        # Prioritize more recent years
-        return sum(0.8 ** (max_year - plan.year) for plan in variant)
+    # For each course, the plan counts of each unit count for each year
+    courses: Dict[CourseCode, Dict[float, List[Tuple[int, UnitVariant]]]] = {}
+    for year, units in year_units(years).items():
+        for course_code, variants in units.items():
+            if course_code not in courses:
+                courses[course_code] = {}
+            for units, variant in variants.items():
+                if units not in courses[course_code]:
+                    courses[course_code][units] = []
+                courses[course_code][units].append((year, variant))
 
-    for year in years:
-        for major_code, colleges in major_plans(year).items():
-            for college in colleges.colleges:
-                for course in colleges.plan(college):
-                    if not course.course_code:
-                        continue
-                    variants = courses.get(course.course_code) or {}
-                    if course.course_code not in courses:
-                        courses[course.course_code] = variants
-                    unit_variant = variants.get(course.units) or []
-                    if course.units not in variants:
-                        variants[course.units] = unit_variant
-                    unit_variant.append(PlanId(year, major_code, college))
+    def score(variant: List[Tuple[int, UnitVariant]]) -> float:
+        # Prioritize more recent years. Each plan is added separately to get
+        # the same float as summing over every plan
+        total: float = 0
+        for year, counts in variant:
+            weight = 0.8 ** (max_year - year)
+            for _ in range(counts.plans):
+                total += weight
+        return total
 
     if json_mode:
         # Manually correct units
@@ -107,13 +255,23 @@ def main() -> None:
         for units, variant in sorted(
             variants.items(), key=lambda item: -score(item[1])
         ):
+            plans = [plan for _, counts in variant for plan in counts.samples]
             samples = ", ".join(
-                [str(p) for p in sorted(variant, key=cmp_to_key(comp_plan_id))][0:5]
+                [str(p) for p in sorted(plans, key=cmp_to_key(comp_plan_id))][
+                    0:MAX_SAMPLE_LEN
+                ]
             )
+            plan_count = sum(counts.plans for _, counts in variant)
             print(
-                f"{units} units (score: {score(variant):.2f}; {len(variant)}): {samples}"
+                f"{units} units (score: {score(variant):.2f}; {plan_count}): {samples}"
             )
 
 
 if __name__ == "__main__":
-    main()
+    import sys
+
+    try:
+        year = int(sys.argv[2])
+    except (ValueError, IndexError):
+        year = None
+    main(len(sys.argv) > 1 and sys.argv[1] == "json", year)
@@ -1,8 +1,9 @@
 from itertools import chain
 import re
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, List, Optional, Sequence, Set, Tuple
 
 from parse_defs import CourseCode, Prerequisite, ProcessedCourse, RawCourse, TermCode
+from profiling import count, timed
 
 __all__ = ["university"]
 
@@ -13,6 +14,7 @@ ParsedCourseCodes = List[Tuple[Optional[CourseCode], float]]
 non_subjects: Set[str] = {"IE", "RR", "OR", "TE", "DEPT"}
 
 
+@timed("university.parse_course_name")
 def parse_course_name(
     name: str,
     units: float,
@@ -67,6 +69,7 @@ control_chars = re.escape(
 )
 
 
+@timed("university.clean_course_title")
 def clean_course_title(title: str) -> str:
     """
     Cleans up the course title by removing asterisks and (see note)s.
@@ -127,7 +130,9 @@ class _UCSD:
         # Carlos wants us to ignore them
         return not (college == "SN" and start_year < 2020)
 
-    def process_plan(self, plan: List[RawCourse]) -> List[ProcessedCourse]:
+    @timed("university.process_plan")
+    def process_plan(self, plan: Sequence[RawCourse]) -> List[ProcessedCourse]:
+        count("plans processed")
         courses: List[ProcessedCourse] = []
         for course in plan:
             title = clean_course_title(course.course_title)
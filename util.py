@@ -144,3 +144,14 @@ def bool_str(num: bool) -> str:
     Displays a boolean as a string.
     """
     return "true" if num else "false"
+
+
+def parse_years(years: str) -> List[int]:
+    """
+    Parses a year (`2024`) or an inclusive range of years (`2019-2024`) from
+    the command line.
+    """
+    if "-" in years:
+        start, end = years.split("-")
+        return list(range(int(start), int(end) + 1))
+    return [int(years)]